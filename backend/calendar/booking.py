@@ -0,0 +1,136 @@
+from datetime import datetime, timedelta
+from typing import List, Optional, Sequence, Tuple
+from fastapi import HTTPException
+from sqlalchemy import delete, func, insert, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from backend.calendar import models
+
+# Facility bookings. The invariant is that reservations of one facility never
+# overlap; with it, the (facility_id, start_date) index answers both a
+# conflict check (one seek) and a free-slot search (one seek plus an ordered
+# walk over the gaps) without scanning the facility's history.
+
+# Bounded recurring events book every occurrence; this caps the series size
+MAX_SERIES_BOOKINGS = 520
+SCAN_BATCH = 200
+
+Interval = Tuple[datetime, datetime]
+
+async def facility_for_location(db: AsyncSession, location: Optional[str]) -> Optional[models.Facility]:
+    """The facility a calendar event's location names, if any."""
+    if not location or not location.strip():
+        return None
+    return (await db.execute(
+        select(models.Facility).where(func.lower(models.Facility.name) == location.strip().lower())
+    )).scalars().first()
+
+async def lock_facility(db: AsyncSession, facility_id: int) -> bool:
+    """Take the facility's booking lock for the rest of the transaction.
+
+    An UPDATE rather than SELECT ... FOR UPDATE, so that SQLite (which
+    ignores FOR UPDATE) also serializes bookers.
+    """
+    result = await db.execute(
+        update(models.Facility)
+        .where(models.Facility.id == facility_id)
+        .values(version=models.Facility.version + 1)
+    )
+    return result.rowcount > 0
+
+async def find_conflict(db: AsyncSession, facility_id: int, start: datetime, end: datetime) -> Optional[models.Reservation]:
+    """The reservation overlapping [start, end), if any."""
+    latest = (await db.execute(
+        select(models.Reservation)
+        .where(models.Reservation.facility_id == facility_id, models.Reservation.start_date < end)
+        .order_by(models.Reservation.start_date.desc())
+        .limit(1)
+    )).scalars().first()
+    if latest is not None and latest.end_date > start:
+        return latest
+    return None
+
+def _conflict_error(facility: models.Facility, start: datetime, end: datetime) -> HTTPException:
+    return HTTPException(
+        status_code=409,
+        detail=f"{facility.name} is already booked from {start.isoformat()} to {end.isoformat()}."
+    )
+
+async def reserve(
+    db: AsyncSession,
+    facility: models.Facility,
+    intervals: Sequence[Interval],
+    user_id: Optional[int] = None,
+    event_id: Optional[int] = None
+) -> List[int]:
+    """Book every interval or none; raises 409 on the first conflict.
+
+    Locks the facility, so the caller must commit (or roll back) promptly.
+    """
+    intervals = sorted(intervals)
+    for (_, previous_end), (start, _) in zip(intervals, intervals[1:]):
+        if start < previous_end:
+            raise HTTPException(status_code=400, detail="Requested intervals overlap each other.")
+    if not await lock_facility(db, facility.id):
+        raise HTTPException(status_code=404, detail="Facility not found")
+
+    for start, end in intervals:
+        conflict = await find_conflict(db, facility.id, start, end)
+        if conflict is not None:
+            raise _conflict_error(facility, conflict.start_date, conflict.end_date)
+
+    result = await db.execute(
+        insert(models.Reservation).returning(models.Reservation.id),
+        [
+            {"facility_id": facility.id, "start_date": start, "end_date": end,
+             "user_id": user_id, "event_id": event_id}
+            for start, end in intervals
+        ]
+    )
+    return list(result.scalars())
+
+async def release_event(db: AsyncSession, event_id: int):
+    await db.execute(delete(models.Reservation).where(models.Reservation.event_id == event_id))
+
+async def free_slots(
+    db: AsyncSession,
+    facility_id: int,
+    duration: timedelta,
+    after: datetime,
+    before: datetime,
+    limit: int
+) -> List[Interval]:
+    """Gaps of at least `duration` between reservations in [after, before)."""
+    # Start from the reservation that may cover `after`, then walk forward
+    covering = (await db.execute(
+        select(models.Reservation.start_date)
+        .where(models.Reservation.facility_id == facility_id, models.Reservation.start_date <= after)
+        .order_by(models.Reservation.start_date.desc())
+        .limit(1)
+    )).scalar()
+    scan_from = covering or after
+
+    slots: List[Interval] = []
+    cursor = after
+    # Starts are unique per facility (reservations don't overlap), so the
+    # start alone is a keyset cursor
+    start_filter = models.Reservation.start_date >= scan_from
+    while cursor < before and len(slots) < limit:
+        rows = (await db.execute(
+            select(models.Reservation.start_date, models.Reservation.end_date)
+            .where(models.Reservation.facility_id == facility_id, start_filter, models.Reservation.start_date < before)
+            .order_by(models.Reservation.start_date)
+            .limit(SCAN_BATCH)
+        )).all()
+        for row in rows:
+            if row.start_date - cursor >= duration:
+                slots.append((cursor, row.start_date))
+                if len(slots) >= limit:
+                    return slots
+            cursor = max(cursor, row.end_date)
+        if len(rows) < SCAN_BATCH:
+            break
+        start_filter = models.Reservation.start_date > rows[-1].start_date
+
+    if len(slots) < limit and before - cursor >= duration:
+        slots.append((cursor, before))
+    return slots
@@ -0,0 +1,108 @@
+from fastapi import APIRouter, HTTPException, Depends, Query
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import List, Optional
+from datetime import datetime, timedelta
+from backend.core.database import get_async_db
+from backend.calendar import booking, models
+from backend.calendar.schemas import Facility, FacilityCreate, FreeSlot, Reservation, ReservationCreate, naive_utc
+
+router = APIRouter()
+
+async def _get_facility(db: AsyncSession, facility_id: int) -> models.Facility:
+    facility = await db.get(models.Facility, facility_id)
+    if not facility:
+        raise HTTPException(status_code=404, detail="Facility not found")
+    return facility
+
+@router.get("/", response_model=List[Facility])
+async def get_facilities(db: AsyncSession = Depends(get_async_db)):
+    return (await db.execute(select(models.Facility).order_by(models.Facility.name))).scalars().all()
+
+@router.post("/", response_model=Facility)
+async def create_facility(facility: FacilityCreate, db: AsyncSession = Depends(get_async_db)):
+    """Register a bookable amenity (Board/Management only)"""
+    name = facility.name.strip()
+    if not name:
+        raise HTTPException(status_code=400, detail="Facility name is required.")
+    existing = (await db.execute(
+        select(models.Facility.id).where(func.lower(models.Facility.name) == name.lower())
+    )).scalar()
+    if existing:
+        raise HTTPException(status_code=400, detail=f"Facility '{name}' already exists.")
+    new_facility = models.Facility(name=name, description=facility.description, version=0)
+    db.add(new_facility)
+    await db.commit()
+    return new_facility
+
+@router.get("/{facility_id}/reservations", response_model=List[Reservation])
+async def get_reservations(
+    facility_id: int,
+    start_date: datetime,
+    end_date: datetime,
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Reservations overlapping a date range"""
+    await _get_facility(db, facility_id)
+    # A reservation overlapping start_date began at or after the one
+    # covering it, so the scan starts there rather than at the beginning
+    covering = (await db.execute(
+        select(models.Reservation.start_date)
+        .where(models.Reservation.facility_id == facility_id, models.Reservation.start_date <= start_date)
+        .order_by(models.Reservation.start_date.desc())
+        .limit(1)
+    )).scalar()
+    return (await db.execute(
+        select(models.Reservation)
+        .where(
+            models.Reservation.facility_id == facility_id,
+            models.Reservation.start_date >= (covering or start_date),
+            models.Reservation.start_date < end_date,
+            models.Reservation.end_date > start_date
+        )
+        .order_by(models.Reservation.start_date)
+    )).scalars().all()
+
+@router.post("/{facility_id}/reservations", response_model=Reservation)
+async def create_reservation(
+    facility_id: int,
+    reservation: ReservationCreate,
+    user_id: int = 1, # Mock auth
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Book a facility; 409 if the slot is taken"""
+    if reservation.end_date <= reservation.start_date:
+        raise HTTPException(status_code=400, detail="End date must be after start date.")
+    facility = await _get_facility(db, facility_id)
+    ids = await booking.reserve(db, facility, [(reservation.start_date, reservation.end_date)], user_id=user_id)
+    await db.commit()
+    return await db.get(models.Reservation, ids[0])
+
+@router.delete("/reservations/{reservation_id}")
+async def cancel_reservation(reservation_id: int, db: AsyncSession = Depends(get_async_db)):
+    reservation = await db.get(models.Reservation, reservation_id)
+    if not reservation:
+        raise HTTPException(status_code=404, detail="Reservation not found")
+    if reservation.event_id is not None:
+        raise HTTPException(status_code=400, detail="This booking belongs to a calendar event; edit the event instead.")
+    await db.delete(reservation)
+    await db.commit()
+    return {"message": "Reservation cancelled."}
+
+@router.get("/{facility_id}/availability", response_model=List[FreeSlot])
+async def get_availability(
+    facility_id: int,
+    duration_minutes: int = Query(60, ge=1, le=7 * 24 * 60),
+    after: Optional[datetime] = None,
+    before: Optional[datetime] = None,
+    limit: int = Query(10, ge=1, le=100),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Free slots of at least duration_minutes, earliest first"""
+    await _get_facility(db, facility_id)
+    after = naive_utc(after) or datetime.now().replace(second=0, microsecond=0)
+    before = naive_utc(before) or after + timedelta(days=30)
+    if before <= after:
+        raise HTTPException(status_code=400, detail="'before' must be after 'after'.")
+    slots = await booking.free_slots(db, facility_id, timedelta(minutes=duration_minutes), after, before, limit)
+    return [FreeSlot(start_date=start, end_date=end) for start, end in slots]
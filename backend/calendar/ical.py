@@ -0,0 +1,77 @@
+from datetime import datetime, timezone
+from typing import Iterable
+from backend.calendar import models
+
+# iCalendar (RFC 5545) rendering for the subscription feed. Recurring events
+# are emitted once with their RRULE and expanded by the client. Event times
+# are stored without a zone, so they are written as floating local times.
+
+PRODID = "-//ESNTES//Community Calendar//EN"
+UID_DOMAIN = "esntes"
+
+def _escape(text: str) -> str:
+    return (
+        text.replace("\\", "\\\\")
+        .replace(";", "\\;")
+        .replace(",", "\\,")
+        .replace("\r\n", "\\n")
+        .replace("\n", "\\n")
+    )
+
+def _fold(line: str) -> str:
+    """Fold a content line at 75 octets, without splitting UTF-8 sequences."""
+    encoded = line.encode()
+    if len(encoded) <= 75:
+        return line
+    parts = []
+    limit = 75
+    while encoded:
+        cut = min(limit, len(encoded))
+        while cut < len(encoded) and (encoded[cut] & 0xC0) == 0x80:
+            cut -= 1
+        parts.append(encoded[:cut].decode())
+        encoded = encoded[cut:]
+        limit = 74 # continuation lines start with a space
+    return "\r\n ".join(parts)
+
+def _stamp(value: datetime) -> str:
+    return value.strftime("%Y%m%dT%H%M%S")
+
+def _utc_stamp(value: datetime) -> str:
+    # DTSTAMP and LAST-MODIFIED must be UTC (RFC 5545 3.8.7.2-3)
+    return value.strftime("%Y%m%dT%H%M%SZ")
+
+def event_lines(event: models.CalendarEvent) -> Iterable[str]:
+    yield "BEGIN:VEVENT"
+    yield f"UID:event-{event.id}@{UID_DOMAIN}"
+    # updated_at is stored in UTC; start_date is local time
+    modified = event.updated_at or event.start_date.astimezone(timezone.utc).replace(tzinfo=None)
+    yield f"DTSTAMP:{_utc_stamp(modified)}"
+    if event.updated_at:
+        yield f"LAST-MODIFIED:{_utc_stamp(event.updated_at)}"
+    yield f"SEQUENCE:{event.revision or 0}"
+    yield f"DTSTART:{_stamp(event.start_date)}"
+    yield f"DTEND:{_stamp(event.end_date)}"
+    if event.recurrence:
+        yield f"RRULE:{event.recurrence}"
+    yield f"SUMMARY:{_escape(event.title or '')}"
+    if event.description:
+        yield f"DESCRIPTION:{_escape(event.description)}"
+    if event.location:
+        yield f"LOCATION:{_escape(event.location)}"
+    if event.event_type:
+        yield f"CATEGORIES:{_escape(event.event_type)}"
+    yield "END:VEVENT"
+
+def render_calendar(events: Iterable[models.CalendarEvent], name: str = "Community Calendar") -> str:
+    lines = [
+        "BEGIN:VCALENDAR",
+        "VERSION:2.0",
+        f"PRODID:{PRODID}",
+        "CALSCALE:GREGORIAN",
+        f"X-WR-CALNAME:{_escape(name)}",
+    ]
+    for event in events:
+        lines.extend(event_lines(event))
+    lines.append("END:VCALENDAR")
+    return "\r\n".join(_fold(line) for line in lines) + "\r\n"
@@ -0,0 +1,68 @@
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Index
+from datetime import datetime
+from backend.core.database import Base
+
+class CalendarEvent(Base):
+    __tablename__ = "calendar_events"
+    __table_args__ = (
+        # Overlap queries: start_date < window_end AND end_date > window_start
+        Index("ix_calendar_events_range", "start_date", "end_date"),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+    title = Column(String)
+    description = Column(String, nullable=True)
+    event_type = Column(String)
+    # For recurring events these bound the first occurrence
+    start_date = Column(DateTime, nullable=False)
+    end_date = Column(DateTime, nullable=False)
+    location = Column(String, nullable=True)
+    created_by = Column(String)
+    # iCalendar RRULE subset (FREQ, INTERVAL, COUNT, UNTIL); NULL for one-off events
+    recurrence = Column(String, nullable=True)
+    # End of the last occurrence, derived from the rule; NULL = open-ended
+    series_end = Column(DateTime, nullable=True)
+    # Sync bookkeeping: every write takes the next value of the calendar's
+    # revision counter, and deletes leave a tombstone (deleted_at) so that
+    # incremental sync clients learn about them
+    revision = Column(Integer, nullable=True, index=True)
+    updated_at = Column(DateTime, nullable=True)
+    deleted_at = Column(DateTime, nullable=True)
+
+class CalendarRevision(Base):
+    """Single-row counter; bumping it serializes calendar writers."""
+    __tablename__ = "calendar_revision"
+
+    id = Column(Integer, primary_key=True)
+    value = Column(Integer, nullable=False, default=0)
+
+class Facility(Base):
+    """A bookable amenity (pool, clubhouse, ...).
+
+    Reservations take a write lock on their facility row first, so two
+    bookings of the same facility are checked and inserted one at a time.
+    """
+    __tablename__ = "facilities"
+
+    id = Column(Integer, primary_key=True, index=True)
+    name = Column(String, unique=True, nullable=False)
+    description = Column(String, nullable=True)
+    # Bumped by every booking; the UPDATE is what takes the lock
+    version = Column(Integer, nullable=False, default=0)
+
+class Reservation(Base):
+    __tablename__ = "facility_reservations"
+    __table_args__ = (
+        # Reservations of one facility never overlap, so the latest one
+        # starting before a new interval's end is the only possible conflict:
+        # a single seek on this index
+        Index("ix_facility_reservations_facility_start", "facility_id", "start_date"),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+    facility_id = Column(Integer, ForeignKey("facilities.id"), nullable=False)
+    start_date = Column(DateTime, nullable=False)
+    end_date = Column(DateTime, nullable=False)
+    user_id = Column(Integer, nullable=True) # Resident booking
+    event_id = Column(Integer, ForeignKey("calendar_events.id"), nullable=True, index=True) # Calendar event booking
+    created_at = Column(DateTime, default=datetime.utcnow)
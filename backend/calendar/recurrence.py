@@ -0,0 +1,141 @@
+import calendar
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from enum import Enum
+from typing import Iterator, Optional
+
+# Recurring events are stored once, as a rule, and expanded lazily: only the
+# occurrences that overlap the requested window are ever generated.
+
+class Frequency(str, Enum):
+    DAILY = "DAILY"
+    WEEKLY = "WEEKLY"
+    MONTHLY = "MONTHLY"
+    YEARLY = "YEARLY"
+
+@dataclass
+class Rule:
+    frequency: Frequency
+    interval: int = 1
+    count: Optional[int] = None
+    until: Optional[datetime] = None
+
+def _parse_until(value: str) -> datetime:
+    value = value.rstrip("Z")
+    for fmt in ("%Y%m%dT%H%M%S", "%Y%m%d"):
+        try:
+            return datetime.strptime(value, fmt)
+        except ValueError:
+            continue
+    try:
+        return datetime.fromisoformat(value)
+    except ValueError:
+        raise ValueError(f"Invalid UNTIL value '{value}'")
+
+def parse_rule(text: str) -> Rule:
+    """Parse an RRULE string such as "FREQ=WEEKLY;INTERVAL=2;UNTIL=20261231"."""
+    parts = {}
+    for part in text.strip().removeprefix("RRULE:").split(";"):
+        if not part:
+            continue
+        key, sep, value = part.partition("=")
+        if not sep:
+            raise ValueError(f"Invalid recurrence part '{part}'")
+        parts[key.strip().upper()] = value.strip()
+
+    unsupported = set(parts) - {"FREQ", "INTERVAL", "COUNT", "UNTIL"}
+    if unsupported:
+        raise ValueError(f"Unsupported recurrence parts: {', '.join(sorted(unsupported))}")
+    try:
+        frequency = Frequency(parts.get("FREQ", "").upper())
+    except ValueError:
+        raise ValueError("FREQ must be one of DAILY, WEEKLY, MONTHLY, YEARLY")
+
+    rule = Rule(frequency=frequency)
+    if "INTERVAL" in parts:
+        rule.interval = int(parts["INTERVAL"])
+    if "COUNT" in parts:
+        rule.count = int(parts["COUNT"])
+    if "UNTIL" in parts:
+        rule.until = _parse_until(parts["UNTIL"])
+    if rule.interval < 1 or (rule.count is not None and rule.count < 1):
+        raise ValueError("INTERVAL and COUNT must be positive")
+    if rule.count is not None and rule.until is not None:
+        raise ValueError("COUNT and UNTIL cannot both be set")
+    return rule
+
+def format_rule(rule: Rule) -> str:
+    text = f"FREQ={rule.frequency.value}"
+    if rule.interval != 1:
+        text += f";INTERVAL={rule.interval}"
+    if rule.count is not None:
+        text += f";COUNT={rule.count}"
+    if rule.until is not None:
+        text += f";UNTIL={rule.until.strftime('%Y%m%dT%H%M%S')}"
+    return text
+
+def _add_months(start: datetime, months: int) -> Optional[datetime]:
+    """Same day-of-month `months` later, or None if that month is too short."""
+    month_index = start.month - 1 + months
+    year, month = start.year + month_index // 12, month_index % 12 + 1
+    if start.day > calendar.monthrange(year, month)[1]:
+        return None
+    return start.replace(year=year, month=month)
+
+def _nth(rule: Rule, start: datetime, n: int) -> Optional[datetime]:
+    """Start of the n-th candidate occurrence (None when it falls on a missing day)."""
+    step = n * rule.interval
+    if rule.frequency == Frequency.DAILY:
+        return start + timedelta(days=step)
+    if rule.frequency == Frequency.WEEKLY:
+        return start + timedelta(weeks=step)
+    if rule.frequency == Frequency.MONTHLY:
+        return _add_months(start, step)
+    return _add_months(start, 12 * step)
+
+def last_start(rule: Rule, start: datetime) -> Optional[datetime]:
+    """Start of the final occurrence, or None for an open-ended series."""
+    if rule.until is not None:
+        return rule.until
+    if rule.count is not None:
+        # Candidates on missing days (e.g. Feb 30) don't count, so walk them
+        found, n, last = 0, 0, start
+        while found < rule.count:
+            occurrence = _nth(rule, start, n)
+            if occurrence is not None:
+                found, last = found + 1, occurrence
+            n += 1
+        return last
+    return None
+
+def occurrences(
+    rule: Rule, start: datetime, end: datetime, window_start: datetime, window_end: datetime
+) -> Iterator[datetime]:
+    """Yield occurrence starts of a series whose occurrences overlap the window."""
+    duration = end - start
+    # Jump straight to the first candidate that can reach the window
+    n = 0
+    if rule.frequency in (Frequency.DAILY, Frequency.WEEKLY) and rule.count is None:
+        period = timedelta(days=rule.interval * (7 if rule.frequency == Frequency.WEEKLY else 1))
+        if window_start - duration > start:
+            n = max(0, (window_start - duration - start) // period)
+    elif rule.frequency in (Frequency.MONTHLY, Frequency.YEARLY) and rule.count is None:
+        months = rule.interval * (12 if rule.frequency == Frequency.YEARLY else 1)
+        elapsed = (window_start.year - start.year) * 12 + window_start.month - start.month - 1
+        n = max(0, elapsed // months)
+
+    produced = 0
+    while True:
+        occurrence = _nth(rule, start, n)
+        n += 1
+        if occurrence is None:
+            continue
+        produced += 1
+        if rule.count is not None and produced > rule.count:
+            return
+        if rule.until is not None and occurrence > rule.until:
+            return
+        if occurrence >= window_end:
+            return
+        if occurrence + duration > window_start:
+            yield occurrence
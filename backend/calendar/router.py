@@ -1,153 +1,217 @@
-from fastapi import APIRouter, HTTPException
-from pydantic import BaseModel
+from fastapi import APIRouter, HTTPException, Depends, Header, Query, Response
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from typing import List, Optional
-from datetime import datetime
-from enum import Enum
+from datetime import datetime, timezone
+from itertools import islice
+from email.utils import format_datetime, parsedate_to_datetime
+from backend.core.database import get_async_db
+from backend.core.pagination import encode_cursor, decode_cursor
+from backend.calendar import booking, ical, models, recurrence
+from backend.calendar.schemas import Event, EventChanges, EventCreate, naive_utc
+from backend.calendar.service import active, event_service, touch
 
 router = APIRouter()
 
-class EventType(str, Enum):
-    MEETING = "Meeting"
-    MAINTENANCE = "Maintenance"
-    SOCIAL = "Social"
-    HOLIDAY = "Holiday"
-    OTHER = "Other"
-
-class EventBase(BaseModel):
-    title: str
-    description: Optional[str] = None
-    event_type: EventType
-    start_date: datetime
-    end_date: datetime
-    location: Optional[str] = None
-
-class Event(EventBase):
-    id: int
-    created_by: str
-
-class EventCreate(BaseModel):
-    title: str
-    description: Optional[str] = None
-    event_type: EventType
-    start_date: str  # ISO format string
-    end_date: str    # ISO format string
-    location: Optional[str] = None
-
-# Mock Database
-mock_events = [
-    {
-        "id": 1,
-        "title": "HOA Board Meeting",
-        "description": "Monthly board meeting to discuss community matters.",
-        "event_type": EventType.MEETING,
-        "start_date": datetime(2026, 1, 15, 18, 0),
-        "end_date": datetime(2026, 1, 15, 20, 0),
-        "location": "Community Center",
-        "created_by": "Board Admin"
-    },
-    {
-        "id": 2,
-        "title": "Pool Maintenance",
-        "description": "Annual pool cleaning and maintenance. Pool will be closed.",
-        "event_type": EventType.MAINTENANCE,
-        "start_date": datetime(2026, 1, 20, 8, 0),
-        "end_date": datetime(2026, 1, 22, 17, 0),
-        "location": "Community Pool",
-        "created_by": "Management"
-    },
-    {
-        "id": 3,
-        "title": "New Year's Day",
-        "description": "Office closed for holiday.",
-        "event_type": EventType.HOLIDAY,
-        "start_date": datetime(2026, 1, 1, 0, 0),
-        "end_date": datetime(2026, 1, 1, 23, 59),
-        "location": None,
-        "created_by": "System"
-    }
-]
-
-@router.get("/events", response_model=List[Event])
-async def get_events(start_date: Optional[str] = None, end_date: Optional[str] = None):
-    """Get all events, optionally filtered by date range"""
-    events = mock_events
-    
-    if start_date:
-        start_dt = datetime.fromisoformat(start_date)
-        events = [e for e in events if e["start_date"] >= start_dt]
-    
-    if end_date:
-        end_dt = datetime.fromisoformat(end_date)
-        events = [e for e in events if e["end_date"] <= end_dt]
-    
-    return events
+def _parse_range(start_date: Optional[str], end_date: Optional[str]):
+    try:
+        start_dt = naive_utc(datetime.fromisoformat(start_date)) if start_date else None
+        end_dt = naive_utc(datetime.fromisoformat(end_date)) if end_date else None
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid date format. Use ISO format (YYYY-MM-DDTHH:MM:SS).")
+    return start_dt, end_dt
 
-@router.post("/events", response_model=Event)
-async def create_event(event: EventCreate):
-    """Create new event (Board/Management only)"""
-    # Validate required fields
+def _validate(event: EventCreate):
+    """Parse and check an event payload; returns (start, end, rule text, series end)."""
     if not event.title or not event.title.strip():
         raise HTTPException(status_code=400, detail="Event title is required.")
     
     if not event.start_date or not event.end_date:
         raise HTTPException(status_code=400, detail="Start and end dates are required.")
     
-    # Parse dates
-    try:
-        start_dt = datetime.fromisoformat(event.start_date)
-        end_dt = datetime.fromisoformat(event.end_date)
-    except ValueError:
-        raise HTTPException(status_code=400, detail="Invalid date format. Use ISO format (YYYY-MM-DDTHH:MM:SS).")
+    start_dt, end_dt = _parse_range(event.start_date, event.end_date)
     
     # Validate end date is after start date
     if end_dt <= start_dt:
         raise HTTPException(status_code=400, detail="End date must be after start date.")
     
-    new_event = {
-        "id": len(mock_events) + 1,
-        "title": event.title,
-        "description": event.description,
-        "event_type": event.event_type,
-        "start_date": start_dt,
-        "end_date": end_dt,
-        "location": event.location,
-        "created_by": "Board Admin"  # In real app, get from auth context
-    }
-    mock_events.append(new_event)
+    if not event.recurrence:
+        return start_dt, end_dt, None, None
+    try:
+        rule = recurrence.parse_rule(event.recurrence)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=f"Invalid recurrence: {e}")
+    last_start = recurrence.last_start(rule, start_dt)
+    series_end = last_start + (end_dt - start_dt) if last_start else None
+    return start_dt, end_dt, recurrence.format_rule(rule), series_end
+
+async def _get_event(db: AsyncSession, event_id: int) -> models.CalendarEvent:
+    db_event = await db.get(models.CalendarEvent, event_id)
+    if not db_event or db_event.deleted_at is not None:
+        raise HTTPException(status_code=404, detail="Event not found")
+    return db_event
+
+async def _book_location(db: AsyncSession, db_event: models.CalendarEvent):
+    """Reserve the facility named by the event's location, if it names one."""
+    facility = await booking.facility_for_location(db, db_event.location)
+    if facility is None:
+        return
+    if not db_event.recurrence:
+        intervals = [(db_event.start_date, db_event.end_date)]
+    else:
+        if db_event.series_end is None:
+            raise HTTPException(status_code=400, detail="Recurring events at a facility need COUNT or UNTIL.")
+        duration = db_event.end_date - db_event.start_date
+        starts = list(islice(
+            recurrence.occurrences(
+                recurrence.parse_rule(db_event.recurrence),
+                db_event.start_date, db_event.end_date, db_event.start_date, db_event.series_end
+            ),
+            booking.MAX_SERIES_BOOKINGS + 1
+        ))
+        if len(starts) > booking.MAX_SERIES_BOOKINGS:
+            raise HTTPException(
+                status_code=400,
+                detail=f"Recurring events at a facility are limited to {booking.MAX_SERIES_BOOKINGS} occurrences."
+            )
+        intervals = [(start, start + duration) for start in starts]
+    await booking.reserve(db, facility, intervals, event_id=db_event.id)
+
+@router.get("/events", response_model=List[Event])
+async def get_events(start_date: Optional[str] = None, end_date: Optional[str] = None, db: AsyncSession = Depends(get_async_db)):
+    """Get all events, optionally those overlapping a date range"""
+    start_dt, end_dt = _parse_range(start_date, end_date)
+    return await event_service.query(db, start_dt, end_dt)
+
+@router.post("/events", response_model=Event)
+async def create_event(event: EventCreate, db: AsyncSession = Depends(get_async_db)):
+    """Create new event (Board/Management only)"""
+    start_dt, end_dt, rule, series_end = _validate(event)
+    
+    new_event = models.CalendarEvent(
+        title=event.title,
+        description=event.description,
+        event_type=event.event_type.value,
+        start_date=start_dt,
+        end_date=end_dt,
+        location=event.location,
+        created_by="Board Admin",  # In real app, get from auth context
+        recurrence=rule,
+        series_end=series_end
+    )
+    await touch(db, new_event)
+    db.add(new_event)
+    await db.flush()
+    await _book_location(db, new_event)
+    await db.commit()
     return new_event
 
 @router.put("/events/{event_id}", response_model=Event)
-async def update_event(event_id: int, event: EventCreate):
+async def update_event(event_id: int, event: EventCreate, db: AsyncSession = Depends(get_async_db)):
     """Update event (Board/Management only)"""
-    for e in mock_events:
-        if e["id"] == event_id:
-            # Validate dates
-            try:
-                start_dt = datetime.fromisoformat(event.start_date)
-                end_dt = datetime.fromisoformat(event.end_date)
-            except ValueError:
-                raise HTTPException(status_code=400, detail="Invalid date format.")
-            
-            if end_dt <= start_dt:
-                raise HTTPException(status_code=400, detail="End date must be after start date.")
-            
-            # Update event
-            e["title"] = event.title
-            e["description"] = event.description
-            e["event_type"] = event.event_type
-            e["start_date"] = start_dt
-            e["end_date"] = end_dt
-            e["location"] = event.location
-            return e
+    db_event = await _get_event(db, event_id)
+    start_dt, end_dt, rule, series_end = _validate(event)
     
-    raise HTTPException(status_code=404, detail="Event not found")
+    db_event.title = event.title
+    db_event.description = event.description
+    db_event.event_type = event.event_type.value
+    db_event.start_date = start_dt
+    db_event.end_date = end_dt
+    db_event.location = event.location
+    db_event.recurrence = rule
+    db_event.series_end = series_end
+    await touch(db, db_event)
+    await booking.release_event(db, event_id)
+    await _book_location(db, db_event)
+    await db.commit()
+    return db_event
 
 @router.delete("/events/{event_id}")
-async def delete_event(event_id: int):
+async def delete_event(event_id: int, db: AsyncSession = Depends(get_async_db)):
     """Delete event (Board/Management only)"""
-    for i, e in enumerate(mock_events):
-        if e["id"] == event_id:
-            deleted_event = mock_events.pop(i)
-            return {"message": f"Event '{deleted_event['title']}' deleted successfully."}
+    db_event = await _get_event(db, event_id)
+    
+    # Keep a tombstone so sync clients see the deletion
+    await touch(db, db_event)
+    db_event.deleted_at = db_event.updated_at
+    await booking.release_event(db, event_id)
+    await db.commit()
+    return {"message": f"Event '{db_event.title}' deleted successfully."}
+
+# Subscription feed. Calendar apps poll it every few minutes; the revision of
+# the latest write is the ETag, so unchanged polls are answered with a 304
+# from a single index lookup, and the rendered body is reused until the next
+# write.
+_feed_cache = {"revision": None, "body": None}
+
+def _etag_matches(if_none_match: str, etag: str) -> bool:
+    tags = [tag.strip() for tag in if_none_match.split(",")]
+    return "*" in tags or any(tag.removeprefix("W/") == etag for tag in tags)
+
+def _not_modified_since(if_modified_since: str, last_modified: datetime) -> bool:
+    try:
+        since = parsedate_to_datetime(if_modified_since)
+    except (TypeError, ValueError):
+        return False
+    if since.tzinfo is not None:
+        since = since.replace(tzinfo=None) - since.utcoffset()
+    return last_modified <= since
+
+@router.get("/feed.ics")
+async def get_feed(
+    if_none_match: Optional[str] = Header(None),
+    if_modified_since: Optional[str] = Header(None),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """iCalendar subscription feed with conditional GET"""
+    revision, last_modified = await event_service.latest(db)
+    last_modified = last_modified or datetime(1970, 1, 1)
+    headers = {
+        "ETag": f'"{revision}"',
+        "Last-Modified": format_datetime(last_modified.replace(microsecond=0, tzinfo=timezone.utc), usegmt=True),
+        "Cache-Control": "no-cache",
+    }
+    
+    if if_none_match is not None:
+        if _etag_matches(if_none_match, headers["ETag"]):
+            return Response(status_code=304, headers=headers)
+    elif if_modified_since and _not_modified_since(if_modified_since, last_modified):
+        return Response(status_code=304, headers=headers)
+    
+    if _feed_cache["revision"] != revision:
+        events = (await db.execute(
+            select(models.CalendarEvent).where(active()).order_by(models.CalendarEvent.start_date)
+        )).scalars().all()
+        _feed_cache["body"] = ical.render_calendar(events).encode()
+        _feed_cache["revision"] = revision
+    return Response(content=_feed_cache["body"], media_type="text/calendar", headers=headers)
+
+def _decode_sync_token(sync_token: Optional[str]) -> int:
+    values = decode_cursor(sync_token, int)
+    return values[0] if values else 0
+
+@router.get("/events/changes", response_model=EventChanges)
+async def get_event_changes(
+    sync_token: Optional[str] = None,
+    limit: int = Query(500, ge=1, le=5000),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Events changed since a sync token; without a token, a full initial sync"""
+    since = _decode_sync_token(sync_token)
+    query = select(models.CalendarEvent).where(models.CalendarEvent.revision > since)
+    if not since:
+        # A fresh client has nothing to delete
+        query = query.where(active())
+    rows = (await db.execute(
+        query.order_by(models.CalendarEvent.revision).limit(limit + 1)
+    )).scalars().all()
     
-    raise HTTPException(status_code=404, detail="Event not found")
+    more = len(rows) > limit
+    rows = rows[:limit]
+    latest = rows[-1].revision if rows else since
+    return EventChanges(
+        sync_token=encode_cursor(latest),
+        changed=[Event.from_orm(e) for e in rows if e.deleted_at is None],
+        deleted=[e.id for e in rows if e.deleted_at is not None],
+        more=more
+    )
@@ -0,0 +1,78 @@
+from pydantic import BaseModel, validator
+from typing import List, Optional
+from datetime import datetime
+from enum import Enum
+
+def naive_utc(value: Optional[datetime]) -> Optional[datetime]:
+    """Datetimes are stored naive; one with an offset is converted to UTC."""
+    if value is None or value.tzinfo is None:
+        return value
+    return value.replace(tzinfo=None) - value.utcoffset()
+
+class EventType(str, Enum):
+    MEETING = "Meeting"
+    MAINTENANCE = "Maintenance"
+    SOCIAL = "Social"
+    HOLIDAY = "Holiday"
+    OTHER = "Other"
+
+class EventBase(BaseModel):
+    title: str
+    description: Optional[str] = None
+    event_type: EventType
+    start_date: datetime
+    end_date: datetime
+    location: Optional[str] = None
+
+class Event(EventBase):
+    id: int
+    created_by: str
+    recurrence: Optional[str] = None
+    recurrence_id: Optional[datetime] = None # Occurrence start, for expanded recurring events
+
+    class Config:
+        orm_mode = True
+
+class EventCreate(BaseModel):
+    title: str
+    description: Optional[str] = None
+    event_type: EventType
+    start_date: str  # ISO format string
+    end_date: str    # ISO format string
+    location: Optional[str] = None
+    recurrence: Optional[str] = None # RRULE subset, e.g. "FREQ=WEEKLY" or "FREQ=MONTHLY;UNTIL=20261231"
+
+class EventChanges(BaseModel):
+    sync_token: str # Pass back as ?sync_token= on the next poll
+    changed: List[Event] # Created or updated since the token; recurring events unexpanded
+    deleted: List[int] # Ids of events deleted since the token
+    more: bool = False # True if the page was cut at limit; poll again with the new token
+
+class FacilityCreate(BaseModel):
+    name: str
+    description: Optional[str] = None
+
+class Facility(FacilityCreate):
+    id: int
+
+    class Config:
+        orm_mode = True
+
+class ReservationCreate(BaseModel):
+    start_date: datetime
+    end_date: datetime
+
+    _naive_utc = validator("start_date", "end_date", allow_reuse=True)(naive_utc)
+
+class Reservation(ReservationCreate):
+    id: int
+    facility_id: int
+    user_id: Optional[int] = None
+    event_id: Optional[int] = None
+
+    class Config:
+        orm_mode = True
+
+class FreeSlot(BaseModel):
+    start_date: datetime
+    end_date: datetime
@@ -0,0 +1,128 @@
+import bisect
+from datetime import datetime, timedelta
+from typing import List, Optional, Tuple
+from sqlalchemy import and_, func, or_, select
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.ext.asyncio import AsyncSession
+from backend.calendar import models, recurrence
+from backend.calendar.schemas import Event
+
+# The one event store. The calendar and community routers both read through
+# event_service; every write goes through touch(), which bumps the calendar
+# revision. Cached views are keyed by that revision, so a write anywhere (in
+# any worker) invalidates them on the next read.
+
+# How far ahead open-ended recurring events are expanded when only a
+# start_date is given
+DEFAULT_EXPANSION = timedelta(days=366)
+# The upcoming view is also rebuilt once it is this old, so that its
+# expansion horizon keeps moving forward with the clock
+UPCOMING_MAX_AGE = timedelta(days=1)
+
+def active():
+    return models.CalendarEvent.deleted_at.is_(None)
+
+async def _next_revision(db: AsyncSession) -> int:
+    """Bump the calendar revision counter inside the caller's transaction.
+
+    The counter row stays locked until commit, so revisions become visible
+    in order and a sync token never skips a slower concurrent write.
+    """
+    counter = models.CalendarRevision
+    insert = postgresql.insert if db.bind.dialect.name == "postgresql" else sqlite.insert
+    # One upsert, so concurrent first writers cannot both insert the row;
+    # the counter is seeded from the revisions already handed out
+    seed = select(func.coalesce(func.max(models.CalendarEvent.revision), 0) + 1).scalar_subquery()
+    return (await db.execute(
+        insert(counter)
+        .values(id=1, value=seed)
+        .on_conflict_do_update(index_elements=["id"], set_={"value": counter.value + 1})
+        .returning(counter.value)
+    )).scalar_one()
+
+async def touch(db: AsyncSession, event: models.CalendarEvent):
+    """Stamp a created, updated or deleted event with the next revision."""
+    event.revision = await _next_revision(db)
+    # UTC, because it is served as an HTTP date
+    event.updated_at = datetime.utcnow().replace(microsecond=0)
+
+def expand(event: models.CalendarEvent, window_start: datetime, window_end: datetime) -> List[dict]:
+    """Occurrences of a recurring event that overlap the window."""
+    rule = recurrence.parse_rule(event.recurrence)
+    duration = event.end_date - event.start_date
+    base = Event.from_orm(event).dict()
+    return [
+        dict(base, start_date=start, end_date=start + duration, recurrence_id=start)
+        for start in recurrence.occurrences(rule, event.start_date, event.end_date, window_start, window_end)
+    ]
+
+class EventService:
+    def __init__(self):
+        # (revision, built_at, occurrence starts, occurrences), sorted by start
+        self._upcoming: Optional[Tuple[int, datetime, List[datetime], List[dict]]] = None
+
+    async def latest(self, db: AsyncSession) -> Tuple[int, Optional[datetime]]:
+        """Revision and timestamp of the most recent write (index lookup)."""
+        row = (await db.execute(
+            select(models.CalendarEvent.revision, models.CalendarEvent.updated_at)
+            .where(models.CalendarEvent.revision.is_not(None))
+            .order_by(models.CalendarEvent.revision.desc())
+            .limit(1)
+        )).first()
+        return (row.revision, row.updated_at) if row else (0, None)
+
+    async def query(self, db: AsyncSession, start_dt: Optional[datetime], end_dt: Optional[datetime]) -> List[dict]:
+        """Events overlapping [start_dt, end_dt), recurring ones expanded in the window.
+
+        Without any bound, recurring events are returned once, as their rule.
+        """
+        if start_dt is None and end_dt is None:
+            events = (await db.execute(
+                select(models.CalendarEvent).where(active()).order_by(models.CalendarEvent.start_date)
+            )).scalars().all()
+            return [Event.from_orm(e).dict() for e in events]
+
+        conditions = [active()]
+        if end_dt is not None:
+            conditions.append(models.CalendarEvent.start_date < end_dt)
+        if start_dt is not None:
+            conditions.append(or_(
+                models.CalendarEvent.end_date > start_dt,
+                and_(
+                    models.CalendarEvent.recurrence.is_not(None),
+                    or_(models.CalendarEvent.series_end.is_(None), models.CalendarEvent.series_end > start_dt)
+                )
+            ))
+        events = (await db.execute(
+            select(models.CalendarEvent).where(*conditions).order_by(models.CalendarEvent.start_date)
+        )).scalars().all()
+
+        window_start = start_dt or min((e.start_date for e in events), default=datetime.min)
+        window_end = end_dt or window_start + DEFAULT_EXPANSION
+        results = []
+        for event in events:
+            if event.recurrence:
+                results.extend(expand(event, window_start, window_end))
+            else:
+                results.append(Event.from_orm(event).dict())
+        results.sort(key=lambda e: e["start_date"])
+        return results
+
+    async def upcoming(self, db: AsyncSession, limit: int, now: Optional[datetime] = None) -> List[dict]:
+        """The next `limit` occurrences starting at or after now.
+
+        Served from a pre-sorted view: a bisect plus an O(limit) slice. The
+        view is rebuilt only after a write or once it is a day old.
+        """
+        now = now or datetime.now()
+        revision, _ = await self.latest(db)
+        view = self._upcoming
+        if view is None or view[0] != revision or now - view[1] > UPCOMING_MAX_AGE or now < view[1]:
+            occurrences = await self.query(db, now, now + DEFAULT_EXPANSION)
+            view = (revision, now, [e["start_date"] for e in occurrences], occurrences)
+            self._upcoming = view
+        _, _, starts, occurrences = view
+        first = bisect.bisect_left(starts, now)
+        return occurrences[first:first + limit]
+
+event_service = EventService()
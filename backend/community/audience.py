@@ -0,0 +1,150 @@
+import csv
+import io
+import re
+from typing import AsyncIterator, Dict, FrozenSet, Iterable, Optional
+from fastapi import HTTPException
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from backend.core.database import AsyncSessionLocal
+from backend.community import models
+
+# Communication preferences are stored as a bitmask (preference_flags). With
+# ten channels there are only 1024 possible masks, so an audience expression
+# such as "billing_paper AND NOT billing_email" is resolved as set operations
+# over masks in memory, and the matching residents are then an indexed
+# `preference_flags IN (...)` lookup. Counts come from a per-mask histogram.
+
+# Bit positions are persisted; append new channels, never reorder
+CHANNELS = [
+    "general_email",
+    "general_paper",
+    "ccr_email",
+    "ccr_paper",
+    "collection_email",
+    "collection_paper",
+    "billing_email",
+    "billing_paper",
+    "mgmt_committee_notifications",
+    "phone_communications",
+]
+BITS = {channel: 1 << i for i, channel in enumerate(CHANNELS)}
+ALL_MASKS = frozenset(range(1 << len(CHANNELS)))
+BATCH_SIZE = 1000
+
+def to_flags(preferences: dict) -> int:
+    return sum(bit for channel, bit in BITS.items() if preferences.get(channel))
+
+def from_flags(flags: Optional[int]) -> dict:
+    flags = flags or 0
+    return {channel: bool(flags & bit) for channel, bit in BITS.items()}
+
+def _masks_with(channel: str) -> FrozenSet[int]:
+    bit = BITS[channel]
+    return frozenset(mask for mask in ALL_MASKS if mask & bit)
+
+class _Parser:
+    """expr := term (OR term)*; term := factor (AND factor)*;
+    factor := NOT factor | '(' expr ')' | channel"""
+
+    def __init__(self, text: str):
+        self.tokens = re.findall(r"\(|\)|[A-Za-z_]+", text)
+        if "".join(self.tokens) != re.sub(r"\s+", "", text):
+            raise HTTPException(status_code=400, detail="Invalid audience expression")
+        self.position = 0
+
+    def _peek(self) -> Optional[str]:
+        return self.tokens[self.position] if self.position < len(self.tokens) else None
+
+    def _take(self) -> str:
+        token = self._peek()
+        if token is None:
+            raise HTTPException(status_code=400, detail="Incomplete audience expression")
+        self.position += 1
+        return token
+
+    def parse(self) -> FrozenSet[int]:
+        masks = self._expr()
+        if self._peek() is not None:
+            raise HTTPException(status_code=400, detail=f"Unexpected '{self._peek()}' in audience expression")
+        return masks
+
+    def _expr(self) -> FrozenSet[int]:
+        masks = self._term()
+        while (self._peek() or "").upper() == "OR":
+            self._take()
+            masks = masks | self._term()
+        return masks
+
+    def _term(self) -> FrozenSet[int]:
+        masks = self._factor()
+        while (self._peek() or "").upper() == "AND":
+            self._take()
+            masks = masks & self._factor()
+        return masks
+
+    def _factor(self) -> FrozenSet[int]:
+        token = self._take()
+        if token.upper() == "NOT":
+            return ALL_MASKS - self._factor()
+        if token == "(":
+            masks = self._expr()
+            if self._take() != ")":
+                raise HTTPException(status_code=400, detail="Missing ')' in audience expression")
+            return masks
+        channel = token.lower()
+        if channel not in BITS:
+            raise HTTPException(
+                status_code=400,
+                detail=f"Unknown channel '{token}'. Channels: {', '.join(CHANNELS)}"
+            )
+        return _masks_with(channel)
+
+def parse_audience(expression: str) -> FrozenSet[int]:
+    """The set of preference masks an audience expression matches."""
+    return _Parser(expression).parse()
+
+async def histogram(db: AsyncSession) -> Dict[int, int]:
+    """Residents per preference mask (an index-only GROUP BY)."""
+    rows = await db.execute(
+        select(models.DirectoryProfile.preference_flags, func.count())
+        .group_by(models.DirectoryProfile.preference_flags)
+    )
+    return {flags or 0: count for flags, count in rows}
+
+def count(counts: Dict[int, int], masks: FrozenSet[int]) -> int:
+    return sum(n for flags, n in counts.items() if flags in masks)
+
+def channel_counts(counts: Dict[int, int]) -> Dict[str, int]:
+    return {
+        channel: sum(n for flags, n in counts.items() if flags & bit)
+        for channel, bit in BITS.items()
+    }
+
+def _in_audience(masks: FrozenSet[int]):
+    # Whichever of the set or its complement is smaller, so the IN list stays
+    # at most 512 values
+    flags = models.DirectoryProfile.preference_flags
+    if len(masks) <= len(ALL_MASKS) // 2:
+        return flags.in_(sorted(masks))
+    return flags.not_in(sorted(ALL_MASKS - masks))
+
+def _csv_chunk(rows: Iterable[Iterable]) -> str:
+    buffer = io.StringIO()
+    csv.writer(buffer).writerows(rows)
+    return buffer.getvalue()
+
+async def recipients_csv(masks: FrozenSet[int]) -> AsyncIterator[str]:
+    """Stream the audience as CSV, one batch of rows at a time."""
+    yield _csv_chunk([["id", "name", "email", "phone", "address"]])
+    if not masks:
+        return
+    profile = models.DirectoryProfile
+    async with AsyncSessionLocal() as db:
+        result = await db.stream(
+            select(profile.id, profile.name, profile.email, profile.phone, profile.address)
+            .where(_in_audience(masks))
+            .order_by(profile.preference_flags, profile.id)
+            .execution_options(yield_per=BATCH_SIZE)
+        )
+        async for rows in result.partitions():
+            yield _csv_chunk(rows)
@@ -0,0 +1,125 @@
+import re
+from typing import List, Optional, Sequence
+from fastapi import HTTPException
+from sqlalchemy import and_, func, literal_column, or_, select, text, tuple_
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.engine import Engine
+from sqlalchemy.ext.asyncio import AsyncSession
+from backend.community import audience, models
+
+# Directory search: prefix matching on every word of the query against the
+# full-text index (see models), keyset pagination by (name, id), and column
+# projection so a page only reads and ships the fields the client asked for.
+
+PUBLIC_FIELDS = ("name", "address", "email", "phone", "bio")
+BOARD_FIELDS = PUBLIC_FIELDS + ("is_opted_in", "preferences")
+
+def parse_fields(fields: Optional[str], allowed: Sequence[str]) -> List[str]:
+    if not fields:
+        return list(allowed)
+    requested = [f.strip() for f in fields.split(",") if f.strip()]
+    unknown = [f for f in requested if f not in allowed and f != "id"]
+    if unknown:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Unknown fields: {', '.join(unknown)}. Allowed: {', '.join(allowed)}"
+        )
+    return [f for f in allowed if f in requested]
+
+def _column(field: str):
+    if field == "preferences":
+        return models.DirectoryProfile.preference_flags.label("preferences")
+    return getattr(models.DirectoryProfile, field)
+
+def project(row, fields: List[str]) -> dict:
+    """A response dict holding the id plus only the requested fields."""
+    projected = {"id": row.id}
+    for field in fields:
+        value = getattr(row, field)
+        projected[field] = audience.from_flags(value) if field == "preferences" else value
+    return projected
+
+def _terms(q: str) -> List[str]:
+    # Words only: the query syntax of FTS5 / to_tsquery is never exposed
+    return re.findall(r"\w+", q.lower())
+
+def _match(dialect: str, terms: List[str]):
+    """WHERE clause for rows matching every term as a prefix."""
+    if dialect == "sqlite":
+        expression = " ".join(f'"{term}"*' for term in terms)
+        return models.DirectoryProfile.id.in_(
+            select(literal_column("rowid")).select_from(text("directory_fts"))
+            .where(text("directory_fts MATCH :directory_query").bindparams(directory_query=expression))
+        )
+    if dialect == "postgresql":
+        expression = " & ".join(f"{term}:*" for term in terms)
+        return literal_column("directory_profiles.search_vector").op("@@")(func.to_tsquery("simple", expression))
+    # No full-text support: substring scan
+    return and_(*[
+        or_(*[column.ilike(f"%{term}%") for column in (
+            models.DirectoryProfile.name, models.DirectoryProfile.address, models.DirectoryProfile.bio
+        )])
+        for term in terms
+    ])
+
+async def search(
+    db: AsyncSession,
+    fields: List[str],
+    q: Optional[str] = None,
+    opted_in_only: bool = True,
+    after: Optional[tuple] = None,
+    limit: int = 50
+) -> list:
+    """One page of profiles ordered by (name, id), as rows of the projected columns."""
+    columns = [models.DirectoryProfile.id, models.DirectoryProfile.name] + [
+        _column(f) for f in fields if f != "name"
+    ]
+    query = select(*columns)
+    if opted_in_only:
+        query = query.where(models.DirectoryProfile.is_opted_in.is_(True))
+    terms = _terms(q) if q else []
+    if terms:
+        query = query.where(_match(db.bind.dialect.name, terms))
+    if after:
+        query = query.where(tuple_(models.DirectoryProfile.name, models.DirectoryProfile.id) > tuple_(*after))
+    query = query.order_by(models.DirectoryProfile.name, models.DirectoryProfile.id).limit(limit)
+    return (await db.execute(query)).all()
+
+def _preferences(*channels: str) -> int:
+    return audience.to_flags({channel: True for channel in channels})
+
+# The demo community; profile 1 is the resident the pages act as, until there is auth
+DEMO_PROFILES = [
+    {
+        "id": 1, "name": "John Doe", "address": "123 Maple St, Unit 4B",
+        "email": "john.doe@example.com", "phone": "(555) 123-4567",
+        "bio": "Loves gardening and board games.", "is_opted_in": True,
+        "preference_flags": _preferences(
+            "general_email", "ccr_email", "collection_email", "collection_paper", "billing_email",
+            "mgmt_committee_notifications"
+        ),
+    },
+    {
+        "id": 2, "name": "Jane Smith", "address": "125 Maple St",
+        "email": "jane@hoa.com", "phone": "555-0200",
+        "bio": "Board President.", "is_opted_in": True,
+        "preference_flags": _preferences(
+            "general_email", "ccr_email", "collection_paper", "billing_email",
+            "mgmt_committee_notifications", "phone_communications"
+        ),
+    },
+    {
+        "id": 3, "name": "Bob Wilson", "address": "127 Maple St",
+        "email": "bob@example.com", "phone": None,
+        "bio": None, "is_opted_in": False,
+        "preference_flags": _preferences("general_paper", "ccr_paper", "collection_paper", "billing_paper"),
+    },
+]
+
+def seed_demo_directory(engine: Engine):
+    """Add the demo residents to a database that has no directory profiles yet."""
+    insert = postgresql.insert if engine.dialect.name == "postgresql" else sqlite.insert
+    with engine.begin() as conn:
+        if conn.scalar(select(models.DirectoryProfile.id).limit(1)) is None:
+            # Another process may be seeding too
+            conn.execute(insert(models.DirectoryProfile).values(DEMO_PROFILES).on_conflict_do_nothing())
@@ -0,0 +1,64 @@
+from sqlalchemy import Column, Integer, String, Boolean, Index, DDL, event
+from backend.core.database import Base
+
+class DirectoryProfile(Base):
+    __tablename__ = "directory_profiles"
+    __table_args__ = (
+        # Directory pages are keyset-paginated by (name, id)
+        Index("ix_directory_profiles_opted_in_name", "is_opted_in", "name", "id"),
+        Index("ix_directory_profiles_name", "name", "id"),
+        # Audience lookups: preference_flags IN (masks matching the audience)
+        Index("ix_directory_profiles_preference_flags", "preference_flags", "id"),
+    )
+
+    id = Column(Integer, primary_key=True, index=True) # Same as the user's id
+    name = Column(String, nullable=False)
+    address = Column(String, nullable=False)
+    email = Column(String, nullable=False)
+    phone = Column(String, nullable=True)
+    bio = Column(String, nullable=True)
+    is_opted_in = Column(Boolean, nullable=False, default=False)
+    mailing_address = Column(String, nullable=True) # If mail should not go to the residence
+    # CommunicationPreferences as a bitmask, one bit per channel (see audience.CHANNELS)
+    preference_flags = Column(Integer, nullable=True, default=0)
+
+# Full-text index over name, address and bio, maintained by the database:
+# an external-content FTS5 table kept in sync by triggers on SQLite, a
+# generated tsvector column with a GIN index on Postgres. Both are created
+# together with the table.
+_SQLITE_FTS = [
+    """
+    CREATE VIRTUAL TABLE directory_fts USING fts5(
+        name, address, bio,
+        content='directory_profiles', content_rowid='id', prefix='2 3'
+    )
+    """,
+    """
+    CREATE TRIGGER directory_fts_insert AFTER INSERT ON directory_profiles BEGIN
+        INSERT INTO directory_fts(rowid, name, address, bio) VALUES (new.id, new.name, new.address, new.bio);
+    END
+    """,
+    """
+    CREATE TRIGGER directory_fts_delete AFTER DELETE ON directory_profiles BEGIN
+        INSERT INTO directory_fts(directory_fts, rowid, name, address, bio) VALUES ('delete', old.id, old.name, old.address, old.bio);
+    END
+    """,
+    """
+    CREATE TRIGGER directory_fts_update AFTER UPDATE OF name, address, bio ON directory_profiles BEGIN
+        INSERT INTO directory_fts(directory_fts, rowid, name, address, bio) VALUES ('delete', old.id, old.name, old.address, old.bio);
+        INSERT INTO directory_fts(rowid, name, address, bio) VALUES (new.id, new.name, new.address, new.bio);
+    END
+    """,
+]
+_POSTGRES_FTS = [
+    """
+    ALTER TABLE directory_profiles ADD COLUMN search_vector tsvector GENERATED ALWAYS AS (
+        to_tsvector('simple', coalesce(name, '') || ' ' || coalesce(address, '') || ' ' || coalesce(bio, ''))
+    ) STORED
+    """,
+    "CREATE INDEX ix_directory_profiles_search ON directory_profiles USING GIN (search_vector)",
+]
+for statement in _SQLITE_FTS:
+    event.listen(DirectoryProfile.__table__, "after_create", DDL(statement).execute_if(dialect="sqlite"))
+for statement in _POSTGRES_FTS:
+    event.listen(DirectoryProfile.__table__, "after_create", DDL(statement).execute_if(dialect="postgresql"))
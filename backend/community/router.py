@@ -1,17 +1,18 @@
-from fastapi import APIRouter, HTTPException, Depends
+from fastapi import APIRouter, HTTPException, Depends, Query, Response
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
+from sqlalchemy.ext.asyncio import AsyncSession
+from backend.core.database import get_async_db
+from backend.core.pagination import NEXT_CURSOR_HEADER, decode_cursor, encode_cursor
+from backend.community import audience, directory, models
+from backend.calendar.schemas import EventType
+from backend.calendar.service import event_service
 from backend.user.router import CommunicationPreferences
-from typing import List, Optional
-from datetime import datetime, timedelta
-from enum import Enum
+from typing import Dict, List, Optional
+from datetime import datetime
 
 router = APIRouter()
 
-class EventType(str, Enum):
-    MEETING = "Meeting"
-    SOCIAL = "Social"
-    MAINTENANCE = "Maintenance"  # e.g., Trash Pickup
-
 class Event(BaseModel):
     id: int
     title: str
@@ -21,116 +22,145 @@ class Event(BaseModel):
     location: Optional[str] = None
 
 class DirectoryProfile(BaseModel):
+    # Fields not requested via `fields` are left out of the response
     id: int
-    name: str # From User
+    name: Optional[str] = None # From User
+    address: Optional[str] = None
+    email: Optional[str] = None
+    phone: Optional[str] = None
+    bio: Optional[str] = None
+    is_opted_in: Optional[bool] = None
+    preferences: Optional[CommunicationPreferences] = None
+
+class AudienceCounts(BaseModel):
+    expression: Optional[str] = None
+    count: Optional[int] = None # Residents matching the expression
+    total: int
+    channels: Dict[str, int] # Residents opted into each channel
+
+class DirectoryProfileUpdate(BaseModel):
+    name: str
     address: str
     email: str
     phone: Optional[str] = None
     bio: Optional[str] = None
-    is_opted_in: bool
     preferences: Optional[CommunicationPreferences] = None
 
-# Mock Database
-mock_events = [
-    {
-        "id": 1,
-        "title": "Annual Board Meeting",
-        "date": datetime.now() + timedelta(days=5),
-        "description": "Election of new officers.",
-        "type": EventType.MEETING,
-        "location": "Community Hall"
-    },
-    {
-        "id": 2,
-        "title": "Trash Pickup",
-        "date": datetime.now() + timedelta(days=1),
-        "description": "Regular weekly pickup.",
-        "type": EventType.MAINTENANCE,
-        "location": "Curbside"
-    },
-    {
-        "id": 3,
-        "title": "Summer BBQ",
-        "date": datetime.now() + timedelta(days=20),
-        "description": "Burgers and hot dogs provided!",
-        "type": EventType.SOCIAL,
-        "location": "Pool Area"
-    }
-]
-
-mock_directory = [
-    {
-        "id": 1,
-        "name": "John Doe",
-        "address": "123 Maple St",
-        "email": "john@example.com",
-        "phone": "555-0100",
-        "bio": "Loves gardening and board games.",
-        "is_opted_in": True,
-        "preferences": {
-            "general_email": True, "general_paper": False,
-            "ccr_email": True, "ccr_paper": False,
-            "collection_email": True, "collection_paper": True,
-            "billing_email": True, "billing_paper": False,
-            "mgmt_committee_notifications": True,
-            "phone_communications": False
-        }
-    },
-    {
-        "id": 2,
-        "name": "Jane Smith",
-        "address": "125 Maple St",
-        "email": "jane@hoa.com",
-        "phone": "555-0200",
-        "bio": "Board President.",
-        "is_opted_in": True,
-        "preferences": {
-            "general_email": True, "general_paper": False,
-            "ccr_email": True, "ccr_paper": False,
-            "collection_email": False, "collection_paper": True,
-            "billing_email": True, "billing_paper": False,
-            "mgmt_committee_notifications": True,
-            "phone_communications": True
-        }
-    },
-    {
-        "id": 3,
-        "name": "Bob Wilson",
-        "address": "127 Maple St",
-        "email": "bob@example.com",
-        "phone": None,
-        "bio": None,
-        "is_opted_in": False, # Should not be returned in public list normally, mocked logic below
-        "preferences": {
-            "general_email": False, "general_paper": True,
-            "ccr_email": False, "ccr_paper": True,
-            "collection_email": False, "collection_paper": True,
-            "billing_email": False, "billing_paper": True,
-            "mgmt_committee_notifications": False,
-            "phone_communications": False
+@router.get("/events", response_model=List[Event])
+async def get_events(limit: int = Query(20, ge=1, le=200), db: AsyncSession = Depends(get_async_db)):
+    """Upcoming events from the community calendar"""
+    return [
+        {
+            "id": e["id"],
+            "title": e["title"],
+            "date": e["start_date"],
+            "description": e["description"] or "",
+            "type": e["event_type"],
+            "location": e["location"],
         }
-    }
-]
+        for e in await event_service.upcoming(db, limit)
+    ]
 
-@router.get("/events", response_model=List[Event])
-async def get_events():
-    return sorted(mock_events, key=lambda x: x["date"])
+def _profile(db_profile: models.DirectoryProfile) -> DirectoryProfile:
+    return DirectoryProfile(
+        id=db_profile.id,
+        name=db_profile.name,
+        address=db_profile.address,
+        email=db_profile.email,
+        phone=db_profile.phone,
+        bio=db_profile.bio,
+        is_opted_in=db_profile.is_opted_in,
+        preferences=audience.from_flags(db_profile.preference_flags)
+    )
+
+def _page(response: Response, rows: list, fields: List[str], limit: int) -> List[dict]:
+    if len(rows) == limit:
+        response.headers[NEXT_CURSOR_HEADER] = encode_cursor(rows[-1].name, rows[-1].id)
+    return [directory.project(row, fields) for row in rows]
 
-@router.get("/directory", response_model=List[DirectoryProfile])
-async def get_directory():
-    # Filter for opted-in users
-    return [p for p in mock_directory if p["is_opted_in"]]
+@router.get("/directory", response_model=List[DirectoryProfile], response_model_exclude_unset=True)
+async def get_directory(
+    response: Response,
+    q: Optional[str] = None,
+    fields: Optional[str] = None,
+    cursor: Optional[str] = None,
+    limit: int = Query(50, ge=1, le=200),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Opted-in residents, by name. `q` prefix-matches name, address and bio;
+    `fields` is a comma-separated projection. Pass X-Next-Cursor back as `cursor`."""
+    selected = directory.parse_fields(fields, directory.PUBLIC_FIELDS)
+    rows = await directory.search(db, selected, q, opted_in_only=True, after=decode_cursor(cursor, str, int), limit=limit)
+    return _page(response, rows, selected, limit)
 
-@router.get("/all-residents", response_model=List[DirectoryProfile])
-async def get_all_residents():
+@router.get("/all-residents", response_model=List[DirectoryProfile], response_model_exclude_unset=True)
+async def get_all_residents(
+    response: Response,
+    q: Optional[str] = None,
+    fields: Optional[str] = None,
+    cursor: Optional[str] = None,
+    limit: int = Query(50, ge=1, le=200),
+    db: AsyncSession = Depends(get_async_db)
+):
     # Board only - returns everyone plus preferences
-    return mock_directory
-
-@router.post("/directory/opt-in")
-async def toggle_opt_in(user_id: int, status: bool):
-    # Mock update
-    for p in mock_directory:
-        if p["id"] == user_id:
-            p["is_opted_in"] = status
-            return p
-    raise HTTPException(status_code=404, detail="User not found")
+    selected = directory.parse_fields(fields, directory.BOARD_FIELDS)
+    rows = await directory.search(db, selected, q, opted_in_only=False, after=decode_cursor(cursor, str, int), limit=limit)
+    return _page(response, rows, selected, limit)
+
+@router.get("/directory/profile", response_model=DirectoryProfile)
+async def get_own_profile(user_id: int = 1, db: AsyncSession = Depends(get_async_db)):
+    """The caller's directory profile, listed or not"""
+    db_profile = await db.get(models.DirectoryProfile, user_id)
+    if not db_profile:
+        raise HTTPException(status_code=404, detail="User not found")
+    return _profile(db_profile)
+
+@router.put("/directory/profile", response_model=DirectoryProfile)
+async def save_profile(profile: DirectoryProfileUpdate, user_id: int = 1, db: AsyncSession = Depends(get_async_db)):
+    """Create or update the caller's directory profile"""
+    db_profile = await db.get(models.DirectoryProfile, user_id)
+    if not db_profile:
+        db_profile = models.DirectoryProfile(id=user_id, is_opted_in=False)
+        db.add(db_profile)
+    db_profile.name = profile.name
+    db_profile.address = profile.address
+    db_profile.email = profile.email
+    db_profile.phone = profile.phone
+    db_profile.bio = profile.bio
+    if profile.preferences is not None:
+        db_profile.preference_flags = audience.to_flags(profile.preferences.dict())
+    await db.commit()
+    return _profile(db_profile)
+
+@router.post("/directory/opt-in", response_model=DirectoryProfile)
+async def toggle_opt_in(user_id: int, status: bool, db: AsyncSession = Depends(get_async_db)):
+    db_profile = await db.get(models.DirectoryProfile, user_id)
+    if not db_profile:
+        raise HTTPException(status_code=404, detail="User not found")
+    db_profile.is_opted_in = status
+    await db.commit()
+    return _profile(db_profile)
+
+# --- Audiences (Board/Management): who gets a mailing on which channel ---
+
+@router.get("/audience", response_model=AudienceCounts)
+async def get_audience_counts(expression: Optional[str] = None, db: AsyncSession = Depends(get_async_db)):
+    """Residents per channel and, e.g. for "billing_paper AND NOT billing_email", in the audience"""
+    masks = audience.parse_audience(expression) if expression else None
+    counts = await audience.histogram(db)
+    return AudienceCounts(
+        expression=expression,
+        count=audience.count(counts, masks) if masks is not None else None,
+        total=sum(counts.values()),
+        channels=audience.channel_counts(counts)
+    )
+
+@router.get("/audience/recipients")
+async def export_audience(expression: str):
+    """Stream the audience's mailing list as CSV"""
+    masks = audience.parse_audience(expression)
+    return StreamingResponse(
+        audience.recipients_csv(masks),
+        media_type="text/csv",
+        headers={"Content-Disposition": 'attachment; filename="recipients.csv"'}
+    )
@@ -0,0 +1,70 @@
+from sqlalchemy import inspect, text
+from sqlalchemy.engine import Engine
+from backend.core.database import Base
+
+# create_all() only creates missing tables; it never adds columns or indexes
+# to tables that already exist. Statements listed here run once, right before
+# the named index is built, so that existing data satisfies new unique
+# constraints or new columns get backfilled.
+PRE_INDEX_STATEMENTS = {
+    "uq_voter_records_election_user": [
+        # Keep the earliest record per voter
+        """
+        DELETE FROM voter_records
+        WHERE id NOT IN (
+            SELECT MIN(id) FROM voter_records GROUP BY election_id, user_id
+        )
+        """,
+    ],
+    "ix_accounts_oldest_unpaid_date": [
+        # Latest charge whose suffix of charges still covers the balance
+        """
+        UPDATE accounts SET oldest_unpaid_date = (
+            SELECT MAX(e.date) FROM ledger_entries e
+            WHERE e.account_id = accounts.id AND e.amount > 0
+              AND (
+                SELECT SUM(x.amount) FROM ledger_entries x
+                WHERE x.account_id = e.account_id AND x.amount > 0
+                  AND (x.date > e.date OR (x.date = e.date AND x.id >= e.id))
+              ) >= accounts.balance
+        )
+        WHERE balance > 0
+        """,
+    ],
+    "ix_calendar_events_revision": [
+        # Pre-sync rows count as written at the revision of their id; the
+        # counter itself is seeded from MAX(revision) on first write
+        """
+        UPDATE calendar_events SET revision = id, updated_at = CURRENT_TIMESTAMP
+        WHERE revision IS NULL
+        """,
+    ],
+    "ix_directory_profiles_preference_flags": [
+        # Profiles saved before preferences were a bitmask opt into nothing
+        "UPDATE directory_profiles SET preference_flags = 0 WHERE preference_flags IS NULL",
+    ],
+}
+
+def upgrade(engine: Engine):
+    """Add model columns and indexes missing from an existing database.
+
+    Only nullable columns can be added this way.
+    """
+    with engine.begin() as conn:
+        inspector = inspect(conn)
+        for table in Base.metadata.sorted_tables:
+            if not inspector.has_table(table.name):
+                continue
+            existing_columns = {c["name"] for c in inspector.get_columns(table.name)}
+            for column in table.columns:
+                if column.name in existing_columns or not column.nullable:
+                    continue
+                column_type = column.type.compile(dialect=conn.dialect)
+                conn.execute(text(f"ALTER TABLE {table.name} ADD COLUMN {column.name} {column_type}"))
+            existing = {ix["name"] for ix in inspector.get_indexes(table.name)}
+            for index in table.indexes:
+                if index.name in existing:
+                    continue
+                for statement in PRE_INDEX_STATEMENTS.get(index.name, []):
+                    conn.execute(text(statement))
+                index.create(bind=conn)
@@ -0,0 +1,47 @@
+import base64
+import json
+from datetime import datetime
+from typing import Optional, Tuple
+from fastapi import HTTPException
+
+# Keyset pagination: a cursor is the sort key of the last row on the previous
+# page, encoded as an opaque URL-safe token. Datetimes are tagged so they
+# round-trip.
+
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+def _encode_value(value):
+    if isinstance(value, datetime):
+        return {"dt": value.isoformat()}
+    return value
+
+def _decode_value(value):
+    if isinstance(value, dict) and "dt" in value:
+        return datetime.fromisoformat(value["dt"])
+    return value
+
+def encode_cursor(*values) -> str:
+    raw = json.dumps([_encode_value(v) for v in values]).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+def decode_cursor(cursor: Optional[str], *types: type) -> Optional[Tuple]:
+    """The sort key in a cursor, which must hold one value of each of `types`.
+
+    Malformed or tampered cursors are rejected with a 400 before they can
+    reach a query.
+    """
+    if not cursor:
+        return None
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        if not isinstance(values, list):
+            raise ValueError("cursor is not a list")
+        values = tuple(_decode_value(v) for v in values)
+    except (ValueError, TypeError):
+        raise HTTPException(status_code=400, detail="Invalid pagination cursor")
+    if len(values) != len(types) or not all(
+        isinstance(v, t) and not isinstance(v, bool) for v, t in zip(values, types)
+    ):
+        raise HTTPException(status_code=400, detail="Invalid pagination cursor")
+    return values
@@ -0,0 +1,109 @@
+import asyncio
+import logging
+import multiprocessing
+import os
+from abc import ABC, abstractmethod
+from concurrent.futures import ProcessPoolExecutor
+from typing import List, Optional
+
+# Background worker tasks, and the process pool they share for CPU-bound
+# work (document text extraction, thumbnail rendering) so it never holds the
+# API's GIL. Pool processes are spawned fresh: they inherit neither the event
+# loop nor database connections.
+
+logger = logging.getLogger(__name__)
+
+PROCESSES = int(os.getenv("WORKER_PROCESSES", "2"))
+
+_process_pool: Optional[ProcessPoolExecutor] = None
+
+def process_pool() -> ProcessPoolExecutor:
+    global _process_pool
+    if _process_pool is None:
+        _process_pool = ProcessPoolExecutor(max(1, PROCESSES), mp_context=multiprocessing.get_context("spawn"))
+    return _process_pool
+
+async def run_in_process(fn, *args):
+    """Run a module-level function on the process pool."""
+    return await asyncio.get_running_loop().run_in_executor(process_pool(), fn, *args)
+
+def shutdown_process_pool():
+    global _process_pool
+    if _process_pool is not None:
+        _process_pool.shutdown()
+        _process_pool = None
+
+class BackgroundWorkers(ABC):
+    """Tasks that call process_batch() until it finds nothing to do, then
+    sleep until notify() or the poll interval."""
+
+    def __init__(self, workers: int, poll_interval: float):
+        self.workers = workers
+        self.poll_interval = poll_interval
+        self._tasks: List[asyncio.Task] = []
+        self._stopping: Optional[asyncio.Event] = None
+        self._wakeup: Optional[asyncio.Event] = None
+
+    @abstractmethod
+    async def process_batch(self) -> int:
+        """Handle one batch of work; returns how many items were handled."""
+
+    def notify(self):
+        """Wake idle workers, e.g. right after new work was queued."""
+        if self._wakeup is not None:
+            self._wakeup.set()
+
+    async def _worker(self):
+        while not self._stopping.is_set():
+            handled = 0
+            try:
+                handled = await self.process_batch()
+            except Exception:
+                logger.exception("%s error", type(self).__name__)
+            if not handled:
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), self.poll_interval)
+                except asyncio.TimeoutError:
+                    pass
+                self._wakeup.clear()
+
+    async def start(self):
+        if self.workers <= 0 or self._tasks:
+            return
+        # Created here so they belong to the running event loop
+        self._stopping = asyncio.Event()
+        self._wakeup = asyncio.Event()
+        self._tasks = [asyncio.create_task(self._worker()) for _ in range(self.workers)]
+
+    async def stop(self):
+        if self._stopping is None:
+            return
+        self._stopping.set()
+        self._wakeup.set()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    async def drain(self) -> int:
+        """Handle everything currently due with the worker pool, then return."""
+
+        async def worker():
+            handled = 0
+            while True:
+                batch = await self.process_batch()
+                if not batch:
+                    return handled
+                handled += batch
+
+        return sum(await asyncio.gather(*[worker() for _ in range(max(1, self.workers))]))
+
+async def run_forever(*pools: BackgroundWorkers):
+    """Standalone worker process entry point."""
+    logging.basicConfig(level=logging.INFO)
+    for pool in pools:
+        await pool.start()
+    try:
+        await asyncio.Event().wait()
+    finally:
+        for pool in pools:
+            await pool.stop()
+        shutdown_process_pool()
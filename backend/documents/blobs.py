@@ -0,0 +1,106 @@
+import asyncio
+import logging
+import os
+from datetime import datetime, timedelta
+from typing import Iterable, List
+from sqlalchemy import delete, func, select, update
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.ext.asyncio import AsyncSession
+from backend.core.database import AsyncSessionLocal
+from backend.core.workers import BackgroundWorkers, run_forever
+from backend.documents.models import Derivative, Document, OrphanedBlob
+from backend.documents.storage import storage
+from backend.maintenance.models import MaintenanceRequest
+
+# Garbage collection of stored blobs. Identical files share one blob, and an
+# upload stores its blob before its row commits, so dropping a reference
+# never deletes the file on the spot: release() records the blob as
+# orphaned, and the collector deletes orphans that have had no reference for
+# the grace period and were not uploaded again within it (re-uploads refresh
+# the blob's modification time, see Storage.collect). Collecting a file also
+# drops its thumbnails and previews and releases their blobs. The grace
+# period must outlast the time between an upload storing its blob and
+# committing its row.
+
+logger = logging.getLogger(__name__)
+
+WORKERS = int(os.getenv("BLOB_GC_WORKERS", "1")) # In the API process; 0 = run the CLI instead
+BATCH_SIZE = int(os.getenv("BLOB_GC_BATCH_SIZE", "50"))
+POLL_INTERVAL = float(os.getenv("BLOB_GC_POLL_INTERVAL", "300"))
+GRACE = timedelta(seconds=int(os.getenv("BLOB_GC_GRACE_SECONDS", "3600")))
+
+async def release(db: AsyncSession, digests: Iterable[str]):
+    """Record blobs that may have lost their last reference. Does not commit."""
+    digests = {d for d in digests if d}
+    if not digests:
+        return
+    dialect = db.bind.dialect.name
+    insert = postgresql.insert if dialect == "postgresql" else sqlite.insert
+    statement = insert(OrphanedBlob).values([{"digest": d, "orphaned_at": datetime.utcnow()} for d in digests])
+    await db.execute(statement.on_conflict_do_update(
+        index_elements=[OrphanedBlob.digest], set_={"orphaned_at": statement.excluded.orphaned_at}
+    ))
+
+async def references(db: AsyncSession, digest: str) -> int:
+    """Rows that use the blob: documents, renderings and maintenance photos."""
+    total = 0
+    for column in (Document.content_hash, Derivative.derived_hash, MaintenanceRequest.image_hash):
+        total += await db.scalar(select(func.count()).select_from(column.table).where(column == digest))
+    return total
+
+async def claim(limit: int, now: datetime) -> List[str]:
+    """Lease up to `limit` orphans past the grace period; a lease lasts
+    another grace period, after which a crashed collection is retried."""
+    cutoff = now - GRACE
+    due = (
+        select(OrphanedBlob.digest)
+        .where(OrphanedBlob.orphaned_at <= cutoff)
+        .order_by(OrphanedBlob.orphaned_at)
+        .limit(limit)
+        .with_for_update(skip_locked=True)
+    )
+    async with AsyncSessionLocal() as db:
+        digests = (await db.execute(
+            update(OrphanedBlob)
+            .where(OrphanedBlob.digest.in_(due.scalar_subquery()), OrphanedBlob.orphaned_at <= cutoff)
+            .values(orphaned_at=now)
+            .returning(OrphanedBlob.digest)
+            .execution_options(synchronize_session=False)
+        )).scalars().all()
+        await db.commit()
+    return digests
+
+class BlobCollector(BackgroundWorkers):
+    def __init__(self, workers: int = WORKERS, batch_size: int = BATCH_SIZE):
+        super().__init__(workers, POLL_INTERVAL)
+        self.batch_size = batch_size
+
+    async def process_batch(self) -> int:
+        """Collect one batch of orphans; returns the number handled."""
+        now = datetime.utcnow()
+        digests = await claim(self.batch_size, now)
+        for digest in digests:
+            async with AsyncSessionLocal() as db:
+                if not await references(db, digest):
+                    # Renderings of the file go with it. Deleted first, in the
+                    # transaction: an upload queueing them again waits for it
+                    derived = (await db.execute(
+                        delete(Derivative).where(Derivative.source_hash == digest).returning(Derivative.derived_hash)
+                    )).scalars().all()
+                    if not await storage.collect(digest, now - GRACE):
+                        logger.info("Blob %s was uploaded again; collection deferred", digest)
+                        await db.rollback()
+                        continue
+                    await release(db, derived)
+                # Released again since the lease: leave that for its own grace period
+                await db.execute(
+                    delete(OrphanedBlob).where(OrphanedBlob.digest == digest, OrphanedBlob.orphaned_at <= now)
+                )
+                await db.commit()
+        return len(digests)
+
+collector = BlobCollector()
+
+if __name__ == "__main__":
+    # Standalone collector process: python -m backend.documents.blobs
+    asyncio.run(run_forever(BlobCollector(workers=WORKERS or 1)))
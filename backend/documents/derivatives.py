@@ -0,0 +1,143 @@
+import asyncio
+import logging
+import os
+from datetime import datetime, timedelta
+from typing import Dict, Iterable, Optional
+from sqlalchemy import select, update
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.ext.asyncio import AsyncSession
+from backend.core.database import AsyncSessionLocal
+from backend.core.workers import BackgroundWorkers, run_forever, run_in_process
+from backend.documents import blobs, render
+from backend.documents.models import Derivative, DerivativeStatus
+from backend.documents.storage import storage
+
+# Thumbnails and first-page previews for stored documents and maintenance
+# photos. Uploads queue one derivatives row per kind; workers lease due rows,
+# render them on the shared process pool and store the JPEGs in document
+# storage. List endpoints return the URLs of ready renderings, so list views
+# load a few KB per item instead of the originals.
+
+logger = logging.getLogger(__name__)
+
+WORKERS = int(os.getenv("DERIVATIVES_WORKERS", "1")) # In the API process; 0 = run the CLI instead
+BATCH_SIZE = int(os.getenv("DERIVATIVES_BATCH_SIZE", "10"))
+POLL_INTERVAL = float(os.getenv("DERIVATIVES_POLL_INTERVAL", "5"))
+LEASE = timedelta(seconds=int(os.getenv("DERIVATIVES_LEASE_SECONDS", "300")))
+MAX_ATTEMPTS = int(os.getenv("DERIVATIVES_MAX_ATTEMPTS", "3"))
+RETRY_DELAY = timedelta(minutes=5)
+
+KINDS = (render.THUMBNAIL, render.PREVIEW)
+
+def url(source_hash: str, kind: str) -> str:
+    return f"/api/previews/{source_hash}/{kind}"
+
+async def request(db: AsyncSession, source_hash: str, content_type: Optional[str], filename: Optional[str]):
+    """Queue renderings of a stored file unless it has them already or is not
+    an image or PDF. Does not commit."""
+    if not render.derivable(content_type, filename):
+        return
+    dialect = db.bind.dialect.name
+    insert = postgresql.insert if dialect == "postgresql" else sqlite.insert
+    now = datetime.utcnow()
+    await db.execute(
+        insert(Derivative)
+        .values([
+            {"source_hash": source_hash, "kind": kind, "source_type": content_type, "source_name": filename,
+             "status": DerivativeStatus.PENDING.value, "attempts": 0, "next_attempt_at": now, "created_at": now}
+            for kind in KINDS
+        ])
+        .on_conflict_do_nothing()
+    )
+
+async def urls(db: AsyncSession, source_hashes: Iterable[str]) -> Dict[str, Dict[str, str]]:
+    """{source hash: {"thumbnail_url": ..., "preview_url": ...}} for ready renderings."""
+    source_hashes = {h for h in source_hashes if h}
+    if not source_hashes:
+        return {}
+    rows = await db.execute(
+        select(Derivative.source_hash, Derivative.kind)
+        .where(Derivative.source_hash.in_(source_hashes), Derivative.status == DerivativeStatus.READY.value)
+    )
+    found: Dict[str, Dict[str, str]] = {}
+    for source_hash, kind in rows:
+        found.setdefault(source_hash, {})[f"{kind}_url"] = url(source_hash, kind)
+    return found
+
+async def claim(limit: int) -> list:
+    """Lease up to `limit` due renderings."""
+    now = datetime.utcnow()
+    due = (
+        select(Derivative.source_hash, Derivative.kind)
+        .where(
+            Derivative.status.in_([DerivativeStatus.PENDING.value, DerivativeStatus.RENDERING.value]),
+            Derivative.next_attempt_at <= now
+        )
+        .order_by(Derivative.next_attempt_at)
+        .limit(limit)
+        .with_for_update(skip_locked=True)
+        .subquery()
+    )
+    async with AsyncSessionLocal() as db:
+        rows = (await db.execute(
+            update(Derivative)
+            .where(
+                Derivative.source_hash == due.c.source_hash,
+                Derivative.kind == due.c.kind,
+                Derivative.next_attempt_at <= now
+            )
+            .values(status=DerivativeStatus.RENDERING.value, next_attempt_at=now + LEASE, attempts=Derivative.attempts + 1)
+            .returning(
+                Derivative.source_hash, Derivative.kind, Derivative.source_type,
+                Derivative.source_name, Derivative.attempts
+            )
+            .execution_options(synchronize_session=False)
+        )).all()
+        await db.commit()
+    return rows
+
+class Deriver(BackgroundWorkers):
+    def __init__(self, workers: int = WORKERS, batch_size: int = BATCH_SIZE):
+        super().__init__(workers, POLL_INTERVAL)
+        self.batch_size = batch_size
+
+    async def _render(self, row) -> dict:
+        async with storage.local_path(row.source_hash) as path:
+            jpeg = await run_in_process(render.render, path, row.source_type, row.source_name, row.kind)
+
+        async def chunks():
+            yield jpeg
+
+        blob = await storage.write(chunks())
+        return {"status": DerivativeStatus.READY.value, "derived_hash": blob.digest, "size": blob.size, "last_error": None}
+
+    async def process_batch(self) -> int:
+        """Claim and render one batch; returns the number of renderings handled."""
+        rows = await claim(self.batch_size)
+        for row in rows:
+            try:
+                values = await self._render(row)
+            except Exception as e:
+                logger.warning("Rendering %s of %s failed: %s", row.kind, row.source_hash, e)
+                values = {
+                    "status": DerivativeStatus.FAILED.value if row.attempts >= MAX_ATTEMPTS else DerivativeStatus.PENDING.value,
+                    "last_error": f"{type(e).__name__}: {e}"[:500],
+                    "next_attempt_at": datetime.utcnow() + RETRY_DELAY
+                }
+            async with AsyncSessionLocal() as db:
+                result = await db.execute(
+                    update(Derivative)
+                    .where(Derivative.source_hash == row.source_hash, Derivative.kind == row.kind)
+                    .values(**values)
+                )
+                if not result.rowcount and values.get("derived_hash"):
+                    # The source was collected while rendering
+                    await blobs.release(db, [values["derived_hash"]])
+                await db.commit()
+        return len(rows)
+
+deriver = Deriver()
+
+if __name__ == "__main__":
+    # Standalone rendering process: python -m backend.documents.derivatives
+    asyncio.run(run_forever(Deriver(workers=WORKERS or 2)))
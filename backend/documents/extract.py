@@ -0,0 +1,32 @@
+import os
+from typing import Optional
+
+# Text extraction for the search index. Runs in indexer worker processes, so
+# this module stays free of database and web imports.
+
+MAX_TEXT_CHARS = 500_000 # Keeps index rows (and Postgres tsvectors) bounded
+
+TEXT_TYPES = ("text/plain", "text/markdown", "text/csv")
+TEXT_EXTENSIONS = (".txt", ".md", ".csv")
+
+def extract_text(path: str, content_type: Optional[str], filename: Optional[str]) -> str:
+    """Plain text of a stored file; empty for formats without extractable text."""
+    extension = os.path.splitext(filename or "")[1].lower()
+    if content_type == "application/pdf" or extension == ".pdf":
+        return _pdf_text(path)
+    if (content_type or "").split(";")[0] in TEXT_TYPES or extension in TEXT_EXTENSIONS:
+        with open(path, "r", encoding="utf-8", errors="replace") as f:
+            return f.read(MAX_TEXT_CHARS)
+    return ""
+
+def _pdf_text(path: str) -> str:
+    from pypdf import PdfReader
+    pages = []
+    length = 0
+    for page in PdfReader(path).pages:
+        text = page.extract_text() or ""
+        pages.append(text)
+        length += len(text)
+        if length >= MAX_TEXT_CHARS:
+            break
+    return "\n".join(pages)[:MAX_TEXT_CHARS]
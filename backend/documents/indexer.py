@@ -0,0 +1,110 @@
+import asyncio
+import logging
+import os
+from datetime import datetime, timedelta
+from typing import Dict
+from sqlalchemy import select, update
+from backend.core.database import AsyncSessionLocal
+from backend.core.workers import BackgroundWorkers, run_forever, run_in_process
+from backend.documents.extract import extract_text
+from backend.documents.models import Document, DocumentText, TextStatus
+from backend.documents.storage import storage
+
+# Background text extraction for document search. Workers claim pending
+# document_texts rows (leasing them like the notification queue), extract the
+# stored file's text on the shared process pool, and write the text back; the
+# full-text index follows by trigger or generated column. Files already
+# extracted for another document with the same content hash are not parsed
+# again.
+
+logger = logging.getLogger(__name__)
+
+WORKERS = int(os.getenv("DOCUMENTS_INDEX_WORKERS", "1")) # In the API process; 0 = run the CLI instead
+BATCH_SIZE = int(os.getenv("DOCUMENTS_INDEX_BATCH_SIZE", "10"))
+POLL_INTERVAL = float(os.getenv("DOCUMENTS_INDEX_POLL_INTERVAL", "5"))
+LEASE = timedelta(seconds=int(os.getenv("DOCUMENTS_INDEX_LEASE_SECONDS", "600")))
+MAX_ATTEMPTS = int(os.getenv("DOCUMENTS_INDEX_MAX_ATTEMPTS", "3"))
+RETRY_DELAY = timedelta(minutes=5)
+
+async def claim(limit: int) -> Dict[int, int]:
+    """Lease up to `limit` due rows; returns their attempt counts by document id."""
+    now = datetime.utcnow()
+    due = (
+        select(DocumentText.document_id)
+        .where(
+            DocumentText.status.in_([TextStatus.PENDING.value, TextStatus.EXTRACTING.value]),
+            DocumentText.next_attempt_at <= now
+        )
+        .order_by(DocumentText.next_attempt_at)
+        .limit(limit)
+        .with_for_update(skip_locked=True)
+    )
+    async with AsyncSessionLocal() as db:
+        rows = (await db.execute(
+            update(DocumentText)
+            .where(DocumentText.document_id.in_(due.scalar_subquery()), DocumentText.next_attempt_at <= now)
+            .values(status=TextStatus.EXTRACTING.value, next_attempt_at=now + LEASE, attempts=DocumentText.attempts + 1)
+            .returning(DocumentText.document_id, DocumentText.attempts)
+            .execution_options(synchronize_session=False)
+        )).all()
+        await db.commit()
+    return {row.document_id: row.attempts for row in rows}
+
+class Indexer(BackgroundWorkers):
+    def __init__(self, workers: int = WORKERS, batch_size: int = BATCH_SIZE):
+        super().__init__(workers, POLL_INTERVAL)
+        self.batch_size = batch_size
+
+    async def _extract(self, document: Document) -> str:
+        async with AsyncSessionLocal() as db:
+            # Same file already extracted for another document
+            known = await db.scalar(
+                select(DocumentText.body)
+                .join(Document, Document.id == DocumentText.document_id)
+                .where(
+                    Document.content_hash == document.content_hash,
+                    Document.id != document.id,
+                    DocumentText.status == TextStatus.INDEXED.value
+                )
+                .limit(1)
+            )
+        if known is not None:
+            return known
+        async with storage.local_path(document.content_hash) as path:
+            return await run_in_process(extract_text, path, document.content_type, document.filename)
+
+    async def process_batch(self) -> int:
+        """Claim and extract one batch; returns the number of documents handled."""
+        attempts = await claim(self.batch_size)
+        if not attempts:
+            return 0
+        async with AsyncSessionLocal() as db:
+            documents = {d.id: d for d in (await db.execute(
+                select(Document).where(Document.id.in_(list(attempts)))
+            )).scalars()}
+        for document_id in sorted(attempts):
+            document = documents.get(document_id)
+            values = {"status": TextStatus.INDEXED.value, "last_error": None, "extracted_at": datetime.utcnow()}
+            if document is not None and document.content_hash:
+                try:
+                    values["body"] = await self._extract(document)
+                except Exception as e:
+                    logger.warning("Text extraction failed for document %d: %s", document_id, e)
+                    failed = attempts[document_id] >= MAX_ATTEMPTS
+                    values = {
+                        "status": TextStatus.FAILED.value if failed else TextStatus.PENDING.value,
+                        "last_error": f"{type(e).__name__}: {e}"[:500],
+                        "next_attempt_at": datetime.utcnow() + RETRY_DELAY
+                    }
+            async with AsyncSessionLocal() as db:
+                await db.execute(
+                    update(DocumentText).where(DocumentText.document_id == document_id).values(**values)
+                )
+                await db.commit()
+        return len(attempts)
+
+indexer = Indexer()
+
+if __name__ == "__main__":
+    # Standalone indexer process: python -m backend.documents.indexer
+    asyncio.run(run_forever(Indexer(workers=WORKERS or 2)))
@@ -0,0 +1,85 @@
+import hashlib
+import json
+import os
+import time
+from collections import OrderedDict
+from typing import Dict, Optional, Tuple
+from fastapi.encoders import jsonable_encoder
+from sqlalchemy import select, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
+from backend.core.pagination import encode_cursor
+from backend.documents import models, schemas
+
+# Document library pages, newest first, keyset-paginated by (upload_date, id).
+# Rendered pages are cached per audience (residents all see the same public
+# library; the board sees everything) as ready-to-send JSON, so repeat reads
+# skip the database and pydantic. This worker's writes clear the cache at
+# once; other workers' writes, and thumbnails finished since a page was
+# cached, show up once entries expire.
+LIST_CACHE_TTL = float(os.getenv("DOCUMENTS_LIST_CACHE_TTL", "30"))
+LIST_CACHE_SIZE = 512
+
+def audience(user_role: str) -> str:
+    return "board" if user_role == "board" else "public"
+
+async def fetch_page(
+    db: AsyncSession,
+    audience: str,
+    category: Optional[str],
+    after: Optional[Tuple],
+    limit: int
+) -> list:
+    # Each filter combination has an index ending in (upload_date, id): see models
+    query = select(models.Document)
+    if audience != "board":
+        query = query.where(models.Document.access_level == models.AccessLevel.PUBLIC)
+    if category:
+        query = query.where(models.Document.category == category)
+    if after:
+        query = query.where(tuple_(models.Document.upload_date, models.Document.id) < tuple_(*after))
+    query = query.order_by(models.Document.upload_date.desc(), models.Document.id.desc()).limit(limit)
+    return (await db.execute(query)).scalars().all()
+
+class Page:
+    def __init__(self, body: bytes, next_cursor: Optional[str]):
+        self.body = body
+        self.next_cursor = next_cursor
+        self.etag = '"' + hashlib.sha1(body).hexdigest() + '"'
+
+def render_page(documents: list, limit: int, previews: Dict[str, Dict[str, str]]) -> Page:
+    items = [schemas.Document.from_orm(d).copy(update=previews.get(d.content_hash, {})) for d in documents]
+    body = json.dumps(jsonable_encoder(items), separators=(",", ":")).encode()
+    next_cursor = None
+    if len(documents) == limit:
+        next_cursor = encode_cursor(documents[-1].upload_date, documents[-1].id)
+    return Page(body, next_cursor)
+
+class ListingCache:
+    """Rendered pages by (audience, category, cursor, limit), LRU-bounded."""
+
+    def __init__(self, ttl: float = LIST_CACHE_TTL, size: int = LIST_CACHE_SIZE):
+        self.ttl = ttl
+        self.size = size
+        self._pages: "OrderedDict[tuple, Tuple[float, Page]]" = OrderedDict()
+
+    def get(self, key: tuple) -> Optional[Page]:
+        entry = self._pages.get(key)
+        if entry is None:
+            return None
+        stored_at, page = entry
+        if time.monotonic() - stored_at > self.ttl:
+            del self._pages[key]
+            return None
+        self._pages.move_to_end(key)
+        return page
+
+    def store(self, key: tuple, page: Page):
+        self._pages[key] = (time.monotonic(), page)
+        self._pages.move_to_end(key)
+        while len(self._pages) > self.size:
+            self._pages.popitem(last=False)
+
+    def invalidate(self):
+        self._pages.clear()
+
+listing_cache = ListingCache()
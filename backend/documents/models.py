@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, DateTime
+from sqlalchemy import Column, Integer, String, DateTime, Text, ForeignKey, Index, DDL, event
 from backend.core.database import Base
 import enum
 from datetime import datetime
@@ -16,12 +16,141 @@ class DocumentCategory(str, enum.Enum):
 
 class Document(Base):
     __tablename__ = "documents"
+    __table_args__ = (
+        # Library pages are keyset-paginated by (upload_date, id) under each
+        # filter combination: residents (access level) and board, with and
+        # without a category
+        Index("ix_documents_access_category_uploaded", "access_level", "category", "upload_date", "id"),
+        Index("ix_documents_access_uploaded", "access_level", "upload_date", "id"),
+        Index("ix_documents_category_uploaded", "category", "upload_date", "id"),
+        Index("ix_documents_uploaded", "upload_date", "id"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     title = Column(String, index=True)
     category = Column(String)
     access_level = Column(String)
     description = Column(String, nullable=True)
-    file_url = Column(String)
+    file_url = Column(String) # External link, or the download URL of a stored file
+    # Stored file, content-addressed (see backend/documents/storage.py)
+    content_hash = Column(String(64), nullable=True, index=True)
+    size = Column(Integer, nullable=True)
+    content_type = Column(String, nullable=True)
+    filename = Column(String, nullable=True)
     upload_date = Column(DateTime, default=datetime.utcnow)
     uploaded_by = Column(String)
+
+class TextStatus(str, enum.Enum):
+    PENDING = "pending"
+    EXTRACTING = "extracting" # Leased by an indexer worker until next_attempt_at
+    INDEXED = "indexed"
+    FAILED = "failed"
+
+class DocumentText(Base):
+    """Search row of a document: its title and description plus the text
+    extracted from its stored file by the background indexer.
+
+    Title and description are copied here when the document is created so
+    the full-text index covers a single table.
+    """
+    __tablename__ = "document_texts"
+    __table_args__ = (
+        # Indexer workers claim due rows
+        Index("ix_document_texts_claim", "status", "next_attempt_at"),
+    )
+
+    document_id = Column(Integer, ForeignKey("documents.id"), primary_key=True)
+    title = Column(String, nullable=True)
+    description = Column(String, nullable=True)
+    body = Column(Text, nullable=True)
+    status = Column(String, nullable=False, default=TextStatus.PENDING.value)
+    attempts = Column(Integer, nullable=False, default=0)
+    next_attempt_at = Column(DateTime, nullable=False, default=datetime.utcnow)
+    last_error = Column(String, nullable=True)
+    extracted_at = Column(DateTime, nullable=True)
+
+# Full-text index over title, description and body, maintained by the
+# database as for the resident directory: an external-content FTS5 table with
+# triggers on SQLite, a weighted generated tsvector with a GIN index on
+# Postgres. Documents that existed before the index are queued for
+# extraction when the table is created.
+_SQLITE_FTS = [
+    """
+    CREATE VIRTUAL TABLE document_fts USING fts5(
+        title, description, body,
+        content='document_texts', content_rowid='document_id', tokenize='porter unicode61'
+    )
+    """,
+    """
+    CREATE TRIGGER document_fts_insert AFTER INSERT ON document_texts BEGIN
+        INSERT INTO document_fts(rowid, title, description, body) VALUES (new.document_id, new.title, new.description, new.body);
+    END
+    """,
+    """
+    CREATE TRIGGER document_fts_delete AFTER DELETE ON document_texts BEGIN
+        INSERT INTO document_fts(document_fts, rowid, title, description, body) VALUES ('delete', old.document_id, old.title, old.description, old.body);
+    END
+    """,
+    """
+    CREATE TRIGGER document_fts_update AFTER UPDATE OF title, description, body ON document_texts BEGIN
+        INSERT INTO document_fts(document_fts, rowid, title, description, body) VALUES ('delete', old.document_id, old.title, old.description, old.body);
+        INSERT INTO document_fts(rowid, title, description, body) VALUES (new.document_id, new.title, new.description, new.body);
+    END
+    """,
+]
+_POSTGRES_FTS = [
+    """
+    ALTER TABLE document_texts ADD COLUMN search_vector tsvector GENERATED ALWAYS AS (
+        setweight(to_tsvector('english', coalesce(title, '')), 'A') ||
+        setweight(to_tsvector('english', coalesce(description, '')), 'B') ||
+        setweight(to_tsvector('english', coalesce(body, '')), 'C')
+    ) STORED
+    """,
+    "CREATE INDEX ix_document_texts_search ON document_texts USING GIN (search_vector)",
+]
+_BACKFILL = """
+    INSERT INTO document_texts (document_id, title, description, status, attempts, next_attempt_at)
+    SELECT id, title, description, 'pending', 0, CURRENT_TIMESTAMP FROM documents
+"""
+for statement in _SQLITE_FTS:
+    event.listen(DocumentText.__table__, "after_create", DDL(statement).execute_if(dialect="sqlite"))
+for statement in _POSTGRES_FTS:
+    event.listen(DocumentText.__table__, "after_create", DDL(statement).execute_if(dialect="postgresql"))
+event.listen(DocumentText.__table__, "after_create", DDL(_BACKFILL))
+
+class DerivativeStatus(str, enum.Enum):
+    PENDING = "pending"
+    RENDERING = "rendering" # Leased by a worker until next_attempt_at
+    READY = "ready"
+    FAILED = "failed"
+
+class Derivative(Base):
+    """A thumbnail or preview rendered from a stored file. Keyed by the
+    source's content hash, so identical files (documents or maintenance
+    photos) share one rendering."""
+    __tablename__ = "derivatives"
+    __table_args__ = (
+        # Workers claim due rows
+        Index("ix_derivatives_claim", "status", "next_attempt_at"),
+    )
+
+    source_hash = Column(String(64), primary_key=True)
+    kind = Column(String, primary_key=True) # See backend/documents/render.py
+    source_type = Column(String, nullable=True)
+    source_name = Column(String, nullable=True)
+    status = Column(String, nullable=False, default=DerivativeStatus.PENDING.value)
+    attempts = Column(Integer, nullable=False, default=0)
+    next_attempt_at = Column(DateTime, nullable=False, default=datetime.utcnow)
+    last_error = Column(String, nullable=True)
+    derived_hash = Column(String(64), nullable=True, index=True) # The rendered JPEG, in document storage
+    size = Column(Integer, nullable=True)
+    created_at = Column(DateTime, default=datetime.utcnow)
+
+class OrphanedBlob(Base):
+    """A stored blob that lost a reference and may be unused. Collected
+    once it has stayed unreferenced for a grace period (see
+    backend/documents/blobs.py)."""
+    __tablename__ = "orphaned_blobs"
+
+    digest = Column(String(64), primary_key=True)
+    orphaned_at = Column(DateTime, nullable=False, default=datetime.utcnow, index=True) # Or leased until, by the collector
@@ -0,0 +1,37 @@
+from fastapi import APIRouter, HTTPException, Depends, Request
+from fastapi.responses import Response
+from sqlalchemy.ext.asyncio import AsyncSession
+from backend.core.database import get_async_db
+from backend.documents import models
+from backend.documents.derivatives import KINDS
+from backend.documents.storage import storage
+
+# Rendered thumbnails and previews. URLs are keyed by the source file's
+# SHA-256, which only appears in listings the caller may see, and the
+# rendering behind a URL never changes, so clients may cache it forever.
+
+router = APIRouter()
+
+@router.api_route("/{source_hash}/{kind}", methods=["GET", "HEAD"])
+async def get_preview(
+    source_hash: str,
+    kind: str,
+    request: Request,
+    db: AsyncSession = Depends(get_async_db)
+):
+    """JPEG thumbnail or first-page preview of a stored document or photo"""
+    if kind not in KINDS:
+        raise HTTPException(status_code=404, detail="Unknown preview kind")
+    derivative = await db.get(models.Derivative, (source_hash, kind))
+    if not derivative or derivative.status != models.DerivativeStatus.READY.value:
+        raise HTTPException(status_code=404, detail="Preview not available")
+
+    etag = f'"{derivative.derived_hash}"'
+    cache_control = "private, max-age=31536000, immutable"
+    if request.headers.get("if-none-match") == etag:
+        return Response(status_code=304, headers={"ETag": etag, "Cache-Control": cache_control})
+    response = storage.response(
+        derivative.derived_hash, derivative.size, "image/jpeg", f"{kind}.jpg", request.headers.get("range")
+    )
+    response.headers["Cache-Control"] = cache_control
+    return response
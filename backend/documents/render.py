@@ -0,0 +1,57 @@
+import io
+import os
+from typing import Optional
+
+# Thumbnail and preview rendering for stored images and PDFs. Runs in pool
+# processes, so this module stays free of database and web imports.
+
+THUMBNAIL = "thumbnail"
+PREVIEW = "preview"
+SIZES = {THUMBNAIL: 320, PREVIEW: 1280} # Longest edge, pixels
+JPEG_QUALITY = 80
+
+IMAGE_TYPES = ("image/jpeg", "image/png", "image/gif", "image/webp", "image/bmp", "image/tiff")
+IMAGE_EXTENSIONS = (".jpg", ".jpeg", ".png", ".gif", ".webp", ".bmp", ".tif", ".tiff")
+
+def _is_pdf(content_type: Optional[str], filename: Optional[str]) -> bool:
+    return content_type == "application/pdf" or os.path.splitext(filename or "")[1].lower() == ".pdf"
+
+def _is_image(content_type: Optional[str], filename: Optional[str]) -> bool:
+    return content_type in IMAGE_TYPES or os.path.splitext(filename or "")[1].lower() in IMAGE_EXTENSIONS
+
+def derivable(content_type: Optional[str], filename: Optional[str]) -> bool:
+    return _is_pdf(content_type, filename) or _is_image(content_type, filename)
+
+def _first_page(path: str, size: int):
+    import pypdfium2
+    pdf = pypdfium2.PdfDocument(path)
+    try:
+        page = pdf[0]
+        width, height = page.get_size() # Points
+        # Render straight at the target size instead of rasterising at full resolution
+        return page.render(scale=size / max(width, height, 1)).to_pil()
+    finally:
+        pdf.close()
+
+def render(path: str, content_type: Optional[str], filename: Optional[str], kind: str) -> bytes:
+    """A JPEG no larger than SIZES[kind] on its longest edge."""
+    from PIL import Image, ImageOps
+    size = SIZES[kind]
+    if _is_pdf(content_type, filename):
+        image = _first_page(path, size)
+    else:
+        image = Image.open(path)
+        # JPEG only: decode at a reduced scale (1/2 .. 1/8), far cheaper than full size
+        image.draft("RGB", (size, size))
+        image = ImageOps.exif_transpose(image) # Phone photos carry their rotation in EXIF
+    image.thumbnail((size, size), Image.LANCZOS)
+    if image.mode in ("RGBA", "LA", "P"):
+        image = image.convert("RGBA")
+        background = Image.new("RGB", image.size, (255, 255, 255))
+        background.paste(image, mask=image.split()[-1])
+        image = background
+    elif image.mode != "RGB":
+        image = image.convert("RGB")
+    out = io.BytesIO()
+    image.save(out, "JPEG", quality=JPEG_QUALITY, optimize=True, progressive=True)
+    return out.getvalue()
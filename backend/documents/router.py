@@ -1,32 +1,71 @@
-from fastapi import APIRouter, HTTPException, Depends
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, HTTPException, Depends, Header, Query, Request
+from fastapi.responses import RedirectResponse, Response
+from pydantic import ValidationError
+from sqlalchemy import delete
+from sqlalchemy.ext.asyncio import AsyncSession
+from datetime import datetime
 from typing import List, Optional
-from backend.core.database import get_db
-from backend.documents import models, schemas
+from backend.core.database import get_async_db
+from backend.core.pagination import NEXT_CURSOR_HEADER, decode_cursor
+from backend.documents import blobs, derivatives, listing, models, schemas
+from backend.documents.indexer import indexer
+from backend.documents.search import search
+from backend.documents.storage import UploadTooLarge, storage
+from backend.documents.uploads import StreamingForm
 
 router = APIRouter()
 
+def _search_row(document: models.Document, status: models.TextStatus) -> models.DocumentText:
+    return models.DocumentText(
+        document_id=document.id,
+        title=document.title,
+        description=document.description,
+        status=status.value
+    )
+
 @router.get("/", response_model=List[schemas.Document])
 async def get_documents(
     user_role: str = "resident", 
     category: Optional[str] = None,
-    db: Session = Depends(get_db)
+    cursor: Optional[str] = None,
+    limit: int = Query(50, ge=1, le=200),
+    if_none_match: Optional[str] = Header(None),
+    db: AsyncSession = Depends(get_async_db)
 ):
-    """Get accessible documents based on user role"""
-    query = db.query(models.Document)
-    
-    if user_role != "board":
-        query = query.filter(models.Document.access_level == models.AccessLevel.PUBLIC)
-        
-    if category:
-        query = query.filter(models.Document.category == category)
-        
-    return query.all()
+    """Get accessible documents based on user role, newest first.
+
+    Pass X-Next-Cursor back as `cursor` for the next page."""
+    audience = listing.audience(user_role)
+    key = (audience, category, cursor, limit)
+    page = listing.listing_cache.get(key)
+    if page is None:
+        documents = await listing.fetch_page(db, audience, category, decode_cursor(cursor, datetime, int), limit)
+        previews = await derivatives.urls(db, [d.content_hash for d in documents])
+        page = listing.render_page(documents, limit, previews)
+        listing.listing_cache.store(key, page)
+
+    headers = {"ETag": page.etag, "Cache-Control": "no-cache"}
+    if page.next_cursor:
+        headers[NEXT_CURSOR_HEADER] = page.next_cursor
+    if if_none_match == page.etag:
+        return Response(status_code=304, headers=headers)
+    return Response(content=page.body, media_type="application/json", headers=headers)
+
+@router.get("/search", response_model=List[schemas.DocumentSearchResult])
+async def search_documents(
+    q: str,
+    user_role: str = "resident",
+    category: Optional[str] = None,
+    limit: int = Query(20, ge=1, le=50),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Full-text search over titles, descriptions and file contents, best matches first"""
+    return await search(db, q, user_role, category, limit)
 
 @router.post("/", response_model=schemas.Document)
 async def upload_document(
     document: schemas.DocumentCreate,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Upload new document (Board/Management only)"""
     # In a real app, check user permissions here or via dependency
@@ -35,20 +74,101 @@ async def upload_document(
         uploaded_by="Board Admin" # In real app, get from auth context
     )
     db.add(db_document)
-    db.commit()
-    db.refresh(db_document)
+    await db.flush()
+    # Linked documents have no file to extract: searchable by title and description at once
+    db.add(_search_row(db_document, models.TextStatus.INDEXED))
+    await db.commit()
+    listing.listing_cache.invalidate()
+    await db.refresh(db_document)
+    return db_document
+
+@router.post("/upload", response_model=schemas.Document)
+async def upload_document_file(
+    request: Request,
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Upload a document file with its metadata as multipart/form-data (Board/Management only).
+
+    The file is streamed into storage as it arrives; identical files share one stored blob.
+    """
+    form = StreamingForm(request)
+    try:
+        blob = await storage.write(form.file_chunks())
+    except UploadTooLarge:
+        raise HTTPException(status_code=413, detail="File is too large")
+
+    try:
+        metadata = schemas.DocumentBase(**form.fields)
+    except ValidationError as e:
+        if blob.created:
+            await blobs.release(db, [blob.digest])
+            await db.commit()
+        raise HTTPException(status_code=422, detail=e.errors())
+
+    db_document = models.Document(
+        **metadata.dict(exclude={"file_url"}),
+        content_hash=blob.digest,
+        size=blob.size,
+        content_type=form.content_type,
+        filename=form.filename,
+        uploaded_by="Board Admin" # In real app, get from auth context
+    )
+    db.add(db_document)
+    await db.flush()
+    db_document.file_url = f"/api/documents/{db_document.id}/file"
+    db.add(_search_row(db_document, models.TextStatus.PENDING))
+    await derivatives.request(db, blob.digest, form.content_type, form.filename)
+    await db.commit()
+    listing.listing_cache.invalidate()
+    await db.refresh(db_document)
+    indexer.notify()
+    derivatives.deriver.notify()
     return db_document
 
+@router.api_route("/{document_id}/file", methods=["GET", "HEAD"])
+async def download_document(
+    document_id: int,
+    request: Request,
+    user_role: str = "resident",
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Download a stored document; supports Range requests and ETag revalidation"""
+    db_document = await db.get(models.Document, document_id)
+    if not db_document or (user_role != "board" and db_document.access_level != models.AccessLevel.PUBLIC):
+        raise HTTPException(status_code=404, detail="Document not found")
+    if not db_document.content_hash:
+        if db_document.file_url:
+            return RedirectResponse(db_document.file_url)
+        raise HTTPException(status_code=404, detail="Document has no file")
+
+    etag = f'"{db_document.content_hash}"'
+    if request.headers.get("if-none-match") == etag:
+        return Response(status_code=304, headers={"ETag": etag})
+    range_header = request.headers.get("range")
+    if request.headers.get("if-range", etag) != etag:
+        range_header = None
+    return storage.response(
+        db_document.content_hash,
+        db_document.size,
+        db_document.content_type or "application/octet-stream",
+        db_document.filename or db_document.title,
+        range_header
+    )
+
 @router.delete("/{document_id}")
 async def delete_document(
     document_id: int,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Delete document (Board/Management only)"""
-    db_document = db.query(models.Document).filter(models.Document.id == document_id).first()
+    db_document = await db.get(models.Document, document_id)
     if not db_document:
         raise HTTPException(status_code=404, detail="Document not found")
     
-    db.delete(db_document)
-    db.commit()
+    await db.execute(delete(models.DocumentText).where(models.DocumentText.document_id == document_id))
+    await db.delete(db_document)
+    # Blobs are shared by identical uploads; the collector removes the file once nothing uses it
+    await blobs.release(db, [db_document.content_hash])
+    await db.commit()
+    listing.listing_cache.invalidate()
     return {"message": "Document deleted successfully"}
@@ -17,6 +17,22 @@ class Document(DocumentBase):
     id: int
     upload_date: datetime
     uploaded_by: str
+    filename: Optional[str] = None
+    content_type: Optional[str] = None
+    size: Optional[int] = None
+    thumbnail_url: Optional[str] = None
+    preview_url: Optional[str] = None
 
     class Config:
         orm_mode = True
+
+class DocumentSearchResult(BaseModel):
+    id: int
+    title: str
+    category: DocumentCategory
+    access_level: AccessLevel
+    description: Optional[str] = None
+    file_url: Optional[str] = None
+    upload_date: datetime
+    snippet: str # HTML-escaped, hits wrapped in <mark>
+    rank: float
@@ -0,0 +1,116 @@
+import html
+import re
+from typing import List, Optional
+from sqlalchemy import and_, column, func, literal_column, or_, select, table, text
+from sqlalchemy.ext.asyncio import AsyncSession
+from backend.documents.models import AccessLevel, Document, DocumentText
+
+# Document search: every word of the query must match (stemmed) in the
+# title, description or extracted text. Results are ranked with title hits
+# weighted above description and body hits, restricted by access level, and
+# carry a highlighted snippet of the best-matching passage.
+
+# Control characters mark hits inside snippets; the text around them is
+# HTML-escaped before they become <mark> tags
+_START, _STOP = "\x02", "\x03"
+
+def _terms(q: str) -> List[str]:
+    # Words only: the query syntax of FTS5 / tsquery is never exposed
+    return re.findall(r"\w+", q.lower())
+
+def _highlight(snippet: Optional[str]) -> str:
+    escaped = html.escape(snippet or "")
+    return escaped.replace(_START, "<mark>").replace(_STOP, "</mark>")
+
+def _access(user_role: str, category: Optional[str]):
+    conditions = []
+    if user_role != "board":
+        conditions.append(Document.access_level == AccessLevel.PUBLIC)
+    if category:
+        conditions.append(Document.category == category)
+    return conditions
+
+def _fallback_snippet(row, terms: List[str], width: int = 120) -> str:
+    source = row.body or row.description or row.title or ""
+    lowered = source.lower()
+    position = min((lowered.find(t) for t in terms if t in lowered), default=0)
+    start = max(0, position - width // 3)
+    excerpt = source[start:start + width]
+    for term in terms:
+        excerpt = re.sub(f"({re.escape(term)})", _START + r"\1" + _STOP, excerpt, flags=re.IGNORECASE)
+    return ("…" if start else "") + excerpt + ("…" if start + width < len(source) else "")
+
+async def search(
+    db: AsyncSession,
+    q: str,
+    user_role: str = "resident",
+    category: Optional[str] = None,
+    limit: int = 20
+) -> List[dict]:
+    """Best matches first, as dicts of the document's fields plus snippet and rank."""
+    terms = _terms(q)
+    if not terms:
+        return []
+    columns = [Document.id, Document.title, Document.category, Document.access_level,
+               Document.description, Document.file_url, Document.upload_date]
+    dialect = db.bind.dialect.name
+
+    if dialect == "sqlite":
+        fts_table = table("document_fts", column("rowid"))
+        fts = literal_column("document_fts")
+        rank = func.bm25(fts, 10.0, 4.0, 1.0)
+        query = (
+            select(*columns,
+                   func.snippet(fts, -1, _START, _STOP, "…", 24).label("snippet"),
+                   rank.label("rank"))
+            .select_from(fts_table)
+            .join(Document, Document.id == fts_table.c.rowid)
+            .where(text("document_fts MATCH :document_query").bindparams(
+                document_query=" ".join(f'"{term}"' for term in terms)
+            ))
+            .where(*_access(user_role, category))
+            .order_by(rank) # bm25: lower is better
+            .limit(limit)
+        )
+        rows = (await db.execute(query)).all()
+        return [dict(row._mapping, snippet=_highlight(row.snippet), rank=-row.rank) for row in rows]
+
+    if dialect == "postgresql":
+        vector = literal_column("document_texts.search_vector")
+        tsquery = func.plainto_tsquery("english", " ".join(terms))
+        rank = func.ts_rank(vector, tsquery)
+        # ts_headline re-parses the text, so it only runs on the page of results
+        ranked = (
+            select(*columns, DocumentText.body, rank.label("rank"))
+            .join(DocumentText, DocumentText.document_id == Document.id)
+            .where(vector.op("@@")(tsquery), *_access(user_role, category))
+            .order_by(rank.desc())
+            .limit(limit)
+            .subquery()
+        )
+        headline = func.ts_headline(
+            "english",
+            func.coalesce(func.left(ranked.c.body, 100_000), ranked.c.description, ranked.c.title),
+            tsquery,
+            f"StartSel={_START}, StopSel={_STOP}, MaxWords=30, MinWords=12, MaxFragments=2, FragmentDelimiter=\" … \""
+        )
+        query = select(*[c for c in ranked.c if c.name != "body"], headline.label("snippet")).order_by(ranked.c.rank.desc())
+        rows = (await db.execute(query)).all()
+        return [dict(row._mapping, snippet=_highlight(row.snippet)) for row in rows]
+
+    # No full-text support: substring scan, newest first
+    query = (
+        select(*columns, DocumentText.body)
+        .join(DocumentText, DocumentText.document_id == Document.id)
+        .where(and_(*[
+            or_(*[field.ilike(f"%{term}%") for field in (DocumentText.title, DocumentText.description, DocumentText.body)])
+            for term in terms
+        ]), *_access(user_role, category))
+        .order_by(Document.upload_date.desc())
+        .limit(limit)
+    )
+    rows = (await db.execute(query)).all()
+    return [
+        dict({k: v for k, v in row._mapping.items() if k != "body"}, snippet=_highlight(_fallback_snippet(row, terms)), rank=0.0)
+        for row in rows
+    ]
@@ -0,0 +1,334 @@
+import hashlib
+import os
+import re
+import tempfile
+import uuid
+from abc import ABC, abstractmethod
+from contextlib import asynccontextmanager
+from urllib.parse import quote
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import AsyncContextManager, AsyncIterator, Optional, Tuple
+from fastapi import HTTPException
+from starlette.concurrency import run_in_threadpool
+from starlette.responses import RedirectResponse, Response
+from starlette.types import Receive, Scope, Send
+
+# Content-addressed blob storage for document files. Uploads are streamed
+# chunk by chunk into a temporary object while being hashed; the SHA-256 then
+# names the blob, so identical files are stored once. Backends implement
+# Storage; FileSystemStorage is the local default and S3Storage targets any
+# S3-compatible service. Blobs are never deleted directly: see
+# backend/documents/blobs.py for garbage collection.
+
+CHUNK_SIZE = 64 * 1024
+MAX_UPLOAD_BYTES = int(os.getenv("DOCUMENTS_MAX_UPLOAD_MB", "100")) * 1024 * 1024
+
+@dataclass
+class Blob:
+    digest: str # SHA-256, hex
+    size: int
+    created: bool # False if an identical blob was already stored
+
+class UploadTooLarge(Exception):
+    pass
+
+class Storage(ABC):
+    @abstractmethod
+    async def write(self, chunks: AsyncIterator[bytes]) -> Blob:
+        """Store a stream; never holds more than one chunk in memory."""
+
+    @abstractmethod
+    async def collect(self, digest: str, written_before: datetime) -> bool:
+        """Delete the blob unless it was written (or re-uploaded) at or after
+        `written_before`, naive UTC; True if it is gone."""
+
+    @abstractmethod
+    async def size(self, digest: str) -> Optional[int]:
+        """Size in bytes, or None if no such blob is stored."""
+
+    @abstractmethod
+    def local_path(self, digest: str) -> AsyncContextManager[str]:
+        """Async context manager yielding a local file path holding the blob."""
+
+    @abstractmethod
+    def response(self, digest: str, size: int, media_type: str, filename: str, range_header: Optional[str]) -> Response:
+        """A download response for the blob, honouring a Range header."""
+
+def parse_range(range_header: Optional[str], size: int) -> Optional[Tuple[int, int]]:
+    """(start, end inclusive) of a single byte range, or None for the whole file.
+
+    Headers that do not parse as one valid byte range (including a last
+    byte before the first) are ignored and multi-range requests are answered
+    with the whole file, as RFC 9110 allows; a valid range that starts past
+    the end of the file, or an empty suffix range, raises 416.
+    """
+    if not range_header:
+        return None
+    match = re.fullmatch(r"\s*bytes=(\d*)-(\d*)\s*", range_header)
+    if not match or (not match.group(1) and not match.group(2)):
+        return None
+    start_text, end_text = match.groups()
+    if start_text:
+        start = int(start_text)
+        if end_text and int(end_text) < start:
+            return None
+        end = min(int(end_text), size - 1) if end_text else size - 1
+    else:
+        suffix = int(end_text)
+        if suffix == 0:
+            start, end = size, size - 1
+        else:
+            start, end = max(0, size - suffix), size - 1
+    if start >= size or start > end:
+        raise HTTPException(status_code=416, detail="Requested range not satisfiable", headers={"Content-Range": f"bytes */{size}"})
+    return start, end
+
+class FileRangeResponse(Response):
+    """Serves a byte range of a file.
+
+    Uses the ASGI zero-copy send extension (os.sendfile under the hood) when
+    the server offers it, otherwise reads the range in chunks off the event
+    loop.
+    """
+
+    def __init__(self, path: str, size: int, byte_range: Optional[Tuple[int, int]], headers: dict, media_type: str):
+        self.path = path
+        self.start, self.end = byte_range if byte_range else (0, size - 1)
+        length = self.end - self.start + 1 if size else 0
+        headers = dict(headers, **{"Accept-Ranges": "bytes", "Content-Length": str(length)})
+        if byte_range:
+            headers["Content-Range"] = f"bytes {self.start}-{self.end}/{size}"
+        super().__init__(status_code=206 if byte_range else 200, headers=headers, media_type=media_type)
+        self.length = length
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        await send({"type": "http.response.start", "status": self.status_code, "headers": self.raw_headers})
+        if scope.get("method") == "HEAD" or self.length == 0:
+            await send({"type": "http.response.body", "body": b""})
+            return
+        with open(self.path, "rb") as f:
+            if "http.response.zerocopysend" in scope.get("extensions", {}):
+                await send({
+                    "type": "http.response.zerocopysend",
+                    "file": f.fileno(),
+                    "offset": self.start,
+                    "count": self.length,
+                })
+                return
+            await run_in_threadpool(f.seek, self.start)
+            remaining = self.length
+            while remaining > 0:
+                chunk = await run_in_threadpool(f.read, min(CHUNK_SIZE, remaining))
+                if not chunk:
+                    break
+                remaining -= len(chunk)
+                await send({"type": "http.response.body", "body": chunk, "more_body": remaining > 0})
+
+def _disposition(filename: str) -> str:
+    fallback = re.sub(r"[^A-Za-z0-9._\- ]", "_", filename) or "document"
+    return f"inline; filename=\"{fallback}\"; filename*=UTF-8''{quote(filename)}"
+
+class FileSystemStorage(Storage):
+    """Blobs under root/ab/cd/<sha256>. With DOCUMENTS_ACCEL_REDIRECT set,
+    downloads are handed to the front proxy (nginx X-Accel-Redirect) to be
+    sent with sendfile."""
+
+    def __init__(self, root: str, accel_redirect_prefix: Optional[str] = None):
+        self.root = root
+        self.accel_redirect_prefix = accel_redirect_prefix
+
+    def path(self, digest: str) -> str:
+        return os.path.join(self.root, digest[:2], digest[2:4], digest)
+
+    async def write(self, chunks: AsyncIterator[bytes]) -> Blob:
+        tmp_dir = os.path.join(self.root, "tmp")
+        await run_in_threadpool(os.makedirs, tmp_dir, exist_ok=True)
+        tmp_path = os.path.join(tmp_dir, uuid.uuid4().hex)
+        digest = hashlib.sha256()
+        size = 0
+        f = await run_in_threadpool(open, tmp_path, "wb")
+        try:
+            async for chunk in chunks:
+                size += len(chunk)
+                if size > MAX_UPLOAD_BYTES:
+                    raise UploadTooLarge()
+                digest.update(chunk)
+                await run_in_threadpool(f.write, chunk)
+            await run_in_threadpool(f.close)
+
+            final_path = self.path(digest.hexdigest())
+            try:
+                # Re-uploads refresh the blob's mtime, which keeps it from collection
+                await run_in_threadpool(os.utime, final_path)
+            except FileNotFoundError:
+                pass
+            else:
+                await run_in_threadpool(os.remove, tmp_path)
+                return Blob(digest.hexdigest(), size, created=False)
+            await run_in_threadpool(os.makedirs, os.path.dirname(final_path), exist_ok=True)
+            await run_in_threadpool(os.replace, tmp_path, final_path)
+            return Blob(digest.hexdigest(), size, created=True)
+        except BaseException:
+            # Synchronous: this also runs when the upload is cancelled
+            f.close()
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+
+    async def collect(self, digest: str, written_before: datetime) -> bool:
+        # Moved aside first: a re-upload that touched the blob just before
+        # shows in its mtime, and one arriving later stores a fresh copy
+        trash_dir = os.path.join(self.root, "tmp")
+        await run_in_threadpool(os.makedirs, trash_dir, exist_ok=True)
+        trash_path = os.path.join(trash_dir, uuid.uuid4().hex)
+        try:
+            await run_in_threadpool(os.replace, self.path(digest), trash_path)
+        except FileNotFoundError:
+            return True
+        modified = datetime.utcfromtimestamp((await run_in_threadpool(os.stat, trash_path)).st_mtime)
+        if modified >= written_before:
+            await run_in_threadpool(os.replace, trash_path, self.path(digest))
+            return False
+        await run_in_threadpool(os.remove, trash_path)
+        return True
+
+    async def size(self, digest: str) -> Optional[int]:
+        try:
+            return (await run_in_threadpool(os.stat, self.path(digest))).st_size
+        except FileNotFoundError:
+            return None
+
+    @asynccontextmanager
+    async def local_path(self, digest: str) -> AsyncIterator[str]:
+        yield self.path(digest)
+
+    def response(self, digest: str, size: int, media_type: str, filename: str, range_header: Optional[str]) -> Response:
+        headers = {"ETag": f'"{digest}"', "Content-Disposition": _disposition(filename)}
+        if self.accel_redirect_prefix:
+            # The proxy handles Range and sends the file itself
+            headers["X-Accel-Redirect"] = f"{self.accel_redirect_prefix.rstrip('/')}/{digest[:2]}/{digest[2:4]}/{digest}"
+            return Response(headers=headers, media_type=media_type)
+        return FileRangeResponse(self.path(digest), size, parse_range(range_header, size), headers, media_type)
+
+class S3Storage(Storage):
+    """S3-compatible object storage (AWS, MinIO, ...) via boto3.
+
+    Uploads go to a temporary key as a multipart upload and are copied to
+    blobs/<sha256>, which also refreshes the LastModified of an identical
+    blob stored before. Downloads redirect to a
+    short-lived presigned URL; the object store serves Range requests itself.
+    """
+
+    PART_SIZE = 8 * 1024 * 1024 # S3 minimum is 5 MiB
+
+    def __init__(self, bucket: str, prefix: str = "documents/", endpoint_url: Optional[str] = None):
+        import boto3
+        self.client = boto3.client("s3", endpoint_url=endpoint_url)
+        self.bucket = bucket
+        self.prefix = prefix
+
+    def key(self, digest: str) -> str:
+        return f"{self.prefix}blobs/{digest}"
+
+    async def write(self, chunks: AsyncIterator[bytes]) -> Blob:
+        tmp_key = f"{self.prefix}tmp/{uuid.uuid4().hex}"
+        upload = await run_in_threadpool(self.client.create_multipart_upload, Bucket=self.bucket, Key=tmp_key)
+        upload_id = upload["UploadId"]
+        digest = hashlib.sha256()
+        size = 0
+        parts = []
+        buffer = bytearray()
+
+        async def flush_part():
+            response = await run_in_threadpool(
+                self.client.upload_part, Bucket=self.bucket, Key=tmp_key, UploadId=upload_id,
+                PartNumber=len(parts) + 1, Body=bytes(buffer)
+            )
+            parts.append({"PartNumber": len(parts) + 1, "ETag": response["ETag"]})
+            buffer.clear()
+
+        try:
+            async for chunk in chunks:
+                size += len(chunk)
+                if size > MAX_UPLOAD_BYTES:
+                    raise UploadTooLarge()
+                digest.update(chunk)
+                buffer.extend(chunk)
+                if len(buffer) >= self.PART_SIZE:
+                    await flush_part()
+            if buffer or not parts:
+                await flush_part()
+            await run_in_threadpool(
+                self.client.complete_multipart_upload, Bucket=self.bucket, Key=tmp_key, UploadId=upload_id,
+                MultipartUpload={"Parts": parts}
+            )
+        except BaseException:
+            await run_in_threadpool(self.client.abort_multipart_upload, Bucket=self.bucket, Key=tmp_key, UploadId=upload_id)
+            raise
+
+        created = await self.size(digest.hexdigest()) is None
+        await run_in_threadpool(
+            self.client.copy_object, Bucket=self.bucket, Key=self.key(digest.hexdigest()),
+            CopySource={"Bucket": self.bucket, "Key": tmp_key}
+        )
+        await run_in_threadpool(self.client.delete_object, Bucket=self.bucket, Key=tmp_key)
+        return Blob(digest.hexdigest(), size, created)
+
+    async def collect(self, digest: str, written_before: datetime) -> bool:
+        # S3 has no atomic rename: a re-upload landing between the HEAD and
+        # the DELETE is lost, a window of one round trip
+        from botocore.exceptions import ClientError
+        try:
+            head = await run_in_threadpool(self.client.head_object, Bucket=self.bucket, Key=self.key(digest))
+        except ClientError:
+            return True
+        if head["LastModified"].astimezone(timezone.utc).replace(tzinfo=None) >= written_before:
+            return False
+        await run_in_threadpool(self.client.delete_object, Bucket=self.bucket, Key=self.key(digest))
+        return True
+
+    async def size(self, digest: str) -> Optional[int]:
+        from botocore.exceptions import ClientError
+        try:
+            head = await run_in_threadpool(self.client.head_object, Bucket=self.bucket, Key=self.key(digest))
+        except ClientError:
+            return None
+        return head["ContentLength"]
+
+    @asynccontextmanager
+    async def local_path(self, digest: str) -> AsyncIterator[str]:
+        fd, path = tempfile.mkstemp(prefix="blob-")
+        os.close(fd)
+        try:
+            await run_in_threadpool(self.client.download_file, self.bucket, self.key(digest), path)
+            yield path
+        finally:
+            os.remove(path)
+
+    def response(self, digest: str, size: int, media_type: str, filename: str, range_header: Optional[str]) -> Response:
+        url = self.client.generate_presigned_url(
+            "get_object",
+            Params={
+                "Bucket": self.bucket,
+                "Key": self.key(digest),
+                "ResponseContentType": media_type,
+                "ResponseContentDisposition": _disposition(filename),
+            },
+            ExpiresIn=300
+        )
+        return RedirectResponse(url, status_code=307)
+
+def make_storage() -> Storage:
+    if os.getenv("DOCUMENTS_STORAGE", "fs") == "s3":
+        return S3Storage(
+            bucket=os.environ["DOCUMENTS_S3_BUCKET"],
+            prefix=os.getenv("DOCUMENTS_S3_PREFIX", "documents/"),
+            endpoint_url=os.getenv("DOCUMENTS_S3_ENDPOINT_URL")
+        )
+    return FileSystemStorage(
+        os.getenv("DOCUMENTS_STORAGE_PATH", "./document-store"),
+        accel_redirect_prefix=os.getenv("DOCUMENTS_ACCEL_REDIRECT")
+    )
+
+storage = make_storage()
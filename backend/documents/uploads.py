@@ -0,0 +1,89 @@
+from typing import AsyncIterator, Dict, List, Optional
+from fastapi import HTTPException, Request
+from multipart.multipart import MultipartParser, parse_options_header
+
+# Streaming multipart/form-data reader. Starlette's request.form() spools each
+# file into a SpooledTemporaryFile before the endpoint runs, so a stored
+# upload would be written twice; this hands file bytes to the storage
+# backend as they arrive and keeps only the small text fields in memory.
+
+MAX_FIELD_BYTES = 64 * 1024
+
+class StreamingForm:
+    """One file part plus text fields, read straight off the request body."""
+
+    def __init__(self, request: Request, file_field: str = "file"):
+        content_type, params = parse_options_header(request.headers.get("content-type", ""))
+        if content_type != b"multipart/form-data" or b"boundary" not in params:
+            raise HTTPException(status_code=415, detail="Expected multipart/form-data")
+        self.request = request
+        self.file_field = file_field
+        self.fields: Dict[str, str] = {}
+        self.filename: Optional[str] = None
+        self.content_type: Optional[str] = None
+
+        self._file_data: List[bytes] = []
+        self._headers: Dict[bytes, bytes] = {}
+        self._header_field = b""
+        self._header_value = b""
+        self._name: Optional[str] = None
+        self._is_file = False
+        self._value = bytearray()
+        self._parser = MultipartParser(params[b"boundary"], {
+            "on_part_begin": self._on_part_begin,
+            "on_part_data": self._on_part_data,
+            "on_part_end": self._on_part_end,
+            "on_header_field": self._on_header_field,
+            "on_header_value": self._on_header_value,
+            "on_header_end": self._on_header_end,
+            "on_headers_finished": self._on_headers_finished,
+        })
+
+    def _on_part_begin(self):
+        self._headers = {}
+        self._value = bytearray()
+
+    def _on_header_field(self, data: bytes, start: int, end: int):
+        self._header_field += data[start:end]
+
+    def _on_header_value(self, data: bytes, start: int, end: int):
+        self._header_value += data[start:end]
+
+    def _on_header_end(self):
+        self._headers[self._header_field.lower()] = self._header_value
+        self._header_field = b""
+        self._header_value = b""
+
+    def _on_headers_finished(self):
+        _, options = parse_options_header(self._headers.get(b"content-disposition", b""))
+        self._name = options.get(b"name", b"").decode("latin-1")
+        self._is_file = b"filename" in options
+        if self._is_file:
+            if self._name != self.file_field or self.filename is not None:
+                raise HTTPException(status_code=400, detail=f"Expected a single file field '{self.file_field}'")
+            self.filename = options[b"filename"].decode("utf-8", "replace")
+            self.content_type = self._headers.get(b"content-type", b"application/octet-stream").decode("latin-1")
+
+    def _on_part_data(self, data: bytes, start: int, end: int):
+        if self._is_file:
+            self._file_data.append(data[start:end])
+            return
+        self._value += data[start:end]
+        if len(self._value) > MAX_FIELD_BYTES:
+            raise HTTPException(status_code=413, detail=f"Field '{self._name}' is too large")
+
+    def _on_part_end(self):
+        if not self._is_file:
+            self.fields[self._name] = self._value.decode("utf-8", "replace")
+
+    async def file_chunks(self) -> AsyncIterator[bytes]:
+        """The file's bytes in request-sized chunks; fields are complete once exhausted."""
+        async for chunk in self.request.stream():
+            self._parser.write(chunk)
+            if self._file_data:
+                data = b"".join(self._file_data)
+                self._file_data.clear()
+                yield data
+        self._parser.finalize()
+        if self.filename is None:
+            raise HTTPException(status_code=400, detail=f"Missing file field '{self.file_field}'")
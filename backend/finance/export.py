@@ -0,0 +1,144 @@
+import csv
+import io
+from datetime import date, datetime, time, timedelta
+from typing import AsyncIterator, Iterable, List, Optional
+from xml.sax.saxutils import escape
+from sqlalchemy import select
+from backend.core.database import AsyncSessionLocal
+from backend.finance import models, reports
+
+# Rows are pulled from a server-side cursor in batches of this size and
+# written out as they arrive, so memory stays flat however long the export.
+BATCH_SIZE = 1000
+
+def _csv_chunk(rows: Iterable[Iterable]) -> str:
+    buffer = io.StringIO()
+    csv.writer(buffer).writerows(rows)
+    return buffer.getvalue()
+
+def _ledger_query(account_id: Optional[int], start: Optional[date], end: Optional[date]):
+    # Plain column rows: no ORM identity map to grow during the export
+    query = select(
+        models.LedgerEntry.id,
+        models.LedgerEntry.account_id,
+        models.LedgerEntry.date,
+        models.LedgerEntry.description,
+        models.LedgerEntry.type,
+        models.LedgerEntry.amount,
+        models.LedgerEntry.balance_after
+    )
+    if account_id is not None:
+        query = query.where(models.LedgerEntry.account_id == account_id)
+    if start:
+        query = query.where(models.LedgerEntry.date >= datetime.combine(start, time.min))
+    if end:
+        query = query.where(models.LedgerEntry.date < datetime.combine(end + timedelta(days=1), time.min))
+    return query.order_by(
+        models.LedgerEntry.account_id, models.LedgerEntry.date, models.LedgerEntry.id
+    ).execution_options(yield_per=BATCH_SIZE)
+
+async def ledger_csv(account_id: Optional[int], start: Optional[date], end: Optional[date]) -> AsyncIterator[str]:
+    yield _csv_chunk([["id", "account_id", "date", "description", "type", "amount", "balance_after"]])
+    async with AsyncSessionLocal() as db:
+        result = await db.stream(_ledger_query(account_id, start, end))
+        async for entries in result.partitions():
+            yield _csv_chunk(
+                [e.id, e.account_id, e.date.isoformat(), e.description, e.type, f"{e.amount:.2f}", f"{e.balance_after:.2f}"]
+                for e in entries
+            )
+
+def _ofx_date(d: datetime) -> str:
+    return d.strftime("%Y%m%d%H%M%S")
+
+def _ofx_statement_close(balance: float, as_of: datetime) -> str:
+    return (
+        "</BANKTRANLIST>"
+        f"<LEDGERBAL><BALAMT>{-balance:.2f}</BALAMT><DTASOF>{_ofx_date(as_of)}</DTASOF></LEDGERBAL>"
+        "</STMTRS></STMTTRNRS>\n"
+    )
+
+async def ledger_ofx(account_id: Optional[int], start: Optional[date], end: Optional[date]) -> AsyncIterator[str]:
+    """OFX 2.x, one statement per member account."""
+    now = _ofx_date(datetime.now())
+    yield (
+        '<?xml version="1.0" encoding="UTF-8" standalone="no"?>\n'
+        '<?OFX OFXHEADER="200" VERSION="220" SECURITY="NONE" OLDFILEUID="NONE" NEWFILEUID="NONE"?>\n'
+        "<OFX><SIGNONMSGSRSV1><SONRS><STATUS><CODE>0</CODE><SEVERITY>INFO</SEVERITY></STATUS>"
+        f"<DTSERVER>{now}</DTSERVER><LANGUAGE>ENG</LANGUAGE></SONRS></SIGNONMSGSRSV1>\n"
+        "<BANKMSGSRSV1>\n"
+    )
+    current = None
+    last_entry = None
+    async with AsyncSessionLocal() as db:
+        result = await db.stream(_ledger_query(account_id, start, end))
+        async for entries in result.partitions():
+            parts: List[str] = []
+            for e in entries:
+                if e.account_id != current:
+                    if last_entry is not None:
+                        parts.append(_ofx_statement_close(last_entry.balance_after, last_entry.date))
+                    current = e.account_id
+                    parts.append(
+                        f"<STMTTRNRS><TRNUID>{current}</TRNUID><STATUS><CODE>0</CODE><SEVERITY>INFO</SEVERITY></STATUS>"
+                        f"<STMTRS><CURDEF>USD</CURDEF><BANKACCTFROM><BANKID>HOA</BANKID><ACCTID>{current}</ACCTID>"
+                        f"<ACCTTYPE>CHECKING</ACCTTYPE></BANKACCTFROM><BANKTRANLIST>\n"
+                    )
+                # Ledger amounts are owed-positive; OFX amounts are from the member's side
+                trntype = "CREDIT" if e.amount < 0 else "DEBIT"
+                parts.append(
+                    f"<STMTTRN><TRNTYPE>{trntype}</TRNTYPE><DTPOSTED>{_ofx_date(e.date)}</DTPOSTED>"
+                    f"<TRNAMT>{-e.amount:.2f}</TRNAMT><FITID>{e.id}</FITID>"
+                    f"<NAME>{escape(e.type)}</NAME><MEMO>{escape(e.description or '')}</MEMO></STMTTRN>\n"
+                )
+                last_entry = e
+            yield "".join(parts)
+    if last_entry is not None:
+        yield _ofx_statement_close(last_entry.balance_after, last_entry.date)
+    yield "</BANKMSGSRSV1></OFX>\n"
+
+async def delinquencies_csv(min_days_overdue: int) -> AsyncIterator[str]:
+    now = datetime.now()
+    yield _csv_chunk([["account_id", "name", "address", "balance", "oldest_unpaid_date", "days_overdue"]])
+    async with AsyncSessionLocal() as db:
+        result = await db.stream(
+            select(
+                models.Account.id,
+                models.Account.owner_name,
+                models.Account.address,
+                models.Account.balance,
+                models.Account.oldest_unpaid_date
+            )
+            .where(
+                models.Account.oldest_unpaid_date <= now - timedelta(days=min_days_overdue),
+                models.Account.balance > 0
+            )
+            .order_by(models.Account.oldest_unpaid_date, models.Account.id)
+            .execution_options(yield_per=BATCH_SIZE)
+        )
+        async for rows in result.partitions():
+            yield _csv_chunk(
+                [aid, name, address, f"{balance:.2f}", oldest.isoformat(), (now - oldest).days]
+                for aid, name, address, balance, oldest in rows
+            )
+
+async def balance_sheet_csv(as_of: Optional[date]) -> AsyncIterator[str]:
+    async with AsyncSessionLocal() as db:
+        sheet = await reports.balance_sheet(db, as_of)
+    rows = [["section", "category", "amount"]]
+    for section in ("assets", "liabilities", "equity"):
+        rows.extend([section, item["category"], f"{item['amount']:.2f}"] for item in sheet[section])
+    rows.append(["total", "Total Assets", f"{sheet['total_assets']:.2f}"])
+    rows.append(["total", "Total Liabilities & Equity", f"{sheet['total_liabilities_equity']:.2f}"])
+    yield _csv_chunk(rows)
+
+async def income_statement_csv(start: Optional[date], end: Optional[date], budget_period: str) -> AsyncIterator[str]:
+    async with AsyncSessionLocal() as db:
+        statement = await reports.income_statement(db, start, end, budget_period)
+    rows = [["section", "category", "actual", "budget", "variance"]]
+    for section in ("revenue", "expenses"):
+        rows.extend(
+            [section, item["category"], f"{item['actual']:.2f}", f"{item['budget']:.2f}", f"{item['variance']:.2f}"]
+            for item in statement[section]
+        )
+    rows.append(["total", "Net Income", f"{statement['net_income']:.2f}", "", ""])
+    yield _csv_chunk(rows)
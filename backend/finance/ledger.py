@@ -0,0 +1,221 @@
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Tuple
+from sqlalchemy import case, exists, func, insert, literal, null, select, update
+from sqlalchemy.engine import Engine
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+from backend.finance import models
+from backend.finance.reports import apply_rollups, merge_deltas, rollup_deltas
+
+def _posting_values(amount: float, date: datetime) -> dict:
+    """SET clause applying a posting to the balance and the delinquency index.
+
+    Evaluated against the pre-update row: paying the account off clears the
+    oldest unpaid date, and a charge on a paid-up account starts it.
+    """
+    return {
+        "balance": models.Account.balance + amount,
+        "oldest_unpaid_date": case(
+            (models.Account.balance + amount <= 0, null()),
+            (models.Account.balance <= 0, date),
+            else_=models.Account.oldest_unpaid_date
+        )
+    }
+
+async def _refresh_oldest_unpaid(db: AsyncSession, account_id: int, balance: float):
+    """Re-derive the oldest unpaid charge after a partial payment.
+
+    The outstanding balance is made up of the most recent charges, so walk
+    charges newest-first until they cover the balance.
+    """
+    charges = (
+        select(
+            models.LedgerEntry.date,
+            func.sum(models.LedgerEntry.amount).over(
+                order_by=(models.LedgerEntry.date.desc(), models.LedgerEntry.id.desc())
+            ).label("covered")
+        )
+        .where(models.LedgerEntry.account_id == account_id, models.LedgerEntry.amount > 0)
+        .subquery()
+    )
+    oldest = (await db.execute(
+        select(charges.c.date)
+        .where(charges.c.covered >= balance)
+        .order_by(charges.c.covered)
+        .limit(1)
+    )).scalar_one_or_none()
+    await db.execute(
+        update(models.Account)
+        .where(models.Account.id == account_id)
+        .values(oldest_unpaid_date=oldest)
+    )
+
+async def post_entry(
+    db: AsyncSession,
+    account_id: int,
+    amount: float,
+    type: models.TransactionType,
+    description: str,
+    date: Optional[datetime] = None,
+    idempotency_key: Optional[str] = None
+) -> Optional[models.LedgerEntry]:
+    """Append a ledger entry and advance the account's running balance.
+
+    The balance is bumped with a single UPDATE ... RETURNING, which also
+    row-locks the account until the caller commits. Returns None if the
+    account does not exist. A repeated idempotency_key for the account
+    raises IntegrityError (on flush or commit).
+    """
+    date = date or datetime.now()
+    values = _posting_values(amount, date)
+    if type == models.TransactionType.PAYMENT:
+        values["last_payment_date"] = date
+
+    balance_after = (await db.execute(
+        update(models.Account)
+        .where(models.Account.id == account_id)
+        .values(**values)
+        .returning(models.Account.balance)
+    )).scalar_one_or_none()
+    if balance_after is None:
+        return None
+    if amount < 0 and balance_after > 0:
+        await _refresh_oldest_unpaid(db, account_id, balance_after)
+
+    entry = models.LedgerEntry(
+        account_id=account_id,
+        date=date,
+        description=description,
+        amount=amount,
+        type=type.value,
+        balance_after=balance_after,
+        idempotency_key=idempotency_key
+    )
+    db.add(entry)
+    await apply_rollups(db, rollup_deltas(type, amount, date))
+    await db.flush()
+    return entry
+
+async def post_assessments(
+    db: AsyncSession,
+    billing_period: str,
+    amount: float,
+    description: str,
+    date: Optional[datetime] = None
+) -> Optional[int]:
+    """Charge every account for a billing period (YYYY-MM) in one transaction.
+
+    Entries are dated the first of the period unless `date` is given.
+    Returns the number of ledger rows written, or None (after rolling back)
+    if the period has already been billed. Does not commit, so the caller
+    can queue notices in the same transaction.
+    """
+    date = date or datetime.strptime(billing_period, "%Y-%m")
+
+    # Claiming the period first makes reruns (and concurrent runs) no-ops
+    run = models.AssessmentRun(billing_period=billing_period, amount=amount)
+    db.add(run)
+    try:
+        await db.flush()
+    except IntegrityError:
+        await db.rollback()
+        return None
+
+    # One UPDATE bumps (and locks) every balance and returns exactly the
+    # accounts it charged, so an account opened meanwhile gets neither the
+    # charge nor an entry.
+    charged = (await db.execute(
+        update(models.Account)
+        .values(**_posting_values(amount, date))
+        .returning(models.Account.id, models.Account.balance)
+    )).all()
+    if charged:
+        await db.execute(insert(models.LedgerEntry), [
+            {
+                "account_id": account_id,
+                "date": date,
+                "description": description,
+                "amount": amount,
+                "type": models.TransactionType.ASSESSMENT.value,
+                "balance_after": balance_after
+            }
+            for account_id, balance_after in charged
+        ])
+    run.rows_written = len(charged)
+    await apply_rollups(db, rollup_deltas(
+        models.TransactionType.ASSESSMENT, amount * run.rows_written, date
+    ))
+    return run.rows_written
+
+async def post_late_fees(
+    db: AsyncSession,
+    buckets: List[Tuple[int, float]],
+    date: Optional[datetime] = None
+) -> Dict[int, int]:
+    """Charge late fees in one pass over the delinquency index.
+
+    `buckets` is a list of (min_days_overdue, fee); each delinquent account
+    pays the fee of the highest bucket it has reached. Returns the number of
+    accounts charged per bucket. Commits on success.
+    """
+    date = date or datetime.now()
+    buckets = sorted(buckets, reverse=True)
+    cutoffs = [(date - timedelta(days=min_days), min_days, fee) for min_days, fee in buckets]
+
+    # One relative UPDATE picks the fee per row and returns the new balance,
+    # so a payment committed while fees run is never overwritten. A fee on an
+    # owing account leaves oldest_unpaid_date unchanged.
+    fee = case(
+        *[(models.Account.oldest_unpaid_date <= cutoff, literal(amount, models.Money)) for cutoff, _, amount in cutoffs]
+    )
+    rows = (await db.execute(
+        update(models.Account)
+        .where(models.Account.oldest_unpaid_date <= cutoffs[-1][0], models.Account.balance > 0)
+        .values(balance=models.Account.balance + fee)
+        .returning(models.Account.id, models.Account.balance, models.Account.oldest_unpaid_date)
+        .execution_options(synchronize_session=False)
+    )).all()
+
+    charged = {min_days: 0 for min_days, _ in buckets}
+    entries = []
+    for account_id, balance_after, oldest_unpaid in rows:
+        _, min_days, bucket_fee = next(c for c in cutoffs if oldest_unpaid <= c[0])
+        charged[min_days] += 1
+        entries.append({
+            "account_id": account_id,
+            "date": date,
+            "description": f"Late Fee - {min_days}+ Days Overdue",
+            "amount": bucket_fee,
+            "type": models.TransactionType.LATE_FEE.value,
+            "balance_after": balance_after
+        })
+
+    if entries:
+        await db.execute(insert(models.LedgerEntry), entries)
+        await apply_rollups(db, merge_deltas(
+            rollup_deltas(models.TransactionType.LATE_FEE, e["amount"], date) for e in entries
+        ))
+    await db.commit()
+    return charged
+
+async def find_idempotent_entry(
+    db: AsyncSession, account_id: int, idempotency_key: str
+) -> Optional[models.LedgerEntry]:
+    return (await db.execute(
+        select(models.LedgerEntry).where(
+            models.LedgerEntry.account_id == account_id,
+            models.LedgerEntry.idempotency_key == idempotency_key
+        )
+    )).scalar_one_or_none()
+
+def seed_demo_account(engine: Engine):
+    """Open the account the resident pages use (account 1, until there is
+    auth) on a database that has no accounts yet."""
+    with engine.begin() as conn:
+        conn.execute(
+            insert(models.Account).from_select(
+                ["owner_name", "address", "balance"],
+                select(literal("John Doe"), literal("123 Maple St, Unit 4B"), literal(0, models.Money))
+                .where(~exists(select(models.Account.id)))
+            )
+        )
@@ -0,0 +1,92 @@
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Numeric, Index
+from sqlalchemy.orm import relationship
+from backend.core.database import Base
+import enum
+from datetime import datetime
+
+# Money columns: exact NUMERIC in the database, plain floats in Python to
+# match the API models.
+Money = Numeric(12, 2, asdecimal=False)
+
+class TransactionType(str, enum.Enum):
+    ASSESSMENT = "Assessment"
+    PAYMENT = "Payment"
+    LATE_FEE = "Late Fee"
+    FINE = "Fine"
+
+class Account(Base):
+    __tablename__ = "accounts"
+
+    id = Column(Integer, primary_key=True, index=True)
+    owner_name = Column(String)
+    address = Column(String)
+    # Running balance, advanced on every posting so reads never sum history
+    balance = Column(Money, nullable=False, default=0)
+    last_payment_date = Column(DateTime, nullable=True)
+    # Delinquency index: date of the oldest charge not yet covered by payments
+    # (payments apply oldest-first); NULL when the account is paid up.
+    oldest_unpaid_date = Column(DateTime, nullable=True, index=True)
+    created_at = Column(DateTime, default=datetime.utcnow)
+
+    entries = relationship("LedgerEntry", back_populates="account")
+
+class LedgerEntry(Base):
+    __tablename__ = "ledger_entries"
+    __table_args__ = (
+        # Per-account history in date order; id breaks ties for keyset paging
+        Index("ix_ledger_entries_account_date", "account_id", "date", "id"),
+        # Client-supplied key: a retried posting finds the original entry
+        Index("uq_ledger_entries_idempotency", "account_id", "idempotency_key", unique=True),
+    )
+
+    id = Column(Integer, primary_key=True)
+    account_id = Column(Integer, ForeignKey("accounts.id"), nullable=False)
+    date = Column(DateTime, nullable=False, default=datetime.now)
+    description = Column(String)
+    amount = Column(Money, nullable=False)
+    type = Column(String, nullable=False)
+    balance_after = Column(Money, nullable=False)
+    idempotency_key = Column(String, nullable=True)
+
+    account = relationship("Account", back_populates="entries")
+
+class AssessmentRun(Base):
+    """One row per billing period; makes assessment generation idempotent."""
+    __tablename__ = "assessment_runs"
+
+    id = Column(Integer, primary_key=True)
+    billing_period = Column(String, unique=True, nullable=False) # YYYY-MM
+    amount = Column(Money, nullable=False)
+    rows_written = Column(Integer, default=0)
+    run_at = Column(DateTime, default=datetime.now)
+
+class ReportSection(str, enum.Enum):
+    ASSET = "asset"
+    LIABILITY = "liability"
+    REVENUE = "revenue"
+    EXPENSE = "expense"
+
+class ReportRollup(Base):
+    """Running total per report category per month, maintained as entries post."""
+    __tablename__ = "report_rollups"
+    __table_args__ = (
+        Index("uq_report_rollups_period_category", "period", "section", "category", unique=True),
+    )
+
+    id = Column(Integer, primary_key=True)
+    period = Column(String, nullable=False) # YYYY-MM
+    section = Column(String, nullable=False)
+    category = Column(String, nullable=False)
+    amount = Column(Money, nullable=False, default=0)
+
+class BudgetLine(Base):
+    __tablename__ = "budget_lines"
+    __table_args__ = (
+        Index("uq_budget_lines_period_category", "budget_period", "section", "category", unique=True),
+    )
+
+    id = Column(Integer, primary_key=True)
+    budget_period = Column(String, nullable=False) # Fiscal year, e.g. 2026
+    section = Column(String, nullable=False) # revenue / expense
+    category = Column(String, nullable=False)
+    amount = Column(Money, nullable=False)
@@ -0,0 +1,314 @@
+import bisect
+import csv
+import hashlib
+import re
+from collections import defaultdict
+from dataclasses import dataclass, field
+from datetime import date, datetime, timedelta
+from typing import Dict, Iterable, List, Optional, Tuple
+from sqlalchemy import and_, case, func, insert, null, or_, select, update
+from sqlalchemy.orm import aliased
+from sqlalchemy.ext.asyncio import AsyncSession
+from starlette.concurrency import run_in_threadpool
+from backend.finance import models
+from backend.finance.reports import apply_rollups, merge_deltas, rollup_deltas
+
+# Lockbox / bank references that name a member account: "ACCT-123", "A123"
+ACCOUNT_REFERENCE = re.compile(r"^(?:ACCT|ACC|A)[-# ]?(\d+)$", re.IGNORECASE)
+# A bare number ("1042") is as likely a check or invoice number; it only
+# names an account that has an open charge of exactly the deposited amount
+BARE_REFERENCE = re.compile(r"^#?(\d+)$")
+
+# Accounts are locked and written in chunks of this size
+CHUNK_SIZE = 1000
+
+CHARGE_TYPES = [
+    models.TransactionType.ASSESSMENT.value,
+    models.TransactionType.LATE_FEE.value,
+    models.TransactionType.FINE.value,
+]
+
+@dataclass
+class StatementLine:
+    line: int
+    date: datetime
+    amount: float
+    reference: str
+    description: str
+    key: str # Idempotency key so a re-imported statement never double-posts
+
+@dataclass
+class Reconciliation:
+    lines: int = 0
+    matched: List[Tuple[StatementLine, int]] = field(default_factory=list)
+    unmatched: List[dict] = field(default_factory=list)
+    duplicates: int = 0
+    posted: int = 0
+
+def _parse_date(value: str) -> datetime:
+    value = value.strip()
+    try:
+        return datetime.fromisoformat(value)
+    except ValueError:
+        pass
+    for fmt in ("%m/%d/%Y", "%Y%m%d"):
+        try:
+            return datetime.strptime(value, fmt)
+        except ValueError:
+            continue
+    raise ValueError(f"Unrecognized date '{value}'")
+
+def parse_statement(text_lines: Iterable[str]) -> Iterable[Tuple[int, Optional[StatementLine], Optional[dict]]]:
+    """Stream a CSV statement (date, amount, reference, description columns).
+
+    Yields (line_number, parsed_line, None) or (line_number, None, residue)
+    for rows that cannot be parsed.
+    """
+    reader = csv.DictReader(text_lines)
+    if reader.fieldnames:
+        reader.fieldnames = [name.strip().lower() for name in reader.fieldnames]
+    seen: Dict[str, int] = defaultdict(int)
+    for row in reader:
+        line = reader.line_num
+        try:
+            posted = _parse_date(row.get("date") or "")
+            amount = round(float((row.get("amount") or "").replace(",", "").replace("$", "")), 2)
+        except ValueError as exc:
+            yield line, None, {"line": line, "reason": str(exc), **row}
+            continue
+        reference = (row.get("reference") or "").strip()
+        description = (row.get("description") or "").strip()
+        # Identical lines (two equal checks on one day) are told apart by occurrence
+        fingerprint = f"{posted.date()}|{amount:.2f}|{reference}|{description}"
+        seen[fingerprint] += 1
+        digest = hashlib.sha1(f"{fingerprint}|{seen[fingerprint]}".encode()).hexdigest()
+        yield line, StatementLine(line, posted, amount, reference, description, f"bank:{digest}"), None
+
+class OpenChargeIndex:
+    """Unpaid charges bucketed by amount, each bucket sorted by date.
+
+    A statement line is matched with one bisect into its amount bucket,
+    constrained to charges dated within the window before the deposit.
+    """
+
+    def __init__(self):
+        self._by_amount: Dict[float, List[Tuple[datetime, int, int]]] = defaultdict(list)
+
+    @classmethod
+    async def load(cls, db: AsyncSession) -> "OpenChargeIndex":
+        index = cls()
+        rows = await db.execute(
+            select(models.LedgerEntry.id, models.LedgerEntry.account_id, models.LedgerEntry.date, models.LedgerEntry.amount)
+            .join(models.Account, models.Account.id == models.LedgerEntry.account_id)
+            .where(
+                models.Account.oldest_unpaid_date.is_not(None),
+                models.LedgerEntry.date >= models.Account.oldest_unpaid_date,
+                models.LedgerEntry.type.in_(CHARGE_TYPES),
+                models.LedgerEntry.amount > 0
+            )
+        )
+        for entry_id, account_id, posted, amount in rows.all():
+            index._by_amount[round(amount, 2)].append((posted, entry_id, account_id))
+        for bucket in index._by_amount.values():
+            bucket.sort()
+        return index
+
+    def _window(self, bucket: list, posted: datetime, window: timedelta) -> Tuple[int, int]:
+        return bisect.bisect_left(bucket, (posted - window,)), bisect.bisect_right(bucket, (posted, float("inf")))
+
+    def _consume(self, bucket: list, lo: int, hi: int, account_id: int):
+        # Consume the oldest matching charge so it cannot match again
+        for i in range(lo, hi):
+            if bucket[i][2] == account_id:
+                del bucket[i]
+                return
+
+    def match(self, amount: float, posted: datetime, window: timedelta) -> Tuple[Optional[int], str]:
+        """Return (account_id, "") for a unique match, else (None, reason)."""
+        bucket = self._by_amount.get(amount)
+        if not bucket:
+            return None, "No open charge for this amount"
+        lo, hi = self._window(bucket, posted, window)
+        candidates = {account_id for _, _, account_id in bucket[lo:hi]}
+        if not candidates:
+            return None, "No open charge for this amount in the date window"
+        if len(candidates) > 1:
+            return None, "Ambiguous: several accounts have a matching open charge"
+        account_id = candidates.pop()
+        self._consume(bucket, lo, hi, account_id)
+        return account_id, ""
+
+    def match_account(self, account_id: int, amount: float, posted: datetime, window: timedelta) -> bool:
+        """Match (and consume) an open charge of `account_id` for exactly this amount."""
+        bucket = self._by_amount.get(amount, [])
+        lo, hi = self._window(bucket, posted, window)
+        if not any(charge_account == account_id for _, _, charge_account in bucket[lo:hi]):
+            return False
+        self._consume(bucket, lo, hi, account_id)
+        return True
+
+def _match_lines(
+    result: Reconciliation,
+    text_lines: Iterable[str],
+    index: OpenChargeIndex,
+    account_ids: set,
+    window: timedelta
+):
+    """Single streaming pass over the statement (CPU only, no I/O awaits)."""
+    for line, parsed, residue in parse_statement(text_lines):
+        result.lines += 1
+        if residue:
+            result.unmatched.append(residue)
+            continue
+        if parsed.amount <= 0:
+            result.unmatched.append(_residue(parsed, "Not a deposit"))
+            continue
+        ref = ACCOUNT_REFERENCE.match(parsed.reference)
+        if ref and int(ref.group(1)) in account_ids:
+            result.matched.append((parsed, int(ref.group(1))))
+            continue
+        bare = BARE_REFERENCE.match(parsed.reference)
+        if bare and int(bare.group(1)) in account_ids:
+            account_id = int(bare.group(1))
+            if index.match_account(account_id, parsed.amount, parsed.date, window):
+                result.matched.append((parsed, account_id))
+            else:
+                result.unmatched.append(_residue(
+                    parsed, f"Reference {parsed.reference} is not marked as an account and account "
+                            f"{account_id} has no open charge of this amount"
+                ))
+            continue
+        account_id, reason = index.match(parsed.amount, parsed.date, window)
+        if account_id is None:
+            result.unmatched.append(_residue(parsed, reason))
+        else:
+            result.matched.append((parsed, account_id))
+
+async def reconcile(
+    db: AsyncSession,
+    text_lines: Iterable[str],
+    window_days: int = 45,
+    dry_run: bool = False
+) -> Reconciliation:
+    """Match a bank statement against open charges and post the matches in bulk.
+
+    Lines whose reference names a member account ("ACCT-123") match that
+    account; a bare number only does if that account has an open charge of
+    the deposited amount. Others must match exactly one account's open
+    charge by amount, dated within `window_days` before the deposit.
+    Commits unless dry_run.
+    """
+    result = Reconciliation()
+    index = await OpenChargeIndex.load(db)
+    account_ids = set((await db.execute(select(models.Account.id))).scalars().all())
+
+    # Parsing/matching is CPU-bound; keep it off the event loop
+    await run_in_threadpool(_match_lines, result, text_lines, index, account_ids, timedelta(days=window_days))
+
+    if not dry_run and result.matched:
+        await _post_matches(db, result)
+    return result
+
+def _residue(line: StatementLine, reason: str) -> dict:
+    return {
+        "line": line.line,
+        "date": line.date.date().isoformat(),
+        "amount": line.amount,
+        "reference": line.reference,
+        "description": line.description,
+        "reason": reason
+    }
+
+async def _post_matches(db: AsyncSession, result: Reconciliation):
+    # Drop lines already posted by an earlier import of the same statement
+    keys = [line.key for line, _ in result.matched]
+    posted_keys = set()
+    for i in range(0, len(keys), CHUNK_SIZE):
+        posted_keys.update((await db.execute(
+            select(models.LedgerEntry.idempotency_key)
+            .where(models.LedgerEntry.idempotency_key.in_(keys[i:i + CHUNK_SIZE]))
+        )).scalars().all())
+    by_account: Dict[int, List[StatementLine]] = defaultdict(list)
+    for line, account_id in result.matched:
+        if line.key in posted_keys:
+            result.duplicates += 1
+        else:
+            by_account[account_id].append(line)
+
+    account_ids = sorted(by_account)
+    for i in range(0, len(account_ids), CHUNK_SIZE):
+        chunk = account_ids[i:i + CHUNK_SIZE]
+        lines_by_account = {
+            account_id: sorted(by_account[account_id], key=lambda l: (l.date, l.line)) for account_id in chunk
+        }
+        # One relative UPDATE per chunk: concurrent postings are never
+        # overwritten, and RETURNING gives the balance the entries build on
+        paid = case(
+            {account_id: sum(l.amount for l in lines) for account_id, lines in lines_by_account.items()},
+            value=models.Account.id
+        )
+        paid_on = case(
+            {account_id: lines[-1].date for account_id, lines in lines_by_account.items()},
+            value=models.Account.id
+        )
+        balance_after = models.Account.balance - paid
+        balances = dict((await db.execute(
+            update(models.Account)
+            .where(models.Account.id.in_(chunk))
+            .values(
+                balance=balance_after,
+                last_payment_date=case(
+                    (models.Account.last_payment_date > paid_on, models.Account.last_payment_date),
+                    else_=paid_on
+                ),
+                oldest_unpaid_date=case(
+                    (balance_after <= 0, null()),
+                    else_=func.coalesce(_oldest_unpaid(balance_after), models.Account.oldest_unpaid_date)
+                )
+            )
+            .returning(models.Account.id, models.Account.balance)
+            .execution_options(synchronize_session=False)
+        )).all())
+
+        entries = []
+        deltas = []
+        for account_id, balance in balances.items():
+            lines = lines_by_account[account_id]
+            balance += sum(l.amount for l in lines)
+            for line in lines:
+                balance -= line.amount
+                entries.append({
+                    "account_id": account_id,
+                    "date": line.date,
+                    "description": f"Bank Payment ({line.reference or line.description or 'deposit'})",
+                    "amount": -line.amount,
+                    "type": models.TransactionType.PAYMENT.value,
+                    "balance_after": round(balance, 2),
+                    "idempotency_key": line.key
+                })
+                deltas.append(rollup_deltas(models.TransactionType.PAYMENT, -line.amount, line.date))
+        if entries:
+            await db.execute(insert(models.LedgerEntry), entries)
+            await apply_rollups(db, merge_deltas(deltas))
+        result.posted += len(entries)
+    await db.commit()
+
+def _oldest_unpaid(balance):
+    """Date of the oldest charge still needed to cover `balance`: the latest
+    charge whose suffix of charges (newest first) reaches it."""
+    charge = aliased(models.LedgerEntry)
+    later = aliased(models.LedgerEntry)
+    covered = (
+        select(func.sum(later.amount))
+        .where(
+            later.account_id == charge.account_id,
+            later.amount > 0,
+            or_(later.date > charge.date, and_(later.date == charge.date, later.id >= charge.id))
+        )
+        .scalar_subquery()
+    )
+    return (
+        select(func.max(charge.date))
+        .where(charge.account_id == models.Account.id, charge.amount > 0, covered >= balance)
+        .scalar_subquery()
+    )
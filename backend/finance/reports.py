@@ -0,0 +1,200 @@
+# Materialized financial reports: every ledger posting also bumps per-month,
+# per-category rollups, so the balance sheet and income statement sum a few
+# rollup rows instead of the ledger. Backfill / rebuild from the ledger with:
+#
+#     python -m backend.finance.reports rebuild
+import asyncio
+import sys
+from collections import defaultdict
+from datetime import date, datetime
+from typing import Dict, Iterable, List, Optional, Tuple
+from sqlalchemy import delete, func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from backend.finance import models
+from backend.finance.models import ReportSection, TransactionType
+
+# How one ledger entry of each type moves the report categories: the
+# entry amount is multiplied by the sign. Payments are stored negative.
+ROLLUPS = {
+    TransactionType.ASSESSMENT: [
+        (ReportSection.REVENUE, "Assessment Income", 1),
+        (ReportSection.ASSET, "Accounts Receivable", 1),
+    ],
+    TransactionType.LATE_FEE: [
+        (ReportSection.REVENUE, "Late Fees / Fines", 1),
+        (ReportSection.ASSET, "Accounts Receivable", 1),
+    ],
+    TransactionType.FINE: [
+        (ReportSection.REVENUE, "Late Fees / Fines", 1),
+        (ReportSection.ASSET, "Accounts Receivable", 1),
+    ],
+    TransactionType.PAYMENT: [
+        (ReportSection.ASSET, "Operating Account", -1),
+        (ReportSection.ASSET, "Accounts Receivable", 1),
+    ],
+}
+
+RollupKey = Tuple[str, str, str] # (period, section, category)
+
+def period_of(d: date) -> str:
+    return d.strftime("%Y-%m")
+
+def rollup_deltas(type: TransactionType, amount: float, posted: date) -> Dict[RollupKey, float]:
+    """Rollup changes for `amount` posted as `type` (amount may be a batch total)."""
+    period = period_of(posted)
+    return {
+        (period, section.value, category): sign * amount
+        for section, category, sign in ROLLUPS[TransactionType(type)]
+    }
+
+def merge_deltas(deltas: Iterable[Dict[RollupKey, float]]) -> Dict[RollupKey, float]:
+    merged = defaultdict(float)
+    for delta in deltas:
+        for key, amount in delta.items():
+            merged[key] += amount
+    return merged
+
+def _dialect_insert(db: AsyncSession):
+    if db.get_bind().dialect.name == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert
+    else:
+        from sqlalchemy.dialects.sqlite import insert
+    return insert
+
+async def apply_rollups(db: AsyncSession, deltas: Dict[RollupKey, float]):
+    """Add deltas to the rollups in the caller's transaction (one upsert)."""
+    if not deltas:
+        return
+    insert = _dialect_insert(db)
+    stmt = insert(models.ReportRollup).values([
+        {"period": period, "section": section, "category": category, "amount": amount}
+        for (period, section, category), amount in deltas.items()
+    ])
+    stmt = stmt.on_conflict_do_update(
+        index_elements=["period", "section", "category"],
+        set_={"amount": models.ReportRollup.amount + stmt.excluded.amount}
+    )
+    await db.execute(stmt)
+
+async def rebuild_rollups(db: AsyncSession) -> int:
+    """Recompute every rollup from the ledger. Commits; returns rollup rows written.
+
+    Run while postings are paused: entries committed during the rebuild can
+    be counted twice or not at all.
+    """
+    if db.get_bind().dialect.name == "postgresql":
+        period = func.to_char(models.LedgerEntry.date, "YYYY-MM")
+    else:
+        period = func.strftime("%Y-%m", models.LedgerEntry.date)
+
+    grouped = await db.execute(
+        select(period, models.LedgerEntry.type, func.sum(models.LedgerEntry.amount))
+        .group_by(period, models.LedgerEntry.type)
+    )
+    deltas = defaultdict(float)
+    for entry_period, entry_type, total in grouped.all():
+        for section, category, sign in ROLLUPS[TransactionType(entry_type)]:
+            deltas[(entry_period, section.value, category)] += sign * total
+
+    await db.execute(delete(models.ReportRollup))
+    await apply_rollups(db, deltas)
+    await db.commit()
+    return len(deltas)
+
+async def _section_totals(
+    db: AsyncSession,
+    sections: List[ReportSection],
+    start: Optional[str],
+    end: Optional[str]
+) -> Dict[Tuple[str, str], float]:
+    query = (
+        select(models.ReportRollup.section, models.ReportRollup.category, func.sum(models.ReportRollup.amount))
+        .where(models.ReportRollup.section.in_([s.value for s in sections]))
+        .group_by(models.ReportRollup.section, models.ReportRollup.category)
+    )
+    if start:
+        query = query.where(models.ReportRollup.period >= start)
+    if end:
+        query = query.where(models.ReportRollup.period <= end)
+    rows = await db.execute(query)
+    return {(section, category): total for section, category, total in rows.all()}
+
+async def balance_sheet(db: AsyncSession, as_of: Optional[date] = None) -> dict:
+    """Cumulative position through the month of `as_of` (default: everything)."""
+    totals = await _section_totals(
+        db, [ReportSection.ASSET, ReportSection.LIABILITY], None, period_of(as_of) if as_of else None
+    )
+    assets = []
+    liabilities = []
+    for (section, category), amount in sorted(totals.items()):
+        if category == "Accounts Receivable" and amount < 0:
+            # Net credit balances across member accounts are prepayments
+            liabilities.append({"category": "Prepaid Assessments", "amount": -amount})
+        elif section == ReportSection.ASSET.value:
+            assets.append({"category": category, "amount": amount})
+        else:
+            liabilities.append({"category": category, "amount": amount})
+
+    total_assets = sum(a["amount"] for a in assets)
+    total_liab = sum(l["amount"] for l in liabilities)
+    equity = [{"category": "Retained Earnings", "amount": total_assets - total_liab}]
+    return {
+        "assets": assets,
+        "liabilities": liabilities,
+        "equity": equity,
+        "total_assets": total_assets,
+        "total_liabilities_equity": total_assets
+    }
+
+async def income_statement(
+    db: AsyncSession,
+    start: Optional[date] = None,
+    end: Optional[date] = None,
+    budget_period: Optional[str] = None
+) -> dict:
+    """Revenue and expenses for the months spanned by start..end, against a budget."""
+    actuals = await _section_totals(
+        db,
+        [ReportSection.REVENUE, ReportSection.EXPENSE],
+        period_of(start) if start else None,
+        period_of(end) if end else None
+    )
+    budgets = {}
+    if budget_period:
+        rows = await db.execute(
+            select(models.BudgetLine.section, models.BudgetLine.category, models.BudgetLine.amount)
+            .where(models.BudgetLine.budget_period == budget_period)
+        )
+        budgets = {(section, category): amount for section, category, amount in rows.all()}
+
+    def lines(section: ReportSection) -> List[dict]:
+        categories = sorted({c for s, c in list(actuals) + list(budgets) if s == section.value})
+        result = []
+        for category in categories:
+            actual = actuals.get((section.value, category), 0.0)
+            budget = budgets.get((section.value, category), 0.0)
+            # Positive variance is favourable: revenue over budget, expenses under
+            variance = actual - budget if section == ReportSection.REVENUE else budget - actual
+            result.append({"category": category, "actual": actual, "budget": budget, "variance": variance})
+        return result
+
+    revenue = lines(ReportSection.REVENUE)
+    expenses = lines(ReportSection.EXPENSE)
+    return {
+        "revenue": revenue,
+        "expenses": expenses,
+        "net_income": sum(r["actual"] for r in revenue) - sum(e["actual"] for e in expenses)
+    }
+
+async def _main(argv: List[str]):
+    from backend.core.database import AsyncSessionLocal
+    if argv != ["rebuild"]:
+        print("usage: python -m backend.finance.reports rebuild")
+        sys.exit(2)
+    started = datetime.now()
+    async with AsyncSessionLocal() as db:
+        written = await rebuild_rollups(db)
+    print(f"Rebuilt {written} rollup rows in {(datetime.now() - started).total_seconds():.2f}s")
+
+if __name__ == "__main__":
+    asyncio.run(_main(sys.argv[1:]))
@@ -1,29 +1,57 @@
-from fastapi import APIRouter, HTTPException
-from pydantic import BaseModel
-from typing import List
-from datetime import datetime
+from fastapi import APIRouter, BackgroundTasks, File, HTTPException, Depends, Header, Query, Response, UploadFile
+from fastapi.responses import StreamingResponse
+from pydantic import BaseModel, validator
+from sqlalchemy import delete, insert, select, tuple_
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import List, Optional
+from datetime import date, datetime, timedelta
+from decimal import ROUND_HALF_UP, Decimal
+import io
+import time
 from enum import Enum
+from backend.core.database import AsyncSessionLocal, get_async_db
+from backend.core.pagination import NEXT_CURSOR_HEADER, decode_cursor, encode_cursor
+from backend.finance import export, models, reconciliation, reports
+from backend.finance.ledger import find_idempotent_entry, post_assessments, post_entry, post_late_fees
+from backend.finance.models import ReportSection, TransactionType
+from backend.notifications.models import Category
+from backend.notifications.queue import enqueue
 
 router = APIRouter()
 
-class TransactionType(str, Enum):
-    ASSESSMENT = "Assessment"
-    PAYMENT = "Payment"
-    LATE_FEE = "Late Fee"
-    FINE = "Fine"
-
 class PaymentRequest(BaseModel):
     amount: float
     card_Last4: str
 
+    @validator("amount")
+    def round_to_cents(cls, amount: float) -> float:
+        # Money is stored to the cent; a retried payment must compare equal
+        return float(Decimal(str(amount)).quantize(Decimal("0.01"), rounding=ROUND_HALF_UP))
+
 class Transaction(BaseModel):
     id: int
+    account_id: int
     date: datetime
     description: str
     amount: float
     type: TransactionType
     balance_after: float
 
+    class Config:
+        orm_mode = True
+
+class AccountCreate(BaseModel):
+    owner_name: str
+    address: str
+
+class Account(AccountCreate):
+    id: int
+    balance: float
+
+    class Config:
+        orm_mode = True
+
 class LedgerSummary(BaseModel):
     current_balance: float
     last_payment_date: datetime = None
@@ -35,6 +63,22 @@ class DelinquentResident(BaseModel):
     balance: float
     days_overdue: int
 
+class AgingBucket(BaseModel):
+    min_days: int
+    fee: float
+
+class LateFeePolicy(BaseModel):
+    buckets: List[AgingBucket] = [
+        AgingBucket(min_days=30, fee=25.00),
+        AgingBucket(min_days=60, fee=50.00),
+        AgingBucket(min_days=90, fee=75.00)
+    ]
+
+class BudgetLineIn(BaseModel):
+    section: ReportSection # revenue / expense
+    category: str
+    amount: float
+
 class BalanceSheetItem(BaseModel):
     category: str
     amount: float
@@ -57,160 +101,284 @@ class IncomeStatement(BaseModel):
     expenses: List[IncomeStatementItem]
     net_income: float
 
-# Mock Database
-
-# Mock Database
-mock_transactions = [
-    {
-        "id": 1,
-        "date": datetime(2025, 1, 1),
-        "description": "January 2025 Assessment",
-        "amount": 250.00,
-        "type": TransactionType.ASSESSMENT,
-        "balance_after": 250.00
-    },
-    {
-        "id": 2,
-        "date": datetime(2025, 1, 15),
-        "description": "Late Fee - Jan",
-        "amount": 25.00,
-        "type": TransactionType.LATE_FEE,
-        "balance_after": 275.00
-    }
-]
-
-# Mock Assessments/Resident Balances
-# In a real DB, this would be a separate table linking User to Transactions
-mock_delinquencies = [
-    {
-        "id": 101,
-        "name": "Michael Scott",
-        "address": "1725 Slough Ave",
-        "balance": 450.00,
-        "days_overdue": 45
-    },
-    {
-        "id": 102,
-        "name": "Dwight Schrute",
-        "address": "Schrute Farms",
-        "balance": 1200.00,
-        "days_overdue": 90
-    }
-]
+async def _get_account(db: AsyncSession, account_id: int) -> models.Account:
+    account = await db.get(models.Account, account_id)
+    if not account:
+        raise HTTPException(status_code=404, detail="Account not found")
+    return account
+
+@router.post("/accounts", response_model=Account)
+async def create_account(account: AccountCreate, db: AsyncSession = Depends(get_async_db)):
+    """Open a ledger account for a unit (Board/Management only)"""
+    db_account = models.Account(**account.dict(), balance=0)
+    db.add(db_account)
+    await db.commit()
+    return db_account
 
 @router.get("/ledger", response_model=List[Transaction])
-async def get_ledger():
-    return mock_transactions
+async def get_ledger(
+    response: Response,
+    account_id: int = 1, # Mock auth
+    cursor: Optional[str] = None,
+    limit: int = Query(100, ge=1, le=1000),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Account history, newest first. Pass the X-Next-Cursor header back as `cursor` for older entries."""
+    after = decode_cursor(cursor, datetime, int)
+    await _get_account(db, account_id)
+    
+    query = select(models.LedgerEntry).where(models.LedgerEntry.account_id == account_id)
+    if after:
+        query = query.where(tuple_(models.LedgerEntry.date, models.LedgerEntry.id) < tuple_(*after))
+    query = query.order_by(models.LedgerEntry.date.desc(), models.LedgerEntry.id.desc()).limit(limit)
+    
+    entries = (await db.execute(query)).scalars().all()
+    if len(entries) == limit:
+        last = entries[-1]
+        response.headers[NEXT_CURSOR_HEADER] = encode_cursor(last.date, last.id)
+    return entries
+
+async def _replay_payment(db: AsyncSession, account_id: int, payment: PaymentRequest, idempotency_key: str):
+    """Return the entry already posted under this key, if any."""
+    existing = await find_idempotent_entry(db, account_id, idempotency_key)
+    if existing and (existing.type != TransactionType.PAYMENT.value or existing.amount != -payment.amount):
+        raise HTTPException(status_code=409, detail="Idempotency key was already used for a different payment.")
+    return existing
 
 @router.post("/pay", response_model=Transaction)
-async def make_payment(payment: PaymentRequest):
-    current_bal = mock_transactions[-1]["balance_after"] if mock_transactions else 0.0
-    new_bal = current_bal - payment.amount
+async def make_payment(
+    payment: PaymentRequest,
+    account_id: int = 1,
+    idempotency_key: Optional[str] = Header(None, max_length=128),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Post a payment. Clients should send an Idempotency-Key header so a
+    retried request returns the original transaction instead of paying twice."""
+    if payment.amount <= 0:
+        raise HTTPException(status_code=400, detail="Payment amount must be positive.")
     
-    new_tx = {
-        "id": len(mock_transactions) + 1,
-        "date": datetime.now(),
-        "description": f"Online Payment (xxxx-{payment.card_Last4})",
-        "amount": -payment.amount, # Negative for payment logic if summing, but here strictly display
-        "type": TransactionType.PAYMENT,
-        "balance_after": new_bal
-    }
-    mock_transactions.append(new_tx)
-    return new_tx
+    if idempotency_key:
+        existing = await _replay_payment(db, account_id, payment, idempotency_key)
+        if existing:
+            return existing
+    
+    try:
+        # post_entry row-locks the account, so concurrent payments serialize
+        entry = await post_entry(
+            db,
+            account_id,
+            -payment.amount, # Payments reduce the balance
+            TransactionType.PAYMENT,
+            f"Online Payment (xxxx-{payment.card_Last4})",
+            idempotency_key=idempotency_key
+        )
+        if entry is None:
+            raise HTTPException(status_code=404, detail="Account not found")
+        await db.commit()
+    except IntegrityError:
+        # A concurrent request with the same key won the race
+        await db.rollback()
+        existing = await _replay_payment(db, account_id, payment, idempotency_key)
+        if not existing:
+            raise
+        return existing
+    return entry
 
 @router.get("/balance", response_model=LedgerSummary)
-async def get_balance():
-    # Calculate balance from mock transactions (simple sum of last state)
-    current_bal = mock_transactions[-1]["balance_after"] if mock_transactions else 0.0
+async def get_balance(account_id: int = 1, db: AsyncSession = Depends(get_async_db)):
+    # Running balance is maintained on the account row: a primary-key lookup
+    account = await _get_account(db, account_id)
     return {
-        "current_balance": current_bal,
-        "last_payment_date": None # No payments in mock yet
+        "current_balance": account.balance,
+        "last_payment_date": account.last_payment_date
     }
 
 @router.post("/assessments/generate")
-async def generate_assessments():
-    # Logic to add monthly assessment to all residents
-    # Mocking single addition to current user ledger
-    new_tx = {
-        "id": len(mock_transactions) + 1,
-        "date": datetime.now(),
-        "description": "Monthly HOA Assessment",
-        "amount": 250.00,
-        "type": TransactionType.ASSESSMENT,
-        "balance_after": (mock_transactions[-1]["balance_after"] if mock_transactions else 0) + 250.00
+async def generate_assessments(
+    billing_period: Optional[str] = Query(None, regex=r"^\d{4}-(0[1-9]|1[0-2])$"),
+    amount: float = Query(250.00, gt=0),
+    db: AsyncSession = Depends(get_async_db)
+):
+    # Post the monthly assessment to every account. Safe to rerun: each
+    # billing period (YYYY-MM, default current month) is charged once.
+    billing_period = billing_period or datetime.now().strftime("%Y-%m")
+    started = time.perf_counter()
+    rows_written = await post_assessments(
+        db, billing_period, amount, f"{billing_period} HOA Assessment"
+    )
+    if rows_written is not None:
+        # Charges and their notices commit together (transactional outbox)
+        await enqueue(
+            db, Category.BILLING,
+            f"{billing_period} HOA assessment",
+            f"Your {billing_period} HOA assessment of ${amount:,.2f} has been posted to your account."
+        )
+        await db.commit()
+    elapsed_ms = round((time.perf_counter() - started) * 1000, 1)
+    
+    if rows_written is None:
+        return {
+            "message": f"Assessments for {billing_period} were already generated",
+            "billing_period": billing_period,
+            "count": 0,
+            "rows_written": 0,
+            "elapsed_ms": elapsed_ms
+        }
+    return {
+        "message": f"Assessments generated for {rows_written} residents",
+        "billing_period": billing_period,
+        "count": rows_written,
+        "rows_written": rows_written,
+        "elapsed_ms": elapsed_ms
     }
-    mock_transactions.append(new_tx)
-    return {"message": "Assessments generated for 150 residents", "count": 150}
 
 @router.post("/assessments/late-fees")
-async def assess_late_fees():
-    # Logic to scan for delinquencies and apply fees
-    # Mocking single addition
-    current_bal = mock_transactions[-1]["balance_after"] if mock_transactions else 0
-    if current_bal > 0:
-        new_tx = {
-            "id": len(mock_transactions) + 1,
-            "date": datetime.now(),
-            "description": "Late Fee - Overdue Balance",
-            "amount": 25.00,
-            "type": TransactionType.LATE_FEE,
-            "balance_after": current_bal + 25.00
+async def assess_late_fees(policy: Optional[LateFeePolicy] = None, db: AsyncSession = Depends(get_async_db)):
+    # One pass over the delinquency index; the fee depends on the aging bucket
+    policy = policy or LateFeePolicy()
+    if not policy.buckets:
+        raise HTTPException(status_code=400, detail="At least one aging bucket is required.")
+    
+    charged = await post_late_fees(db, [(b.min_days, b.fee) for b in policy.buckets])
+    count = sum(charged.values())
+    if count:
+        return {
+            "message": f"Late fees assessed on {count} delinquent accounts",
+            "count": count,
+            "by_bucket": charged
         }
-        mock_transactions.append(new_tx)
-        return {"message": "Late fees assessed on 2 delinquent accounts", "count": 2}
-    return {"message": "No delinquencies found eligible for late fees"}
+    return {"message": "No delinquencies found eligible for late fees", "count": 0, "by_bucket": charged}
 
 @router.get("/delinquencies", response_model=List[DelinquentResident])
-async def get_delinquencies():
-    return mock_delinquencies
+async def get_delinquencies(
+    min_days_overdue: int = Query(30, ge=0),
+    limit: int = Query(500, ge=1, le=5000),
+    db: AsyncSession = Depends(get_async_db)
+):
+    # Served from the delinquency index (accounts.oldest_unpaid_date), oldest first
+    now = datetime.now()
+    accounts = (await db.execute(
+        select(models.Account)
+        .where(
+            models.Account.oldest_unpaid_date <= now - timedelta(days=min_days_overdue),
+            models.Account.balance > 0
+        )
+        .order_by(models.Account.oldest_unpaid_date, models.Account.id)
+        .limit(limit)
+    )).scalars().all()
+    return [
+        {
+            "id": account.id,
+            "name": account.owner_name,
+            "address": account.address,
+            "balance": account.balance,
+            "days_overdue": (now - account.oldest_unpaid_date).days
+        }
+        for account in accounts
+    ]
 
 @router.get("/reports/balance-sheet", response_model=BalanceSheet)
-async def get_balance_sheet():
-    assets = [
-        {"category": "Operating Account", "amount": 125000.00},
-        {"category": "Reserve Account", "amount": 350000.00},
-        {"category": "Accounts Receivable", "amount": 4500.00} # Matches mock delinquencies approx
-    ]
-    liabilities = [
-        {"category": "Prepaid Assessments", "amount": 12000.00},
-        {"category": "Accounts Payable", "amount": 8500.00}
-    ]
-    equity = [
-        {"category": "Retained Earnings", "amount": 459000.00}
-    ]
-    
-    total_assets = sum(a["amount"] for a in assets)
-    total_liab = sum(l["amount"] for l in liabilities)
-    total_eq = sum(e["amount"] for e in equity)
-    
-    return {
-        "assets": assets,
-        "liabilities": liabilities,
-        "equity": equity,
-        "total_assets": total_assets,
-        "total_liabilities_equity": total_liab + total_eq
-    }
+async def get_balance_sheet(as_of: Optional[date] = None, db: AsyncSession = Depends(get_async_db)):
+    # Answered from the materialized rollups, cumulative through as_of's month
+    return await reports.balance_sheet(db, as_of)
 
 @router.get("/reports/income-statement", response_model=IncomeStatement)
-async def get_income_statement():
-    revenue = [
-        {"category": "Assessment Income", "actual": 450000.00, "budget": 440000.00, "variance": 10000.00},
-        {"category": "Late Fees / Fines", "actual": 2500.00, "budget": 1000.00, "variance": 1500.00},
-        {"category": "Interest Income", "actual": 4500.00, "budget": 3000.00, "variance": 1500.00}
-    ]
-    expenses = [
-        {"category": "Landscaping", "actual": 55000.00, "budget": 60000.00, "variance": 5000.00}, # Under budget (positive variance interpretation depends on convention, here positive = good)
-        {"category": "Pool Maintenance", "actual": 25000.00, "budget": 20000.00, "variance": -5000.00}, # Over budget
-        {"category": "Utilities", "actual": 32000.00, "budget": 30000.00, "variance": -2000.00},
-        {"category": "Insurance", "actual": 18000.00, "budget": 18000.00, "variance": 0.00},
-        {"category": "Management Fees", "actual": 48000.00, "budget": 48000.00, "variance": 0.00}
-    ]
-    
-    total_rev = sum(r["actual"] for r in revenue)
-    total_exp = sum(e["actual"] for e in expenses)
-    
+async def get_income_statement(
+    start_date: Optional[date] = None,
+    end_date: Optional[date] = None,
+    budget_period: Optional[str] = None,
+    db: AsyncSession = Depends(get_async_db)
+):
+    # Rollups are monthly, so the range covers whole months. Budget defaults
+    # to the fiscal year of the range start (or the current year).
+    budget_period = budget_period or str((start_date or date.today()).year)
+    return await reports.income_statement(db, start_date, end_date, budget_period)
+
+@router.put("/budgets/{budget_period}", response_model=List[BudgetLineIn])
+async def set_budget(budget_period: str, lines: List[BudgetLineIn], db: AsyncSession = Depends(get_async_db)):
+    """Replace the budget for a fiscal period (Board only)"""
+    await db.execute(delete(models.BudgetLine).where(models.BudgetLine.budget_period == budget_period))
+    if lines:
+        await db.execute(insert(models.BudgetLine), [
+            {"budget_period": budget_period, **line.dict()} for line in lines
+        ])
+    await db.commit()
+    return lines
+
+@router.post("/reports/rebuild")
+async def rebuild_reports(background_tasks: BackgroundTasks):
+    """Recompute report rollups from the ledger in the background (Admin only)"""
+    background_tasks.add_task(_rebuild_reports)
+    return {"message": "Report rebuild started"}
+
+async def _rebuild_reports():
+    async with AsyncSessionLocal() as db:
+        await reports.rebuild_rollups(db)
+
+@router.post("/reconciliation/statement")
+async def reconcile_statement(
+    statement: UploadFile = File(...),
+    window_days: int = Query(45, ge=0, le=365),
+    dry_run: bool = False,
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Match a bank/lockbox CSV (date, amount, reference, description) against
+    open charges, post the matched payments in bulk and return the residue."""
+    started = time.perf_counter()
+    text_lines = io.TextIOWrapper(statement.file, encoding="utf-8-sig", newline="")
+    try:
+        result = await reconciliation.reconcile(db, text_lines, window_days, dry_run)
+    except UnicodeDecodeError:
+        raise HTTPException(status_code=400, detail="Statement must be a UTF-8 CSV file.")
     return {
-        "revenue": revenue,
-        "expenses": expenses,
-        "net_income": total_rev - total_exp
+        "lines": result.lines,
+        "matched": len(result.matched),
+        "posted": result.posted,
+        "duplicates": result.duplicates,
+        "unmatched": result.unmatched,
+        "dry_run": dry_run,
+        "elapsed_ms": round((time.perf_counter() - started) * 1000, 1)
     }
+
+# --- Exports (streamed; rows are written as they are read) ---
+
+class ExportFormat(str, Enum):
+    CSV = "csv"
+    OFX = "ofx"
+
+def _attachment(body, filename: str, media_type: str) -> StreamingResponse:
+    return StreamingResponse(
+        body,
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'}
+    )
+
+@router.get("/export/ledger")
+async def export_ledger(
+    format: ExportFormat = ExportFormat.CSV,
+    account_id: Optional[int] = None, # All accounts when omitted (Board/Auditors)
+    start_date: Optional[date] = None,
+    end_date: Optional[date] = None
+):
+    if format == ExportFormat.OFX:
+        return _attachment(export.ledger_ofx(account_id, start_date, end_date), "ledger.ofx", "application/x-ofx")
+    return _attachment(export.ledger_csv(account_id, start_date, end_date), "ledger.csv", "text/csv")
+
+@router.get("/export/delinquencies")
+async def export_delinquencies(min_days_overdue: int = Query(30, ge=0)):
+    return _attachment(export.delinquencies_csv(min_days_overdue), "delinquencies.csv", "text/csv")
+
+@router.get("/export/reports/balance-sheet")
+async def export_balance_sheet(as_of: Optional[date] = None):
+    return _attachment(export.balance_sheet_csv(as_of), "balance-sheet.csv", "text/csv")
+
+@router.get("/export/reports/income-statement")
+async def export_income_statement(
+    start_date: Optional[date] = None,
+    end_date: Optional[date] = None,
+    budget_period: Optional[str] = None
+):
+    budget_period = budget_period or str((start_date or date.today()).year)
+    return _attachment(
+        export.income_statement_csv(start_date, end_date, budget_period), "income-statement.csv", "text/csv"
+    )
@@ -9,9 +9,15 @@ from backend.community import visitors as visitors_router
 from backend.compliance import router as compliance_router
 from backend.property import router as property_router
 from backend.violations import router as violations_router
-from backend.calendar import router as calendar_router
-from backend.documents import router as documents_router
+from backend.calendar import router as calendar_router, facilities as facilities_router
 from backend.voting import router as voting_router
+from backend.notifications import router as notifications_router
+from backend.notifications.dispatcher import dispatcher as notification_dispatcher
+from backend.documents import previews as previews_router
+from backend.documents.indexer import indexer as document_indexer
+from backend.documents.derivatives import deriver as document_deriver
+from backend.documents.blobs import collector as blob_collector
+from backend.core.workers import shutdown_process_pool
 
 app = FastAPI(title="ESNTES HOA API", version="0.1.0")
 
@@ -20,7 +26,18 @@ from backend.core.database import engine, Base
 # Import models to ensure they are registered with Base
 from backend.documents import models as document_models
 from backend.voting import models as voting_models
+from backend.finance import models as finance_models
+from backend.calendar import models as calendar_models
+from backend.community import models as community_models
+from backend.notifications import models as notification_models
+from backend.maintenance import models as maintenance_models
 Base.metadata.create_all(bind=engine)
+from backend.core import migrations
+migrations.upgrade(engine)
+from backend.finance.ledger import seed_demo_account
+seed_demo_account(engine)
+from backend.community.directory import seed_demo_directory
+seed_demo_directory(engine)
 
 # CORS Configuration
 origins = [
@@ -35,6 +52,7 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor"],
 )
 
 # Include Routers
@@ -49,7 +67,39 @@ app.include_router(user_router.router, prefix="/api/user", tags=["user"])
 app.include_router(property_router.router, prefix="/api/property", tags=["property"])
 app.include_router(violations_router.router, prefix="/api/violations", tags=["violations"])
 app.include_router(calendar_router.router, prefix="/api/calendar", tags=["calendar"])
+app.include_router(facilities_router.router, prefix="/api/facilities", tags=["facilities"])
 app.include_router(voting_router.router, prefix="/api/voting", tags=["voting"])
+app.include_router(notifications_router.router, prefix="/api/notifications", tags=["notifications"])
+app.include_router(previews_router.router, prefix="/api/previews", tags=["previews"])
+
+# Background workers. Each pool runs one worker task in the API process by
+# default; set its *_WORKERS variable to size it, or to 0 to keep it out of
+# the API and run its standalone process instead:
+#   NOTIFICATIONS_WORKERS    python -m backend.notifications.dispatcher (outbound notifications)
+#   DOCUMENTS_INDEX_WORKERS  python -m backend.documents.indexer (text extraction for search)
+#   DERIVATIVES_WORKERS      python -m backend.documents.derivatives (thumbnails and previews)
+#   BLOB_GC_WORKERS          python -m backend.documents.blobs (stored-file garbage collection)
+# Extraction and rendering share a process pool (WORKER_PROCESSES).
+@app.on_event("startup")
+async def start_notification_workers():
+    await notification_dispatcher.start()
+
+@app.on_event("shutdown")
+async def stop_notification_workers():
+    await notification_dispatcher.stop()
+
+@app.on_event("startup")
+async def start_document_workers():
+    await document_indexer.start()
+    await document_deriver.start()
+    await blob_collector.start()
+
+@app.on_event("shutdown")
+async def stop_document_workers():
+    await document_indexer.stop()
+    await document_deriver.stop()
+    await blob_collector.stop()
+    shutdown_process_pool()
 
 @app.get("/health")
 async def health_check_root():
@@ -0,0 +1,47 @@
+from sqlalchemy import Column, Integer, String, DateTime, Index
+from datetime import datetime
+import enum
+from backend.core.database import Base
+
+class MaintenanceStatus(str, enum.Enum):
+    OPEN = "Open"
+    IN_PROGRESS = "In Progress"
+    COMPLETED = "Completed"
+
+# Statuses a work order may move to from each status
+TRANSITIONS = {
+    MaintenanceStatus.OPEN: {MaintenanceStatus.IN_PROGRESS, MaintenanceStatus.COMPLETED},
+    MaintenanceStatus.IN_PROGRESS: {MaintenanceStatus.OPEN, MaintenanceStatus.COMPLETED},
+    MaintenanceStatus.COMPLETED: {MaintenanceStatus.OPEN},
+}
+
+class MaintenanceRequest(Base):
+    __tablename__ = "maintenance_requests"
+    __table_args__ = (
+        # Queue views are keyset-paginated by (submitted_at, id) within a
+        # status, optionally narrowed to a category
+        Index("ix_maintenance_requests_queue", "status", "category", "submitted_at", "id"),
+        Index("ix_maintenance_requests_status", "status", "submitted_at", "id"),
+        Index("ix_maintenance_requests_submitted", "submitted_at", "id"),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+    title = Column(String, nullable=False)
+    description = Column(String, nullable=False)
+    category = Column(String, nullable=False)
+    status = Column(String, nullable=False, default=MaintenanceStatus.OPEN.value)
+    submitted_at = Column(DateTime, nullable=False, default=datetime.utcnow)
+    updated_at = Column(DateTime, nullable=True)
+    completed_at = Column(DateTime, nullable=True)
+    image_url = Column(String, nullable=True)
+    image_hash = Column(String(64), nullable=True, index=True) # Uploaded photo, in document storage
+
+class MaintenanceCount(Base):
+    """Work orders per (status, category), kept up to date in the same
+    transaction as every insert and status change, so the dashboard never
+    counts the requests table."""
+    __tablename__ = "maintenance_counts"
+
+    status = Column(String, primary_key=True)
+    category = Column(String, primary_key=True)
+    count = Column(Integer, nullable=False, default=0)
@@ -1,58 +1,105 @@
-from fastapi import APIRouter, HTTPException, Depends
-from pydantic import BaseModel
-from typing import List, Optional
+from fastapi import APIRouter, HTTPException, Depends, Query, Request, Response
+from sqlalchemy.ext.asyncio import AsyncSession
 from datetime import datetime
-from enum import Enum
+from typing import List, Optional
+import re
+from backend.core.database import get_async_db
+from backend.core.pagination import NEXT_CURSOR_HEADER, decode_cursor, encode_cursor
+from backend.documents import blobs, derivatives
+from backend.documents.storage import UploadTooLarge, storage
+from backend.documents.uploads import StreamingForm
+from backend.maintenance import models, schemas, service
+from backend.maintenance.models import MaintenanceStatus
 
 router = APIRouter()
 
-class MaintenanceStatus(str, Enum):
-    OPEN = "Open"
-    IN_PROGRESS = "In Progress"
-    COMPLETED = "Completed"
-
-class MaintenanceRequest(BaseModel):
-    id: int
-    title: str
-    description: str
-    category: str
-    status: MaintenanceStatus
-    submitted_at: datetime
-    image_url: Optional[str] = None
-
-class MaintenanceCreate(BaseModel):
-    title: str
-    description: str
-    category: str
-    image_url: Optional[str] = None
-
-# Mock Database
-mock_maintenance_requests = [
-    {
-        "id": 1,
-        "title": "Leaky Faucet in Gym",
-        "description": "The faucet in the men's locker room is dripping constantly.",
-        "category": "Plumbing",
-        "status": MaintenanceStatus.OPEN,
-        "submitted_at": datetime.now(),
-        "image_url": None
-    }
-]
-
-@router.get("/", response_model=List[MaintenanceRequest])
-async def get_requests():
-    return mock_maintenance_requests
-
-@router.post("/", response_model=MaintenanceRequest)
-async def create_request(request: MaintenanceCreate):
-    new_req = {
-        "id": len(mock_maintenance_requests) + 1,
-        "title": request.title,
-        "description": request.description,
-        "category": request.category,
-        "status": MaintenanceStatus.OPEN,
-        "submitted_at": datetime.now(),
-        "image_url": request.image_url
-    }
-    mock_maintenance_requests.append(new_req)
-    return new_req
+# Photos are kept in document storage, content-addressed
+PHOTO_TYPES = {"image/jpeg": ".jpg", "image/png": ".png", "image/gif": ".gif", "image/webp": ".webp"}
+PHOTO_MEDIA_TYPES = {extension: media_type for media_type, extension in PHOTO_TYPES.items()}
+_PHOTO_URL = re.compile(r"^/api/maintenance/photos/([0-9a-f]{64})(\.[a-z]+)$")
+
+def _photo_hash(image_url: Optional[str]) -> Optional[str]:
+    match = _PHOTO_URL.match(image_url or "")
+    return match.group(1) if match else None
+
+def _with_previews(requests: list, previews: dict) -> List[schemas.MaintenanceRequest]:
+    return [
+        schemas.MaintenanceRequest.from_orm(r).copy(update=previews.get(r.image_hash, {}))
+        for r in requests
+    ]
+
+@router.get("/", response_model=List[schemas.MaintenanceRequest])
+async def get_requests(
+    response: Response,
+    status: Optional[MaintenanceStatus] = None,
+    category: Optional[str] = None,
+    newest_first: bool = False,
+    cursor: Optional[str] = None,
+    limit: int = Query(50, ge=1, le=200),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Work-order queue, oldest first unless `newest_first`, optionally by status and category.
+
+    Pass X-Next-Cursor back as `cursor` for the next page. Uploaded photos
+    come with thumbnail/preview URLs once rendered."""
+    requests = await service.queue(db, status, category, decode_cursor(cursor, datetime, int), limit, newest_first)
+    if len(requests) == limit:
+        response.headers[NEXT_CURSOR_HEADER] = encode_cursor(requests[-1].submitted_at, requests[-1].id)
+    previews = await derivatives.urls(db, [r.image_hash for r in requests])
+    return _with_previews(requests, previews)
+
+@router.get("/dashboard", response_model=schemas.MaintenanceCounts)
+async def get_dashboard(db: AsyncSession = Depends(get_async_db)):
+    """Work-order counts by status and category (Management only)"""
+    return await service.counts(db)
+
+@router.post("/", response_model=schemas.MaintenanceRequest)
+async def create_request(request: schemas.MaintenanceCreate, db: AsyncSession = Depends(get_async_db)):
+    db_request = models.MaintenanceRequest(**request.dict(), image_hash=_photo_hash(request.image_url))
+    await service.create(db, db_request)
+    await db.commit()
+    await db.refresh(db_request)
+    previews = await derivatives.urls(db, [db_request.image_hash])
+    return _with_previews([db_request], previews)[0]
+
+@router.patch("/{request_id}/status", response_model=schemas.MaintenanceRequest)
+async def change_status(request_id: int, change: schemas.StatusChange, db: AsyncSession = Depends(get_async_db)):
+    """Move a request to another status (Management only); 409 if it changed meanwhile"""
+    db_request = await service.transition(db, request_id, change.status, change.expected_status)
+    await db.commit()
+    previews = await derivatives.urls(db, [db_request.image_hash])
+    return _with_previews([db_request], previews)[0]
+
+@router.post("/photos")
+async def upload_photo(request: Request, db: AsyncSession = Depends(get_async_db)):
+    """Upload a photo (multipart field `file`); returns the image_url to submit with a request"""
+    form = StreamingForm(request)
+    try:
+        blob = await storage.write(form.file_chunks())
+    except UploadTooLarge:
+        raise HTTPException(status_code=413, detail="File is too large")
+    # Nothing references the photo until a request is submitted with it;
+    # the collector removes it if that does not happen within the grace period
+    await blobs.release(db, [blob.digest])
+    extension = PHOTO_TYPES.get(form.content_type)
+    if extension is None:
+        await db.commit()
+        raise HTTPException(status_code=415, detail=f"Photos must be one of: {', '.join(PHOTO_TYPES)}")
+
+    await derivatives.request(db, blob.digest, form.content_type, form.filename)
+    await db.commit()
+    derivatives.deriver.notify()
+    return {"image_url": f"/api/maintenance/photos/{blob.digest}{extension}"}
+
+@router.api_route("/photos/{name}", methods=["GET", "HEAD"])
+async def get_photo(name: str, request: Request):
+    """Full-size photo; supports Range requests"""
+    match = _PHOTO_URL.match(f"/api/maintenance/photos/{name}")
+    size = await storage.size(match.group(1)) if match and match.group(2) in PHOTO_MEDIA_TYPES else None
+    if size is None:
+        raise HTTPException(status_code=404, detail="Photo not found")
+    response = storage.response(
+        match.group(1), size, PHOTO_MEDIA_TYPES[match.group(2)], name, request.headers.get("range")
+    )
+    response.headers["Cache-Control"] = "private, max-age=31536000, immutable"
+    return response
@@ -0,0 +1,36 @@
+from pydantic import BaseModel
+from typing import Dict, Optional
+from datetime import datetime
+from backend.maintenance.models import MaintenanceStatus
+
+class MaintenanceRequest(BaseModel):
+    id: int
+    title: str
+    description: str
+    category: str
+    status: MaintenanceStatus
+    submitted_at: datetime
+    updated_at: Optional[datetime] = None
+    completed_at: Optional[datetime] = None
+    image_url: Optional[str] = None
+    thumbnail_url: Optional[str] = None
+    preview_url: Optional[str] = None
+
+    class Config:
+        orm_mode = True
+
+class MaintenanceCreate(BaseModel):
+    title: str
+    description: str
+    category: str
+    image_url: Optional[str] = None
+
+class StatusChange(BaseModel):
+    status: MaintenanceStatus
+    # Optional compare-and-set: fail with 409 unless the request is still in this status
+    expected_status: Optional[MaintenanceStatus] = None
+
+class MaintenanceCounts(BaseModel):
+    total: int
+    by_status: Dict[MaintenanceStatus, int]
+    by_category: Dict[MaintenanceStatus, Dict[str, int]]
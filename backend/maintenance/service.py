@@ -0,0 +1,105 @@
+from datetime import datetime
+from typing import Optional, Tuple
+from fastapi import HTTPException
+from sqlalchemy import select, tuple_, update
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.ext.asyncio import AsyncSession
+from backend.maintenance.models import MaintenanceCount, MaintenanceRequest, MaintenanceStatus, TRANSITIONS
+
+# Work-order store. Every write adjusts maintenance_counts in its own
+# transaction, and status changes are a single compare-and-set UPDATE, so two
+# managers acting on one ticket cannot both win and the counters never drift.
+
+async def _bump(db: AsyncSession, status: str, category: str, delta: int):
+    insert = postgresql.insert if db.bind.dialect.name == "postgresql" else sqlite.insert
+    await db.execute(
+        insert(MaintenanceCount)
+        .values(status=status, category=category, count=delta)
+        .on_conflict_do_update(
+            index_elements=["status", "category"],
+            set_={"count": MaintenanceCount.count + delta}
+        )
+    )
+
+async def create(db: AsyncSession, request: MaintenanceRequest) -> MaintenanceRequest:
+    """Insert a new open work order and count it. Does not commit."""
+    request.status = MaintenanceStatus.OPEN.value
+    db.add(request)
+    await db.flush()
+    await _bump(db, request.status, request.category, 1)
+    return request
+
+async def transition(
+    db: AsyncSession,
+    request_id: int,
+    to: MaintenanceStatus,
+    expected: Optional[MaintenanceStatus] = None
+) -> MaintenanceRequest:
+    """Move a work order to another status and recount. Does not commit.
+
+    Raises 404 for unknown ids, 400 for transitions TRANSITIONS does not
+    allow, and 409 if the order is not (or no longer) in `expected`.
+    """
+    current = (await db.execute(
+        select(MaintenanceRequest.status, MaintenanceRequest.category).where(MaintenanceRequest.id == request_id)
+    )).first()
+    if current is None:
+        raise HTTPException(status_code=404, detail="Maintenance request not found")
+    if expected is not None and current.status != expected.value:
+        raise HTTPException(status_code=409, detail=f"Request is {current.status}, not {expected.value}")
+    if to not in TRANSITIONS[MaintenanceStatus(current.status)]:
+        raise HTTPException(status_code=400, detail=f"Cannot move a request from {current.status} to {to.value}")
+
+    now = datetime.utcnow()
+    changed = (await db.execute(
+        update(MaintenanceRequest)
+        .where(MaintenanceRequest.id == request_id, MaintenanceRequest.status == current.status)
+        .values(
+            status=to.value,
+            updated_at=now,
+            completed_at=now if to == MaintenanceStatus.COMPLETED else None
+        )
+        .returning(MaintenanceRequest.id)
+        .execution_options(synchronize_session=False)
+    )).first()
+    if changed is None:
+        # Someone else changed it between the read and the update
+        raise HTTPException(status_code=409, detail="Request was changed concurrently; reload and retry")
+    await _bump(db, current.status, current.category, -1)
+    await _bump(db, to.value, current.category, 1)
+    return await db.get(MaintenanceRequest, request_id, populate_existing=True)
+
+async def queue(
+    db: AsyncSession,
+    status: Optional[MaintenanceStatus],
+    category: Optional[str],
+    after: Optional[Tuple],
+    limit: int,
+    newest_first: bool = False
+) -> list:
+    """One page of work orders by (submitted_at, id); each filter combination has its index."""
+    query = select(MaintenanceRequest)
+    if status is not None:
+        query = query.where(MaintenanceRequest.status == status.value)
+    if category:
+        query = query.where(MaintenanceRequest.category == category)
+    key = tuple_(MaintenanceRequest.submitted_at, MaintenanceRequest.id)
+    if newest_first:
+        if after:
+            query = query.where(key < tuple_(*after))
+        query = query.order_by(MaintenanceRequest.submitted_at.desc(), MaintenanceRequest.id.desc())
+    else:
+        if after:
+            query = query.where(key > tuple_(*after))
+        query = query.order_by(MaintenanceRequest.submitted_at, MaintenanceRequest.id)
+    return (await db.execute(query.limit(limit))).scalars().all()
+
+async def counts(db: AsyncSession) -> dict:
+    by_category = {status: {} for status in MaintenanceStatus}
+    for status, category, count in await db.execute(
+        select(MaintenanceCount.status, MaintenanceCount.category, MaintenanceCount.count)
+    ):
+        if count:
+            by_category[MaintenanceStatus(status)][category] = count
+    by_status = {status: sum(categories.values()) for status, categories in by_category.items()}
+    return {"total": sum(by_status.values()), "by_status": by_status, "by_category": by_category}
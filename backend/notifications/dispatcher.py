@@ -0,0 +1,142 @@
+import asyncio
+import logging
+import os
+import random
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Tuple
+from sqlalchemy import select, update
+from starlette.concurrency import run_in_threadpool
+from backend.core.database import AsyncSessionLocal
+from backend.core.workers import BackgroundWorkers, run_forever
+from backend.notifications.models import Channel, Notification, Status
+from backend.notifications.senders import DeliveryError, Message, PaperSender, RateLimiter, Sender, SmtpSender
+
+# Worker pool draining the notifications table. Each worker repeatedly claims
+# a batch of due messages for one channel (leasing them so other workers and
+# processes skip them), hands the batch to the channel's sender on a thread,
+# and records the outcome: sent, retried later with exponential backoff, or
+# failed. Delivery is at-least-once: a worker that outlives its lease may
+# have its batch re-sent.
+
+logger = logging.getLogger(__name__)
+
+WORKERS = int(os.getenv("NOTIFICATIONS_WORKERS", "1")) # In the API process; 0 = run the CLI instead
+BATCH_SIZE = int(os.getenv("NOTIFICATIONS_BATCH_SIZE", "100"))
+POLL_INTERVAL = float(os.getenv("NOTIFICATIONS_POLL_INTERVAL", "2"))
+LEASE = timedelta(seconds=int(os.getenv("NOTIFICATIONS_LEASE_SECONDS", "300")))
+MAX_ATTEMPTS = int(os.getenv("NOTIFICATIONS_MAX_ATTEMPTS", "6"))
+BACKOFF_BASE = timedelta(seconds=30)
+BACKOFF_MAX = timedelta(hours=1)
+
+def default_senders() -> Dict[Channel, Sender]:
+    return {
+        Channel.EMAIL: SmtpSender(
+            host=os.getenv("SMTP_HOST", "localhost"),
+            port=int(os.getenv("SMTP_PORT", "25")),
+            from_address=os.getenv("SMTP_FROM", "HOA Management <no-reply@localhost>"),
+            username=os.getenv("SMTP_USERNAME"),
+            password=os.getenv("SMTP_PASSWORD"),
+            starttls=os.getenv("SMTP_STARTTLS", "false").lower() == "true",
+            limiter=RateLimiter(float(os.getenv("NOTIFICATIONS_EMAIL_RATE", "20")))
+        ),
+        Channel.PAPER: PaperSender(
+            os.getenv("NOTIFICATIONS_PRINT_SPOOL", "./print-spool"),
+            limiter=RateLimiter(float(os.getenv("NOTIFICATIONS_PAPER_RATE", "0")))
+        ),
+    }
+
+def backoff(attempts: int) -> timedelta:
+    delay = min(BACKOFF_MAX, BACKOFF_BASE * (2 ** max(0, attempts - 1)))
+    return delay * random.uniform(0.8, 1.2)
+
+async def claim(channel: Channel, limit: int) -> Tuple[List[Message], Dict[int, int]]:
+    """Lease up to `limit` due messages of one channel; also returns their attempt counts."""
+    now = datetime.utcnow()
+    due = (
+        select(Notification.id)
+        .where(
+            Notification.status.in_([Status.PENDING.value, Status.SENDING.value]),
+            Notification.channel == channel.value,
+            Notification.next_attempt_at <= now
+        )
+        .order_by(Notification.next_attempt_at)
+        .limit(limit)
+        .with_for_update(skip_locked=True)
+    )
+    async with AsyncSessionLocal() as db:
+        rows = (await db.execute(
+            update(Notification)
+            .where(Notification.id.in_(due.scalar_subquery()), Notification.next_attempt_at <= now)
+            .values(status=Status.SENDING.value, next_attempt_at=now + LEASE, attempts=Notification.attempts + 1)
+            .returning(
+                Notification.id, Notification.address, Notification.recipient_name,
+                Notification.subject, Notification.body, Notification.attempts
+            )
+            .execution_options(synchronize_session=False)
+        )).all()
+        await db.commit()
+    attempts = {row.id: row.attempts for row in rows}
+    messages = [Message(row.id, row.address, row.recipient_name, row.subject, row.body) for row in rows]
+    return sorted(messages, key=lambda m: m.id), attempts
+
+async def record(messages: List[Message], attempts: Dict[int, int], results: List[Optional[DeliveryError]]):
+    now = datetime.utcnow()
+    sent = [m.id for m, error in zip(messages, results) if error is None]
+    changes = []
+    for message, error in zip(messages, results):
+        if error is None:
+            continue
+        if error.permanent or attempts[message.id] >= MAX_ATTEMPTS:
+            changes.append({"id": message.id, "status": Status.FAILED.value, "last_error": error.reason})
+        else:
+            changes.append({
+                "id": message.id,
+                "status": Status.PENDING.value,
+                "last_error": error.reason,
+                "next_attempt_at": now + backoff(attempts[message.id])
+            })
+    async with AsyncSessionLocal() as db:
+        if sent:
+            await db.execute(
+                update(Notification)
+                .where(Notification.id.in_(sent))
+                .values(status=Status.SENT.value, sent_at=now, last_error=None)
+                .execution_options(synchronize_session=False)
+            )
+        if changes:
+            # Bulk UPDATE by primary key
+            await db.execute(update(Notification), changes)
+        await db.commit()
+
+class Dispatcher(BackgroundWorkers):
+    def __init__(self, senders: Optional[Dict[Channel, Sender]] = None, workers: int = WORKERS, batch_size: int = BATCH_SIZE):
+        super().__init__(workers, POLL_INTERVAL)
+        self.senders = senders
+        self.batch_size = batch_size
+
+    async def _deliver(self, channel: Channel, sender: Sender) -> int:
+        """Claim and deliver one batch of a channel; returns the number of messages handled."""
+        messages, attempts = await claim(channel, self.batch_size)
+        if not messages:
+            return 0
+        try:
+            results = await run_in_threadpool(sender.send_batch, messages)
+        except Exception as e:
+            logger.warning("%s batch of %d failed: %s", channel.value, len(messages), e)
+            results = [DeliveryError(f"{type(e).__name__}: {e}")] * len(messages)
+        await record(messages, attempts, results)
+        return len(messages)
+
+    async def process_batch(self) -> int:
+        """Deliver one batch per channel; returns the number of messages handled."""
+        self.senders = self.senders or default_senders()
+        handled = 0
+        for channel, sender in self.senders.items():
+            handled += await self._deliver(channel, sender)
+        return handled
+
+dispatcher = Dispatcher()
+
+if __name__ == "__main__":
+    # Standalone worker process: python -m backend.notifications.dispatcher
+    asyncio.run(run_forever(Dispatcher(workers=WORKERS or 4)))
@@ -0,0 +1,50 @@
+from sqlalchemy import Column, Integer, String, DateTime, Index
+from datetime import datetime
+from enum import Enum
+from backend.core.database import Base
+
+class Channel(str, Enum):
+    EMAIL = "email"
+    PAPER = "paper"
+
+class Category(str, Enum):
+    # Matches the CommunicationPreferences groups
+    GENERAL = "general"
+    CCR = "ccr"
+    COLLECTION = "collection"
+    BILLING = "billing"
+    MGMT_COMMITTEE = "mgmt_committee"
+
+class Status(str, Enum):
+    PENDING = "pending"
+    SENDING = "sending" # Leased by a worker until next_attempt_at
+    SENT = "sent"
+    FAILED = "failed"
+
+class Notification(Base):
+    """One message to one recipient on one channel: the outbound queue.
+
+    Producers insert rows in the same transaction as the change they announce,
+    so a notice exists if and only if that change committed.
+    """
+    __tablename__ = "notifications"
+    __table_args__ = (
+        # Workers claim due messages per channel
+        Index("ix_notifications_claim", "status", "channel", "next_attempt_at"),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+    channel = Column(String, nullable=False)
+    category = Column(String, nullable=False)
+    recipient_id = Column(Integer, nullable=True)
+    recipient_name = Column(String, nullable=True)
+    address = Column(String, nullable=False) # Email address or postal address
+    subject = Column(String, nullable=False)
+    body = Column(String, nullable=False)
+    status = Column(String, nullable=False, default=Status.PENDING.value)
+    attempts = Column(Integer, nullable=False, default=0)
+    # When a pending message is due, or when a sending message's lease expires
+    next_attempt_at = Column(DateTime, nullable=False, default=datetime.utcnow)
+    last_error = Column(String, nullable=True)
+    created_at = Column(DateTime, default=datetime.utcnow)
+    sent_at = Column(DateTime, nullable=True)
@@ -0,0 +1,62 @@
+from datetime import datetime
+from typing import Iterable, Optional
+from sqlalchemy import insert, literal, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from backend.community import audience
+from backend.community.models import DirectoryProfile
+from backend.notifications.models import Category, Channel, Notification, Status
+
+# Which preference bit opts a resident into each (category, channel)
+PREFERENCE_CHANNELS = {
+    Category.GENERAL: {Channel.EMAIL: "general_email", Channel.PAPER: "general_paper"},
+    Category.CCR: {Channel.EMAIL: "ccr_email", Channel.PAPER: "ccr_paper"},
+    Category.COLLECTION: {Channel.EMAIL: "collection_email", Channel.PAPER: "collection_paper"},
+    Category.BILLING: {Channel.EMAIL: "billing_email", Channel.PAPER: "billing_paper"},
+    Category.MGMT_COMMITTEE: {Channel.EMAIL: "mgmt_committee_notifications"},
+}
+
+async def enqueue(
+    db: AsyncSession,
+    category: Category,
+    subject: str,
+    body: str,
+    recipient_ids: Optional[Iterable[int]] = None
+) -> int:
+    """Queue a notice for every resident (or the given ones) on each channel
+    they opted into for the category. Does not commit: call it inside the
+    transaction that makes the announced change.
+
+    Set-based: one INSERT ... SELECT per channel, however many recipients.
+    Returns the number of messages queued.
+    """
+    profile = DirectoryProfile
+    now = datetime.utcnow()
+    queued = 0
+    for channel, preference in PREFERENCE_CHANNELS[category].items():
+        address = profile.email if channel == Channel.EMAIL else profile.address
+        recipients = select(
+            literal(channel.value),
+            literal(category.value),
+            profile.id,
+            profile.name,
+            address,
+            literal(subject),
+            literal(body),
+            literal(Status.PENDING.value),
+            literal(0),
+            literal(now),
+            literal(now)
+        ).where(
+            profile.preference_flags.op("&")(audience.BITS[preference]) != 0,
+            address.is_not(None),
+            address != ""
+        )
+        if recipient_ids is not None:
+            recipients = recipients.where(profile.id.in_(list(recipient_ids)))
+        result = await db.execute(insert(Notification).from_select(
+            ["channel", "category", "recipient_id", "recipient_name", "address", "subject", "body",
+             "status", "attempts", "next_attempt_at", "created_at"],
+            recipients
+        ))
+        queued += result.rowcount
+    return queued
@@ -0,0 +1,48 @@
+from fastapi import APIRouter, HTTPException, Depends
+from pydantic import BaseModel
+from sqlalchemy import func, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import Dict
+from datetime import datetime
+from backend.core.database import get_async_db
+from backend.notifications.models import Category, Notification, Status
+from backend.notifications.queue import enqueue
+
+router = APIRouter()
+
+class Broadcast(BaseModel):
+    category: Category
+    subject: str
+    body: str
+
+@router.get("/stats")
+async def get_stats(db: AsyncSession = Depends(get_async_db)) -> Dict[str, Dict[str, int]]:
+    """Queued messages per channel and status (Board/Management only)"""
+    rows = await db.execute(
+        select(Notification.channel, Notification.status, func.count())
+        .group_by(Notification.channel, Notification.status)
+    )
+    stats: Dict[str, Dict[str, int]] = {}
+    for channel, status, count in rows:
+        stats.setdefault(channel, {})[status] = count
+    return stats
+
+@router.post("/broadcast")
+async def broadcast(message: Broadcast, db: AsyncSession = Depends(get_async_db)):
+    """Send a notice to every resident opted into the category (Board/Management only)"""
+    if not message.subject.strip() or not message.body.strip():
+        raise HTTPException(status_code=400, detail="Subject and body are required.")
+    queued = await enqueue(db, message.category, message.subject, message.body)
+    await db.commit()
+    return {"queued": queued}
+
+@router.post("/retry-failed")
+async def retry_failed(db: AsyncSession = Depends(get_async_db)):
+    """Requeue permanently failed messages, e.g. after fixing SMTP settings"""
+    result = await db.execute(
+        update(Notification)
+        .where(Notification.status == Status.FAILED.value)
+        .values(status=Status.PENDING.value, attempts=0, next_attempt_at=datetime.utcnow())
+    )
+    await db.commit()
+    return {"requeued": result.rowcount}
@@ -0,0 +1,148 @@
+import csv
+import os
+import smtplib
+import threading
+import time
+from abc import ABC, abstractmethod
+from dataclasses import dataclass
+from datetime import datetime
+from email.message import EmailMessage
+from email.utils import formataddr, make_msgid
+from typing import List, Optional
+
+# Channel senders. They are blocking and run on worker threads; each call
+# delivers a whole batch, which for email means one SMTP connection (and one
+# login) per batch instead of one per message.
+
+@dataclass
+class Message:
+    id: int
+    address: str
+    recipient_name: Optional[str]
+    subject: str
+    body: str
+
+@dataclass
+class DeliveryError:
+    reason: str
+    permanent: bool = False # Permanent failures are not retried
+
+class RateLimiter:
+    """Token bucket shared by every worker thread of one channel."""
+
+    def __init__(self, rate: float, burst: Optional[int] = None):
+        self.rate = rate
+        self.capacity = burst or max(1, int(rate))
+        self._tokens = float(self.capacity)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        if self.rate <= 0:
+            return
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                wait = (1 - self._tokens) / self.rate
+            time.sleep(wait)
+
+class Sender(ABC):
+    def __init__(self, limiter: Optional[RateLimiter] = None):
+        self.limiter = limiter or RateLimiter(0)
+
+    @abstractmethod
+    def send_batch(self, messages: List[Message]) -> List[Optional[DeliveryError]]:
+        """Deliver messages; returns one result per message (None = sent).
+
+        Raises if the channel is unavailable; the whole batch is then retried.
+        """
+
+class SmtpSender(Sender):
+    def __init__(
+        self,
+        host: str,
+        port: int,
+        from_address: str,
+        username: Optional[str] = None,
+        password: Optional[str] = None,
+        starttls: bool = False,
+        timeout: float = 30,
+        limiter: Optional[RateLimiter] = None
+    ):
+        super().__init__(limiter)
+        self.host = host
+        self.port = port
+        self.from_address = from_address
+        self.username = username
+        self.password = password
+        self.starttls = starttls
+        self.timeout = timeout
+
+    def _connect(self) -> smtplib.SMTP:
+        smtp = smtplib.SMTP(self.host, self.port, timeout=self.timeout)
+        if self.starttls:
+            smtp.starttls()
+        if self.username:
+            smtp.login(self.username, self.password or "")
+        return smtp
+
+    def _email(self, message: Message) -> EmailMessage:
+        email = EmailMessage()
+        email["From"] = self.from_address
+        email["To"] = formataddr((message.recipient_name or "", message.address))
+        email["Subject"] = message.subject
+        email["Message-ID"] = make_msgid(idstring=f"notification-{message.id}")
+        email.set_content(message.body)
+        return email
+
+    def send_batch(self, messages: List[Message]) -> List[Optional[DeliveryError]]:
+        results: List[Optional[DeliveryError]] = []
+        smtp = self._connect()
+        try:
+            for i, message in enumerate(messages):
+                self.limiter.acquire()
+                try:
+                    smtp.send_message(self._email(message))
+                    results.append(None)
+                except smtplib.SMTPRecipientsRefused as e:
+                    code = next(iter(e.recipients.values()))[0]
+                    results.append(DeliveryError(f"Recipient refused ({code})", permanent=500 <= code < 600))
+                except (smtplib.SMTPDataError, smtplib.SMTPSenderRefused) as e:
+                    results.append(DeliveryError(f"{e.smtp_code} {e.smtp_error!r}", permanent=500 <= e.smtp_code < 600))
+                except (smtplib.SMTPServerDisconnected, OSError) as e:
+                    # Connection lost: everything not yet sent goes back to the queue
+                    results.extend(DeliveryError(f"Connection lost: {e}") for _ in messages[i:])
+                    return results
+        finally:
+            try:
+                smtp.quit()
+            except (smtplib.SMTPException, OSError):
+                smtp.close()
+        return results
+
+class PaperSender(Sender):
+    """Appends paper notices to a daily print-spool CSV for the mail house."""
+
+    def __init__(self, spool_dir: str, limiter: Optional[RateLimiter] = None):
+        super().__init__(limiter)
+        self.spool_dir = spool_dir
+        self._lock = threading.Lock()
+
+    def send_batch(self, messages: List[Message]) -> List[Optional[DeliveryError]]:
+        os.makedirs(self.spool_dir, exist_ok=True)
+        path = os.path.join(self.spool_dir, f"paper-{datetime.utcnow():%Y-%m-%d}.csv")
+        with self._lock:
+            is_new = not os.path.exists(path)
+            with open(path, "a", newline="") as spool:
+                writer = csv.writer(spool)
+                if is_new:
+                    writer.writerow(["notification_id", "name", "address", "subject", "body"])
+                for message in messages:
+                    self.limiter.acquire()
+                    writer.writerow([message.id, message.recipient_name, message.address, message.subject, message.body])
+        return [None] * len(messages)
@@ -0,0 +1,14 @@
+import os
+from typing import Sequence
+
+# Benchmarks run at a small size with the regular suite so they stay
+# working; BENCHMARK_FULL=1 runs them at the sizes the features were built for:
+#   BENCHMARK_FULL=1 python -m pytest -q backend/tests/benchmarks
+FULL = os.getenv("BENCHMARK_FULL") == "1"
+
+def sized(full: int, quick: int) -> int:
+    return full if FULL else quick
+
+def percentile(samples: Sequence[float], pct: float) -> float:
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))]
@@ -0,0 +1,17 @@
+from typing import List
+import pytest
+
+_figures: List[str] = []
+
+@pytest.fixture
+def report(request):
+    """Record a figure for the benchmarks section of the terminal summary."""
+    def record(line: str):
+        _figures.append(f"{request.node.name}: {line}")
+    return record
+
+def pytest_terminal_summary(terminalreporter):
+    if _figures:
+        terminalreporter.section("benchmarks")
+        for line in _figures:
+            terminalreporter.line(line)
@@ -0,0 +1,34 @@
+import time
+import pytest
+from sqlalchemy import func, insert, select
+from backend.finance import models
+from backend.tests.benchmarks import sized
+
+pytestmark = pytest.mark.anyio
+
+async def top_up_accounts(db, total: int):
+    existing = await db.scalar(select(func.count()).select_from(models.Account))
+    if existing < total:
+        await db.execute(insert(models.Account), [
+            {"owner_name": f"Unit {i}", "address": f"{i} Benchmark Way", "balance": 0}
+            for i in range(existing, total)
+        ])
+        await db.commit()
+
+# Sizes run in order, growing the same set of accounts
+@pytest.mark.parametrize("accounts, billing_period", [
+    (sized(10_000, 200), "2041-01"),
+    (sized(100_000, 2_000), "2041-02"),
+])
+async def test_assessment_run(client, db, report, accounts, billing_period):
+    await top_up_accounts(db, accounts)
+
+    started = time.perf_counter()
+    response = await client.post("/api/finance/assessments/generate", params={"billing_period": billing_period, "amount": 250})
+    elapsed = time.perf_counter() - started
+
+    body = response.json()
+    report(f"{body['rows_written']} accounts charged in {elapsed:.2f} s (job {body['elapsed_ms']} ms)")
+    assert body["rows_written"] >= accounts
+    rerun = await client.post("/api/finance/assessments/generate", params={"billing_period": billing_period})
+    assert rerun.json()["rows_written"] == 0
@@ -0,0 +1,31 @@
+import time
+from datetime import datetime, timedelta
+import pytest
+from backend.tests.benchmarks import sized
+
+pytestmark = pytest.mark.anyio
+
+BALLOTS = sized(50_000, 2_000)
+
+async def test_ballot_import_throughput(client, report):
+    now = datetime.now()
+    election = (await client.post("/api/voting/", json={
+        "title": "Annual meeting", "description": "Paper ballots",
+        "start_date": (now - timedelta(days=1)).isoformat(), "end_date": (now + timedelta(days=1)).isoformat(),
+        "election_type": "multi", "allowed_selections": 2,
+        "candidates": [{"name": name, "bio": "Candidate"} for name in ("Ada", "Grace", "Edsger")]
+    })).json()
+    candidates = [c["id"] for c in election["candidates"]]
+    ballots = [
+        {"user_id": 100_000 + i, "candidate_ids": [candidates[i % 3], candidates[(i + 1) % 3]]}
+        for i in range(BALLOTS)
+    ]
+
+    started = time.perf_counter()
+    response = await client.post(f"/api/voting/{election['id']}/ballots/import", json={"ballots": ballots})
+    elapsed = time.perf_counter() - started
+
+    assert response.status_code == 200, response.text
+    report(f"{BALLOTS} ballots in {elapsed:.2f} s ({BALLOTS / elapsed:,.0f} ballots/s)")
+    results = (await client.get(f"/api/voting/{election['id']}/results")).json()
+    assert results["total_votes"] == 2 * BALLOTS
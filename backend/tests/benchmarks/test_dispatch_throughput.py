@@ -0,0 +1,69 @@
+import socketserver
+import threading
+import time
+import pytest
+from backend.notifications.dispatcher import Dispatcher
+from backend.notifications.models import Channel, Status
+from backend.notifications.senders import SmtpSender
+from backend.tests.benchmarks import sized
+from backend.tests.test_notifications import queue_emails, statuses
+
+pytestmark = pytest.mark.anyio
+
+RECIPIENTS = sized(10_000, 500)
+
+class SmtpSession(socketserver.StreamRequestHandler):
+    def reply(self, line: str):
+        self.wfile.write(f"{line}\r\n".encode())
+
+    def handle(self):
+        with self.server.lock:
+            self.server.connections += 1
+        self.reply("220 stand-in ESMTP")
+        for line in self.rfile:
+            verb = line[:4].upper()
+            if verb == b"DATA":
+                self.reply("354 End data with <CR><LF>.<CR><LF>")
+                for data in self.rfile:
+                    if data == b".\r\n":
+                        break
+                with self.server.lock:
+                    self.server.messages += 1
+                self.reply("250 OK")
+            elif verb == b"QUIT":
+                self.reply("221 Bye")
+                return
+            else:
+                self.reply("250 OK")
+
+class SmtpStandIn(socketserver.ThreadingTCPServer):
+    """Local SMTP server that accepts and counts mail, storing none of it."""
+    daemon_threads = True
+
+    def __init__(self):
+        super().__init__(("127.0.0.1", 0), SmtpSession)
+        self.lock = threading.Lock()
+        self.connections = 0
+        self.messages = 0
+
+@pytest.fixture
+def smtp():
+    server = SmtpStandIn()
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+async def test_email_blast_throughput(db, smtp, report):
+    ids = await queue_emails(db, [f"resident{i}@example.com" for i in range(RECIPIENTS)])
+    sender = SmtpSender("127.0.0.1", smtp.server_address[1], "HOA Management <no-reply@example.com>")
+
+    started = time.perf_counter()
+    await Dispatcher(senders={Channel.EMAIL: sender}, workers=4, batch_size=100).drain()
+    elapsed = time.perf_counter() - started
+
+    report(f"{smtp.messages} emails over {smtp.connections} SMTP connections in {elapsed:.2f} s ({smtp.messages / elapsed:,.0f}/s)")
+    assert set(await statuses(db, ids)) == {Status.SENT.value}
+    assert smtp.messages >= RECIPIENTS
+    assert smtp.connections <= smtp.messages / 50 # One connection per batch, not per message
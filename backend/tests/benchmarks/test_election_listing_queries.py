@@ -0,0 +1,48 @@
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+import pytest
+from sqlalchemy import event
+from backend.core.database import async_engine
+from backend.voting import models
+from backend.tests.benchmarks import sized
+
+pytestmark = pytest.mark.anyio
+
+ELECTIONS = sized(500, 60)
+
+@contextmanager
+def count_statements():
+    statements = []
+    def record(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+    event.listen(async_engine.sync_engine, "before_cursor_execute", record)
+    try:
+        yield statements
+    finally:
+        event.remove(async_engine.sync_engine, "before_cursor_execute", record)
+
+async def test_election_listing_statement_count_does_not_grow_with_the_page(client, db, report):
+    now = datetime.now()
+    elections = [
+        models.Election(
+            title=f"Seat {i}", description="Statement count", start_date=now - timedelta(days=i), end_date=now + timedelta(days=1),
+            candidates=[models.Candidate(name="Ada", bio="Treasurer"), models.Candidate(name="Grace", bio="Secretary")]
+        )
+        for i in range(ELECTIONS)
+    ]
+    db.add_all(elections)
+    await db.flush()
+    db.add_all([models.VoterRecord(election_id=e.id, user_id=7) for e in elections[::2]])
+    await db.commit()
+
+    counts = {}
+    for limit in (1, 10, ELECTIONS):
+        with count_statements() as statements:
+            response = await client.get("/api/voting/", params={"user_id": 7, "limit": limit})
+        assert response.status_code == 200
+        assert len(response.json()) == limit
+        counts[limit] = len(statements)
+
+    report(", ".join(f"{n} statements for a page of {limit}" for limit, n in counts.items()))
+    # The page plus one batched candidate load, however many elections it holds
+    assert set(counts.values()) == {2}
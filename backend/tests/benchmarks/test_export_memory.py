@@ -0,0 +1,61 @@
+import os
+import tracemalloc
+from datetime import datetime, timedelta
+import pytest
+from sqlalchemy import insert
+from backend.finance import export, models
+from backend.tests.benchmarks import sized
+
+pytestmark = pytest.mark.anyio
+
+ROWS = sized(1_000_000, 20_000)
+PAGE_SIZE = os.sysconf("SC_PAGE_SIZE")
+
+def rss() -> int:
+    with open("/proc/self/statm") as statm:
+        return int(statm.read().split()[1]) * PAGE_SIZE
+
+async def ledger_account(db, rows: int) -> int:
+    account = models.Account(owner_name="Audit", address="1 Ledger Ln", balance=0)
+    db.add(account)
+    await db.commit()
+    start = datetime(2025, 1, 1)
+    for offset in range(0, rows, 50_000):
+        await db.execute(insert(models.LedgerEntry), [
+            {"account_id": account.id, "date": start + timedelta(minutes=i), "description": f"Charge {i}",
+             "amount": 12.5, "type": models.TransactionType.ASSESSMENT.value, "balance_after": 12.5 * (i + 1)}
+            for i in range(offset, min(offset + 50_000, rows))
+        ])
+    await db.commit()
+    return account.id
+
+async def measure(body) -> dict:
+    """Drain an export, returning its size and peak memory while it ran."""
+    baseline = rss()
+    peak_rss = baseline
+    written = 0
+    tracemalloc.start()
+    try:
+        async for chunk in body:
+            written += len(chunk)
+            peak_rss = max(peak_rss, rss())
+        _, peak_traced = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return {"bytes": written, "traced": peak_traced, "rss": peak_rss - baseline}
+
+async def test_ledger_export_memory_does_not_grow_with_the_ledger(db, report):
+    small = await ledger_account(db, ROWS // 10)
+    large = await ledger_account(db, ROWS)
+
+    for name, export_ledger in (("csv", export.ledger_csv), ("ofx", export.ledger_ofx)):
+        figures = [await measure(export_ledger(account_id, None, None)) for account_id in (small, large)]
+
+        for rows, figure in zip((ROWS // 10, ROWS), figures):
+            report(
+                f"{name}, {rows} rows, {figure['bytes'] / 2**20:.1f} MiB written: "
+                f"peak {figure['traced'] / 2**20:.2f} MiB allocated, RSS +{figure['rss'] / 2**20:.1f} MiB"
+            )
+        assert figures[1]["bytes"] > 9 * figures[0]["bytes"]
+        # Ten times the rows in the same batches: the peak is set by the batch
+        assert figures[1]["traced"] < 2 * figures[0]["traced"]
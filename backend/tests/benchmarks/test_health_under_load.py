@@ -0,0 +1,58 @@
+import asyncio
+import time
+from datetime import datetime, timedelta
+import pytest
+from backend.voting import models
+from backend.tests.benchmarks import percentile, sized
+
+pytestmark = pytest.mark.anyio
+
+ELECTIONS = sized(500, 50)
+HAMMERS = sized(64, 16) # Concurrent clients listing elections
+SAMPLES = sized(500, 100)
+
+async def health_latencies(client) -> list:
+    latencies = []
+    for _ in range(SAMPLES):
+        started = time.perf_counter()
+        assert (await client.get("/api/health")).status_code == 200
+        latencies.append((time.perf_counter() - started) * 1000)
+    return latencies
+
+async def test_health_p99_stays_flat_while_the_voting_listing_is_hammered(client, db, report):
+    now = datetime.now()
+    db.add_all([
+        models.Election(
+            title=f"Seat {i}", description="Load test", start_date=now - timedelta(days=i), end_date=now + timedelta(days=1),
+            candidates=[models.Candidate(name="Ada", bio="Treasurer"), models.Candidate(name="Grace", bio="Secretary")]
+        )
+        for i in range(ELECTIONS)
+    ])
+    await db.commit()
+
+    idle = percentile(await health_latencies(client), 99)
+
+    stop = asyncio.Event()
+    listed = 0
+    async def hammer():
+        nonlocal listed
+        while not stop.is_set():
+            assert (await client.get("/api/voting/", params={"limit": 100})).status_code == 200
+            listed += 1
+    hammers = [asyncio.create_task(hammer()) for _ in range(HAMMERS)]
+    try:
+        while listed < HAMMERS: # Every client is up and listing
+            done, _ = await asyncio.wait(hammers, timeout=0.01)
+            for task in done:
+                task.result()
+        listed = 0
+        loaded = percentile(await health_latencies(client), 99)
+    finally:
+        stop.set()
+        await asyncio.gather(*hammers)
+
+    report(f"/api/health p99 {idle:.1f} ms idle, {loaded:.1f} ms under {HAMMERS} clients ({listed} listings)")
+    assert listed # The listing ran while health was sampled
+    # A handler blocking the loop on its queries would hold health checks for
+    # whole listings; awaiting them only queues health behind some CPU work
+    assert loaded < max(20 * idle, 250)
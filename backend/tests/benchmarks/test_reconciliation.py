@@ -0,0 +1,64 @@
+import time
+from datetime import datetime, timedelta
+import pytest
+from sqlalchemy import insert, select
+from backend.finance import models
+from backend.tests.benchmarks import sized
+
+pytestmark = pytest.mark.anyio
+
+LINES = sized(100_000, 2_000)
+
+async def accounts_with_open_charges(db, count: int) -> list:
+    """One open charge per account, each for a distinct amount."""
+    charged_on = datetime.now() - timedelta(days=10)
+    amounts = [round(70_000 + i / 100, 2) for i in range(count)]
+    ids = (await db.execute(
+        insert(models.Account).returning(models.Account.id),
+        [{"owner_name": f"Unit {i}", "address": f"{i} Lockbox Rd", "balance": amount, "oldest_unpaid_date": charged_on}
+         for i, amount in enumerate(amounts)]
+    )).scalars().all()
+    await db.execute(insert(models.LedgerEntry), [
+        {"account_id": account_id, "date": charged_on, "description": "Special assessment", "amount": amount,
+         "type": models.TransactionType.ASSESSMENT.value, "balance_after": amount}
+        for account_id, amount in zip(ids, amounts)
+    ])
+    await db.commit()
+    return list(zip(ids, amounts))
+
+def statement(charges: list) -> bytes:
+    """Half the deposits name the account, the rest match by amount alone;
+    every tenth line is a deposit nobody owes."""
+    today = datetime.now().date().isoformat()
+    rows = ["date,amount,reference,description"]
+    for i, (account_id, amount) in enumerate(charges):
+        if i % 10 == 9:
+            rows.append(f"{today},0.37,CHK-{i},Unknown deposit")
+        elif i % 2:
+            rows.append(f"{today},{amount:.2f},ACCT-{account_id},Lockbox")
+        else:
+            rows.append(f"{today},{amount:.2f},,Bank transfer")
+    return ("\n".join(rows) + "\n").encode()
+
+async def test_statement_reconciliation(client, db, report):
+    charges = await accounts_with_open_charges(db, LINES)
+    body = statement(charges)
+
+    started = time.perf_counter()
+    response = await client.post(
+        "/api/finance/reconciliation/statement", files={"statement": ("statement.csv", body, "text/csv")}
+    )
+    elapsed = time.perf_counter() - started
+
+    assert response.status_code == 200, response.text
+    result = response.json()
+    report(f"{result['lines']} lines, {result['posted']} posted in {elapsed:.2f} s ({LINES / elapsed:,.0f} lines/s)")
+    assert result["lines"] == LINES
+    assert result["posted"] == LINES - LINES // 10
+    assert len(result["unmatched"]) == LINES // 10
+    paid = (await db.execute(
+        select(models.Account.balance)
+        .where(models.Account.id.in_([account_id for account_id, _ in charges[:10]]))
+        .order_by(models.Account.id)
+    )).scalars().all()
+    assert paid[:9] == [0] * 9
@@ -0,0 +1,60 @@
+import random
+import time
+from datetime import datetime, timedelta
+import pytest
+from sqlalchemy import insert
+from backend.documents.models import AccessLevel, Document, DocumentCategory, DocumentText, TextStatus
+from backend.tests.benchmarks import percentile, sized
+
+pytestmark = pytest.mark.anyio
+
+DOCUMENTS = sized(5_000, 300)
+QUERIES = sized(200, 40) # Per role
+
+WORDS = (
+    "board meeting minutes motion seconded approved budget reserve fund roof repair contractor bid "
+    "landscaping pool hours parking permit assessment increase delinquent owner architectural review "
+    "paint color variance insurance audit quorum proxy election bylaws amendment pet rule noise "
+    "complaint gate clubhouse rental vendor invoice drainage sidewalk snow removal lighting"
+).split()
+SEARCHES = ["budget approved", "roof repair contractor", "pool hours", "parking permit", "reserve fund audit", "fence policy"]
+
+def minutes(rng: random.Random, words: int = 400) -> str:
+    return " ".join(rng.choice(WORDS) for _ in range(words)) + "."
+
+async def corpus(db, count: int) -> int:
+    """Indexed meeting minutes; returns the id of the one that approves the fence policy."""
+    rng = random.Random(22)
+    started = datetime(2015, 1, 1)
+    ids = (await db.execute(insert(Document).returning(Document.id), [
+        {"title": f"Board minutes {i}", "category": DocumentCategory.MINUTES.value,
+         "access_level": AccessLevel.PUBLIC.value if i % 4 else AccessLevel.BOARD_ONLY.value,
+         "description": "Monthly board meeting", "file_url": f"/files/minutes-{i}.pdf",
+         "upload_date": started + timedelta(days=i), "uploaded_by": "Secretary"}
+        for i in range(count)
+    ])).scalars().all()
+    bodies = [minutes(rng) for _ in ids]
+    bodies[count // 2] += " The board approved the new fence policy for rear yards."
+    await db.execute(insert(DocumentText), [
+        {"document_id": document_id, "title": f"Board minutes {i}", "description": "Monthly board meeting",
+         "body": body, "status": TextStatus.INDEXED.value}
+        for i, (document_id, body) in enumerate(zip(ids, bodies))
+    ])
+    await db.commit()
+    return ids[count // 2]
+
+async def test_search_latency(client, db, report):
+    fence_minutes = await corpus(db, DOCUMENTS)
+
+    for role in ("resident", "board"):
+        latencies = []
+        for i in range(QUERIES):
+            started = time.perf_counter()
+            response = await client.get("/api/documents/search", params={"q": SEARCHES[i % len(SEARCHES)], "user_role": role})
+            latencies.append((time.perf_counter() - started) * 1000)
+            assert response.status_code == 200
+        report(f"{DOCUMENTS} documents, {role}: p50 {percentile(latencies, 50):.1f} ms, p95 {percentile(latencies, 95):.1f} ms")
+
+    results = (await client.get("/api/documents/search", params={"q": "fence policy", "user_role": "board"})).json()
+    assert results[0]["id"] == fence_minutes
+    assert "<mark>fence</mark>" in results[0]["snippet"]
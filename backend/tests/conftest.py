@@ -0,0 +1,37 @@
+import os
+import tempfile
+
+# Point the app at a throwaway SQLite database and blob store before any
+# backend module is imported, and keep background workers out of the way.
+_tmp = tempfile.mkdtemp(prefix="hoa-tests-")
+os.environ["DATABASE_URL"] = f"sqlite:///{_tmp}/test.db"
+os.environ.pop("ASYNC_DATABASE_URL", None)
+os.environ["DOCUMENTS_STORAGE"] = "fs"
+os.environ["DOCUMENTS_STORAGE_PATH"] = os.path.join(_tmp, "document-store")
+os.environ["DOCUMENTS_INDEX_WORKERS"] = "0"
+os.environ["DERIVATIVES_WORKERS"] = "0"
+os.environ["BLOB_GC_WORKERS"] = "0"
+os.environ["NOTIFICATIONS_WORKERS"] = "0"
+os.environ["VOTING_BROADCASTER"] = "memory"
+
+import httpx
+import pytest
+from backend.core.database import AsyncSessionLocal, async_engine
+from backend.main import app
+
+@pytest.fixture
+def anyio_backend():
+    return "asyncio"
+
+@pytest.fixture
+async def client():
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+        yield client
+    # Pooled connections belong to this test's event loop
+    await async_engine.dispose()
+
+@pytest.fixture
+async def db():
+    async with AsyncSessionLocal() as session:
+        yield session
+    await async_engine.dispose()
@@ -0,0 +1,51 @@
+import asyncio
+import re
+import pytest
+from sqlalchemy import delete, select
+from backend.calendar import models
+
+pytestmark = pytest.mark.anyio
+
+def event(title: str) -> dict:
+    return {
+        "title": title,
+        "event_type": "Social",
+        "start_date": "2026-07-04T18:00:00",
+        "end_date": "2026-07-04T21:00:00",
+    }
+
+async def test_concurrent_first_writes_create_the_revision_counter_once(client, db):
+    await db.execute(delete(models.CalendarRevision))
+    await db.commit()
+
+    responses = await asyncio.gather(*[client.post("/api/calendar/events", json=event(f"Party {i}")) for i in range(10)])
+
+    assert [r.status_code for r in responses] == [200] * 10
+    revisions = (await db.execute(
+        select(models.CalendarEvent.revision).where(models.CalendarEvent.id.in_([r.json()["id"] for r in responses]))
+    )).scalars().all()
+    assert len(set(revisions)) == 10
+    assert (await db.get(models.CalendarRevision, 1)).value == max(revisions)
+
+async def test_feed_stamps_are_utc(client):
+    await client.post("/api/calendar/events", json=event("Fireworks"))
+
+    feed = (await client.get("/api/calendar/feed.ics")).text
+
+    stamps = re.findall(r"^(?:DTSTAMP|LAST-MODIFIED):(.*)\r$", feed, re.MULTILINE)
+    assert stamps and all(re.fullmatch(r"\d{8}T\d{6}Z", s) for s in stamps)
+
+async def test_reservations_with_offsets_are_stored_and_checked_in_utc(client):
+    facility = (await client.post("/api/facilities/", json={"name": "Tennis court 2"})).json()
+    path = f"/api/facilities/{facility['id']}/reservations"
+
+    first = await client.post(path, json={"start_date": "2031-01-01T10:30:00Z", "end_date": "2031-01-01T11:30:00Z"})
+    assert first.status_code == 200, first.text
+    assert first.json()["start_date"] == "2031-01-01T10:30:00"
+
+    # 06:00-07:00 at UTC-05:00 is 11:00-12:00 UTC
+    overlap = await client.post(path, json={"start_date": "2031-01-01T06:00:00-05:00", "end_date": "2031-01-01T07:00:00-05:00"})
+    naive = await client.post(path, json={"start_date": "2031-01-01T11:30:00", "end_date": "2031-01-01T12:30:00"})
+
+    assert overlap.status_code == 409
+    assert naive.status_code == 200
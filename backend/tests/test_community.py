@@ -0,0 +1,24 @@
+import pytest
+
+pytestmark = pytest.mark.anyio
+
+async def test_fresh_database_has_the_demo_residents(client):
+    everyone = (await client.get("/api/community/all-residents", params={"q": "maple"})).json()
+    listed = (await client.get("/api/community/directory", params={"q": "maple"})).json()
+
+    assert {"John Doe", "Jane Smith", "Bob Wilson"} <= {p["name"] for p in everyone}
+    assert "Bob Wilson" not in {p["name"] for p in listed}
+
+async def test_directory_listing_saves_and_reads_back(client):
+    listing = {
+        "name": "Carol Diaz", "address": "131 Maple St", "email": "carol@example.com",
+        "phone": None, "bio": "Runs the book club."
+    }
+
+    saved = await client.put("/api/community/directory/profile", params={"user_id": 501}, json=listing)
+    opted_in = await client.post("/api/community/directory/opt-in", params={"user_id": 501, "status": True})
+    read_back = (await client.get("/api/community/directory/profile", params={"user_id": 501})).json()
+
+    assert saved.status_code == 200 and opted_in.status_code == 200
+    assert read_back["bio"] == "Runs the book club." and read_back["is_opted_in"] is True
+    assert (await client.get("/api/community/directory/profile", params={"user_id": 502})).status_code == 404
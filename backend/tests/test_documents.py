@@ -0,0 +1,158 @@
+import os
+import time
+from datetime import datetime
+import pytest
+from fastapi import HTTPException
+from sqlalchemy import select, update
+from backend.documents import blobs
+from backend.documents.blobs import BlobCollector
+from backend.documents.models import Derivative, DerivativeStatus, OrphanedBlob
+from backend.documents.storage import parse_range, storage
+
+pytestmark = pytest.mark.anyio
+
+@pytest.mark.parametrize("header, expected", [
+    (None, None),
+    ("bytes=0-9", (0, 9)),
+    ("bytes=5-", (5, 99)),
+    ("bytes=90-500", (90, 99)),
+    ("bytes=-10", (90, 99)),
+    ("bytes=-500", (0, 99)),
+    ("bytes=5-2", None), # Last byte before the first: invalid, ignored
+    ("bytes=abc", None),
+    ("items=0-9", None),
+    ("bytes=0-1,5-6", None),
+])
+def test_parse_range(header, expected):
+    assert parse_range(header, 100) == expected
+
+@pytest.mark.parametrize("header", ["bytes=100-", "bytes=150-200", "bytes=-0"])
+def test_unsatisfiable_range_is_416(header):
+    with pytest.raises(HTTPException) as error:
+        parse_range(header, 100)
+
+    assert error.value.status_code == 416
+    assert error.value.headers["Content-Range"] == "bytes */100"
+
+async def upload(client, content: bytes, title: str = "Pool rules") -> dict:
+    response = await client.post(
+        "/api/documents/upload",
+        data={"title": title, "category": "Policies", "access_level": "Public"},
+        files={"file": ("rules.txt", content, "text/plain")}
+    )
+    assert response.status_code == 200, response.text
+    return response.json()
+
+async def backdate(db, digest: str):
+    """Pretend the blob was stored and orphaned two grace periods ago."""
+    past = datetime.utcnow() - 2 * blobs.GRACE
+    await db.execute(update(OrphanedBlob).where(OrphanedBlob.digest == digest).values(orphaned_at=past))
+    await db.commit()
+    stored_at = time.time() - 2 * blobs.GRACE.total_seconds()
+    os.utime(storage.path(digest), (stored_at, stored_at))
+
+async def orphaned(db, digest: str) -> bool:
+    db.expire_all()
+    return await db.scalar(select(OrphanedBlob.digest).where(OrphanedBlob.digest == digest)) is not None
+
+async def test_invalid_range_header_serves_the_whole_file(client):
+    document = await upload(client, b"0123456789")
+
+    response = await client.get(f"/api/documents/{document['id']}/file", headers={"Range": "bytes=5-2"})
+
+    assert response.status_code == 200
+    assert response.content == b"0123456789"
+
+async def test_deleted_documents_blob_is_collected_after_the_grace_period(client, db):
+    document = await upload(client, b"collect me")
+    digest = (await client.get(f"/api/documents/{document['id']}/file")).headers["ETag"].strip('"')
+
+    assert (await client.delete(f"/api/documents/{document['id']}")).status_code == 200
+    assert await orphaned(db, digest)
+    assert await BlobCollector(workers=1).drain() == 0 # Still within the grace period
+    assert await storage.size(digest) is not None
+
+    await backdate(db, digest)
+    assert await BlobCollector(workers=1).drain() == 1
+
+    assert await storage.size(digest) is None
+    assert not await orphaned(db, digest)
+
+async def test_blob_still_used_by_another_document_is_kept(client, db):
+    first = await upload(client, b"shared bytes", title="First")
+    second = await upload(client, b"shared bytes", title="Second")
+    digest = (await client.get(f"/api/documents/{first['id']}/file")).headers["ETag"].strip('"')
+
+    await client.delete(f"/api/documents/{first['id']}")
+    await backdate(db, digest)
+    await BlobCollector(workers=1).drain()
+
+    assert not await orphaned(db, digest)
+    assert (await client.get(f"/api/documents/{second['id']}/file")).content == b"shared bytes"
+
+async def test_blob_uploaded_again_before_its_row_commits_is_kept(client, db):
+    document = await upload(client, b"uploaded twice")
+    digest = (await client.get(f"/api/documents/{document['id']}/file")).headers["ETag"].strip('"')
+    await client.delete(f"/api/documents/{document['id']}")
+    await backdate(db, digest)
+
+    # A concurrent upload of the same bytes has stored its blob but not yet its row
+    async def chunks():
+        yield b"uploaded twice"
+    assert not (await storage.write(chunks())).created
+    await BlobCollector(workers=1).drain()
+
+    assert await storage.size(digest) == len(b"uploaded twice")
+    assert await orphaned(db, digest) # Retried after another grace period
+
+async def test_collected_files_renderings_go_with_it(client, db):
+    document = await upload(client, b"rendered source")
+    digest = (await client.get(f"/api/documents/{document['id']}/file")).headers["ETag"].strip('"')
+    async def jpeg():
+        yield b"thumbnail bytes"
+    thumbnail = await storage.write(jpeg())
+    db.add(Derivative(
+        source_hash=digest, kind="thumbnail", status=DerivativeStatus.READY.value,
+        derived_hash=thumbnail.digest, size=thumbnail.size
+    ))
+    await db.commit()
+
+    await client.delete(f"/api/documents/{document['id']}")
+    await backdate(db, digest)
+    await BlobCollector(workers=1).drain()
+
+    assert await db.scalar(select(Derivative).where(Derivative.source_hash == digest)) is None
+    assert await orphaned(db, thumbnail.digest)
+    await backdate(db, thumbnail.digest)
+    await BlobCollector(workers=1).drain()
+    assert await storage.size(thumbnail.digest) is None
+
+async def upload_photo(client, content: bytes) -> str:
+    response = await client.post("/api/maintenance/photos", files={"file": ("leak.png", content, "image/png")})
+    assert response.status_code == 200, response.text
+    return response.json()["image_url"]
+
+async def test_photo_never_attached_to_a_request_is_collected(client, db):
+    image_url = await upload_photo(client, b"abandoned photo")
+    digest = image_url.rsplit("/", 1)[1].split(".")[0]
+
+    assert await orphaned(db, digest)
+    await backdate(db, digest)
+    await BlobCollector(workers=1).drain()
+
+    assert await storage.size(digest) is None
+    assert (await client.get(image_url)).status_code == 404
+
+async def test_photo_attached_to_a_request_is_kept(client, db):
+    image_url = await upload_photo(client, b"leaking faucet")
+    digest = image_url.rsplit("/", 1)[1].split(".")[0]
+    response = await client.post(
+        "/api/maintenance/", json={"title": "Leak", "description": "Kitchen faucet", "category": "Plumbing", "image_url": image_url}
+    )
+    assert response.status_code == 200, response.text
+
+    await backdate(db, digest)
+    await BlobCollector(workers=1).drain()
+
+    assert not await orphaned(db, digest)
+    assert (await client.get(image_url)).content == b"leaking faucet"
@@ -0,0 +1,210 @@
+import asyncio
+from datetime import datetime, timedelta
+import pytest
+from sqlalchemy import select
+from backend.finance import models
+from backend.finance.ledger import post_entry
+
+pytestmark = pytest.mark.anyio
+
+async def create_account(client, owner_name: str = "Pat Resident") -> int:
+    response = await client.post("/api/finance/accounts", json={"owner_name": owner_name, "address": "1 Elm St"})
+    assert response.status_code == 200, response.text
+    return response.json()["id"]
+
+async def test_demo_account_exists_for_the_resident_pages(client):
+    assert (await client.get("/api/finance/balance")).status_code == 200
+    assert (await client.get("/api/finance/ledger")).status_code == 200
+
+async def test_ledger_pages_newest_first(client, db):
+    account_id = await create_account(client)
+    start = datetime(2026, 1, 1)
+    for month in range(5):
+        await post_entry(db, account_id, 100.0, models.TransactionType.ASSESSMENT, f"Month {month}", date=start + timedelta(days=31 * month))
+    await db.commit()
+
+    seen = []
+    cursor = None
+    while True:
+        params = {"account_id": account_id, "limit": 2, **({"cursor": cursor} if cursor else {})}
+        response = await client.get("/api/finance/ledger", params=params)
+        seen += [entry["description"] for entry in response.json()]
+        cursor = response.headers.get("X-Next-Cursor")
+        if not cursor:
+            break
+
+    assert seen == [f"Month {month}" for month in reversed(range(5))]
+
+async def test_assessments_charge_each_account_once_dated_to_the_period(client, db):
+    await create_account(client)
+    accounts = {a.id: a.balance for a in (await db.execute(select(models.Account))).scalars()}
+
+    first = await client.post("/api/finance/assessments/generate", params={"billing_period": "2031-04", "amount": 120})
+    rerun = await client.post("/api/finance/assessments/generate", params={"billing_period": "2031-04", "amount": 120})
+
+    assert first.json()["rows_written"] == len(accounts)
+    assert rerun.json()["rows_written"] == 0
+    entries = (await db.execute(
+        select(models.LedgerEntry).where(models.LedgerEntry.description == "2031-04 HOA Assessment")
+    )).scalars().all()
+    assert {e.account_id for e in entries} == set(accounts)
+    assert {e.date for e in entries} == {datetime(2031, 4, 1)}
+    assert all(e.balance_after == round(accounts[e.account_id] + 120, 2) for e in entries)
+
+async def assert_ledger_consistent(db, account_id: int):
+    """The running balance equals the sum of the ledger, and the newest
+    entry's balance_after matches it."""
+    db.expire_all()
+    account = await db.get(models.Account, account_id)
+    entries = (await db.execute(
+        select(models.LedgerEntry)
+        .where(models.LedgerEntry.account_id == account_id)
+        .order_by(models.LedgerEntry.id)
+    )).scalars().all()
+    assert account.balance == pytest.approx(sum(e.amount for e in entries))
+    assert entries[-1].balance_after == pytest.approx(account.balance)
+
+async def test_late_fees_racing_payments_lose_no_update(client, db):
+    account_id = await create_account(client)
+    await post_entry(db, account_id, 1000.0, models.TransactionType.ASSESSMENT, "Old charge", date=datetime.now() - timedelta(days=100))
+    await db.commit()
+
+    responses = await asyncio.gather(
+        client.post("/api/finance/assessments/late-fees"),
+        *[client.post(f"/api/finance/pay?account_id={account_id}", json={"amount": 10, "card_Last4": "4242"}) for _ in range(10)]
+    )
+
+    assert all(r.status_code == 200 for r in responses)
+    assert responses[0].json()["by_bucket"]["90"] >= 1
+    await assert_ledger_consistent(db, account_id)
+    assert (await db.get(models.Account, account_id)).balance == pytest.approx(1000 + 75 - 100)
+
+async def pay(client, account_id: int, amount: float, key: str = None):
+    headers = {"Idempotency-Key": key} if key else {}
+    return await client.post(
+        f"/api/finance/pay?account_id={account_id}", json={"amount": amount, "card_Last4": "4242"}, headers=headers
+    )
+
+async def test_retried_payment_replays_the_original(client, db):
+    account_id = await create_account(client)
+
+    first = await pay(client, account_id, 33.333, key="retry-1")
+    retry = await pay(client, account_id, 33.333, key="retry-1")
+
+    assert first.status_code == retry.status_code == 200
+    assert retry.json() == first.json()
+    assert first.json()["amount"] == -33.33
+    await assert_ledger_consistent(db, account_id)
+    assert (await db.get(models.Account, account_id)).balance == pytest.approx(-33.33)
+
+@pytest.mark.parametrize("amount", [100.005, 0.1 + 0.2, 19.999])
+async def test_replay_compares_amounts_rounded_to_cents(client, amount):
+    account_id = await create_account(client)
+    assert (await pay(client, account_id, amount, key="cents")).status_code == 200
+    assert (await pay(client, account_id, amount, key="cents")).status_code == 200
+
+async def test_reused_key_for_a_different_payment_conflicts(client, db):
+    account_id = await create_account(client)
+
+    assert (await pay(client, account_id, 50, key="reused")).status_code == 200
+    response = await pay(client, account_id, 60, key="reused")
+
+    assert response.status_code == 409
+    assert (await db.get(models.Account, account_id)).balance == pytest.approx(-50)
+
+async def test_concurrent_retries_post_one_payment(client, db):
+    account_id = await create_account(client)
+
+    responses = await asyncio.gather(*[pay(client, account_id, 25, key="burst") for _ in range(10)])
+
+    assert all(r.status_code == 200 for r in responses)
+    assert len({r.json()["id"] for r in responses}) == 1
+    await assert_ledger_consistent(db, account_id)
+    assert (await db.get(models.Account, account_id)).balance == pytest.approx(-25)
+
+async def test_concurrent_payments_keep_the_running_balance(client, db):
+    account_id = await create_account(client)
+
+    responses = await asyncio.gather(*[pay(client, account_id, 10, key=f"stress-{i}") for i in range(25)])
+
+    assert all(r.status_code == 200 for r in responses)
+    assert sorted(r.json()["balance_after"] for r in responses) == [-10.0 * n for n in range(25, 0, -1)]
+    await assert_ledger_consistent(db, account_id)
+
+async def reconcile(client, rows):
+    csv = "date,amount,reference,description\n" + "".join(f"{d},{a},{r},{desc}\n" for d, a, r, desc in rows)
+    response = await client.post(
+        "/api/finance/reconciliation/statement", files={"statement": ("statement.csv", csv.encode(), "text/csv")}
+    )
+    assert response.status_code == 200, response.text
+    return response.json()
+
+async def test_bare_reference_only_matches_an_account_with_that_open_charge(client, db):
+    owing = await create_account(client)
+    stranger = await create_account(client)
+    charged_on = datetime.now() - timedelta(days=5)
+    await post_entry(db, owing, 311.17, models.TransactionType.ASSESSMENT, "Charge", date=charged_on)
+    await db.commit()
+    today = datetime.now().date().isoformat()
+
+    result = await reconcile(client, [
+        (today, 311.17, stranger, "Check"), # Check number that happens to be an account id
+        (today, 311.17, owing, "Lockbox"),
+    ])
+
+    assert result["posted"] == 1
+    assert [u["reference"] for u in result["unmatched"]] == [str(stranger)]
+    db.expire_all()
+    assert (await db.get(models.Account, stranger)).balance == 0
+    assert (await db.get(models.Account, owing)).balance == 0
+
+async def test_prefixed_reference_posts_to_the_account(client, db):
+    account_id = await create_account(client)
+    await post_entry(db, account_id, 300, models.TransactionType.ASSESSMENT, "Jan", date=datetime.now() - timedelta(days=60))
+    await post_entry(db, account_id, 300, models.TransactionType.ASSESSMENT, "Feb", date=datetime.now() - timedelta(days=30))
+    await db.commit()
+
+    result = await reconcile(client, [(datetime.now().date().isoformat(), 250, f"ACCT-{account_id}", "Partial")])
+
+    assert result["posted"] == 1
+    await assert_ledger_consistent(db, account_id)
+    account = await db.get(models.Account, account_id)
+    assert account.balance == 350
+    # 350 owed: the newest charge covers only 300, so the aging starts in January
+    assert account.oldest_unpaid_date.date() == (datetime.now() - timedelta(days=60)).date()
+
+async def test_reconciliation_racing_payments_loses_no_update(client, db):
+    account_id = await create_account(client)
+    await post_entry(db, account_id, 5000, models.TransactionType.ASSESSMENT, "Charge", date=datetime.now() - timedelta(days=10))
+    await db.commit()
+    today = datetime.now().date().isoformat()
+
+    responses = await asyncio.gather(
+        reconcile(client, [(today, 100, f"A{account_id}", f"Deposit {i}") for i in range(20)]),
+        *[pay(client, account_id, 10, key=f"race-{i}") for i in range(10)]
+    )
+
+    assert responses[0]["posted"] == 20
+    await assert_ledger_consistent(db, account_id)
+    assert (await db.get(models.Account, account_id)).balance == pytest.approx(5000 - 2000 - 100)
+
+@pytest.mark.parametrize("billing_period", ["2031-13", "2031-00", "2031-4"])
+async def test_assessments_reject_an_invalid_billing_period(client, billing_period):
+    response = await client.post("/api/finance/assessments/generate", params={"billing_period": billing_period})
+
+    assert response.status_code == 422
+
+async def test_assessments_roll_back_if_their_notice_cannot_be_queued(client, db, monkeypatch):
+    from backend.finance import router
+
+    async def failing_enqueue(*args, **kwargs):
+        raise RuntimeError("outbox unavailable")
+
+    monkeypatch.setattr(router, "enqueue", failing_enqueue)
+    with pytest.raises(RuntimeError):
+        await client.post("/api/finance/assessments/generate", params={"billing_period": "2031-09"})
+
+    assert await db.scalar(select(models.AssessmentRun).where(models.AssessmentRun.billing_period == "2031-09")) is None
+    assert await db.scalar(
+        select(models.LedgerEntry).where(models.LedgerEntry.description == "2031-09 HOA Assessment")
+    ) is None
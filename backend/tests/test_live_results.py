@@ -0,0 +1,67 @@
+import asyncio
+import pytest
+from backend.voting import live
+from backend.voting.live import CLOSED, InProcessBroadcaster, ResultsHub, live_results
+from backend.tests.test_voting import create_election
+
+pytestmark = pytest.mark.anyio
+
+async def test_concurrent_first_subscribers_share_the_initial_tally(monkeypatch):
+    calls = []
+
+    async def slow_tally(db, election_id):
+        calls.append(election_id)
+        await asyncio.sleep(0.05)
+        return {1: 3, 2: 5}
+
+    monkeypatch.setattr(live, "tally_votes", slow_tally)
+    hub = ResultsHub(InProcessBroadcaster(), interval=60)
+
+    await asyncio.gather(*[hub.subscribe(7) for _ in range(5)])
+
+    assert calls == [7]
+    assert hub.counts(7) == {1: 3, 2: 5}
+    assert len(hub._watchers[7]) == 5
+
+async def test_failed_initial_tally_leaves_no_watcher_behind(monkeypatch):
+    async def failing_tally(db, election_id):
+        raise RuntimeError("database unavailable")
+
+    monkeypatch.setattr(live, "tally_votes", failing_tally)
+    hub = ResultsHub(InProcessBroadcaster(), interval=60)
+
+    with pytest.raises(RuntimeError):
+        await hub.subscribe(7)
+
+    assert 7 not in hub._watchers
+    assert 7 not in hub._loading
+
+async def test_close_reaches_watchers_even_with_a_full_queue():
+    hub = ResultsHub(InProcessBroadcaster(), interval=60)
+    queue = await hub.subscribe(0)
+    await hub.close(0)
+    for i in range(live.WATCHER_QUEUE_SIZE):
+        live._put_latest(queue, {"counts": {i: i}})
+
+    assert queue.get_nowait() is CLOSED
+
+async def test_ending_an_election_finishes_its_result_streams(client):
+    election = await create_election(client)
+    stream = asyncio.create_task(client.get(f"/api/voting/{election['id']}/results/stream"))
+    while election["id"] not in live_results._watchers:
+        await asyncio.sleep(0.01)
+
+    assert (await client.post(f"/api/voting/{election['id']}/end")).status_code == 200
+    response = await asyncio.wait_for(stream, timeout=5)
+
+    assert response.text.startswith("event: snapshot")
+    assert response.text.endswith(f'event: closed\ndata: {{"election_id": {election["id"]}}}\n\n')
+
+def test_broadcaster_must_implement_publish_and_listen():
+    class PublishOnly(live.Broadcaster):
+        async def publish(self, channel, message):
+            pass
+
+    with pytest.raises(TypeError):
+        PublishOnly()
+    InProcessBroadcaster()
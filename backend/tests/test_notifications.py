@@ -0,0 +1,61 @@
+from typing import List
+import pytest
+from sqlalchemy import insert, select
+from backend.notifications.dispatcher import Dispatcher
+from backend.notifications.models import Category, Channel, Notification, Status
+from backend.notifications.senders import DeliveryError, Sender
+
+pytestmark = pytest.mark.anyio
+
+class RecordingSender(Sender):
+    def __init__(self, fail_for: str = ""):
+        super().__init__()
+        self.sent: List[int] = []
+        self.fail_for = fail_for
+
+    def send_batch(self, messages):
+        results = []
+        for message in messages:
+            if message.address == self.fail_for:
+                results.append(DeliveryError("mailbox unavailable"))
+            else:
+                self.sent.append(message.id)
+                results.append(None)
+        return results
+
+async def queue_emails(db, addresses: List[str]) -> List[int]:
+    ids = (await db.execute(
+        insert(Notification).returning(Notification.id),
+        [
+            {"channel": Channel.EMAIL.value, "category": Category.GENERAL.value, "address": address,
+             "subject": "Pool opening", "body": "The pool opens Saturday."}
+            for address in addresses
+        ]
+    )).scalars().all()
+    await db.commit()
+    return ids
+
+async def statuses(db, ids: List[int]) -> List[str]:
+    db.expire_all()
+    return (await db.execute(
+        select(Notification.status).where(Notification.id.in_(ids)).order_by(Notification.id)
+    )).scalars().all()
+
+async def test_dispatcher_drains_the_queue_once_per_message(db):
+    ids = await queue_emails(db, [f"resident{i}@example.com" for i in range(250)])
+    sender = RecordingSender()
+
+    await Dispatcher(senders={Channel.EMAIL: sender}, workers=4, batch_size=20).drain()
+
+    assert sorted(set(sender.sent) & set(ids)) == ids
+    assert len(sender.sent) == len(set(sender.sent))
+    assert set(await statuses(db, ids)) == {Status.SENT.value}
+
+async def test_failed_delivery_is_retried_later(db):
+    ids = await queue_emails(db, ["ok@example.com", "bounce@example.com"])
+
+    await Dispatcher(senders={Channel.EMAIL: RecordingSender(fail_for="bounce@example.com")}, workers=1).drain()
+
+    assert await statuses(db, ids) == [Status.SENT.value, Status.PENDING.value]
+    failed = await db.get(Notification, ids[1])
+    assert failed.attempts == 1 and failed.last_error == "mailbox unavailable"
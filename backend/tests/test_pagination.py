@@ -0,0 +1,45 @@
+import base64
+import json
+from datetime import datetime
+import pytest
+from fastapi import HTTPException
+from backend.core.pagination import decode_cursor, encode_cursor
+
+def _token(value) -> str:
+    return base64.urlsafe_b64encode(json.dumps(value).encode()).decode().rstrip("=")
+
+def test_cursor_round_trips():
+    cursor = encode_cursor(datetime(2026, 3, 1, 12, 30), 17)
+    assert decode_cursor(cursor, datetime, int) == (datetime(2026, 3, 1, 12, 30), 17)
+    assert decode_cursor(None, datetime, int) is None
+
+@pytest.mark.parametrize("cursor", [
+    "not base64!",
+    _token({"dt": "2026-03-01"}),
+    _token(17),
+    _token([17]),
+    _token([{"dt": "2026-03-01T00:00:00"}, 17, 18]),
+    _token(["2026-03-01", 17]),
+    _token([{"dt": "yesterday"}, 17]),
+    _token([{"dt": "2026-03-01T00:00:00"}, "17"]),
+    _token([{"dt": "2026-03-01T00:00:00"}, True]),
+    _token([{"dt": "2026-03-01T00:00:00"}, [1, 2]]),
+])
+def test_malformed_cursors_are_rejected(cursor):
+    with pytest.raises(HTTPException) as raised:
+        decode_cursor(cursor, datetime, int)
+    assert raised.value.status_code == 400
+
+@pytest.mark.anyio
+@pytest.mark.parametrize("path", [
+    "/api/finance/ledger",
+    "/api/maintenance/",
+    "/api/documents/",
+    "/api/community/directory",
+    "/api/calendar/events/changes?x=1",
+])
+async def test_paginated_endpoints_answer_tampered_cursors_with_400(client, path):
+    separator = "&" if "?" in path else "?"
+    param = "sync_token" if "changes" in path else "cursor"
+    response = await client.get(f"{path}{separator}{param}={_token([[1], {'a': 2}])}")
+    assert response.status_code == 400
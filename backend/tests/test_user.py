@@ -0,0 +1,37 @@
+import pytest
+
+pytestmark = pytest.mark.anyio
+
+PAPER_BILLING_ONLY = {
+    "general_email": True, "general_paper": False,
+    "ccr_email": True, "ccr_paper": False,
+    "collection_email": True, "collection_paper": False,
+    "billing_email": False, "billing_paper": True,
+    "mgmt_committee_notifications": False,
+    "phone_communications": False,
+}
+
+async def audience_count(client, expression: str) -> int:
+    return (await client.get("/api/community/audience", params={"expression": expression})).json()["count"]
+
+async def test_preference_change_moves_the_resident_between_audiences(client):
+    await client.put("/api/community/directory/profile", params={"user_id": 601}, json={
+        "name": "Dan Park", "address": "141 Maple St", "email": "dan@example.com"
+    })
+    paper_before = await audience_count(client, "billing_paper AND NOT billing_email")
+
+    response = await client.put("/api/user/profile", params={"user_id": 601}, json={
+        "mailing_address": "PO Box 12, Springfield", "preferences": PAPER_BILLING_ONLY
+    })
+
+    assert response.status_code == 200, response.text
+    assert await audience_count(client, "billing_paper AND NOT billing_email") == paper_before + 1
+    profile = (await client.get("/api/user/profile", params={"user_id": 601})).json()
+    assert profile["preferences"] == PAPER_BILLING_ONLY
+    assert profile["mailing_address"] == "PO Box 12, Springfield"
+    assert profile["display_name"] == "Dan P."
+    recipients = (await client.get("/api/community/audience/recipients", params={"expression": "billing_paper"})).text
+    assert "dan@example.com" in recipients
+
+async def test_unknown_user_has_no_profile(client):
+    assert (await client.get("/api/user/profile", params={"user_id": 999999})).status_code == 404
@@ -0,0 +1,82 @@
+import asyncio
+from datetime import datetime, timedelta
+import pytest
+from sqlalchemy import func, select
+from backend.voting import models
+
+pytestmark = pytest.mark.anyio
+
+async def create_election(client, **overrides) -> dict:
+    now = datetime.now()
+    payload = {
+        "title": "Board Seat",
+        "description": "Annual board election",
+        "start_date": (now - timedelta(days=1)).isoformat(),
+        "end_date": (now + timedelta(days=1)).isoformat(),
+        "candidates": [{"name": "Ada", "bio": "Treasurer"}, {"name": "Grace", "bio": "Secretary"}],
+        **overrides
+    }
+    response = await client.post("/api/voting/", json=payload)
+    assert response.status_code == 200, response.text
+    return response.json()
+
+async def test_concurrent_ballots_from_one_voter_record_one_vote(client, db):
+    election = await create_election(client)
+    candidate_id = election["candidates"][0]["id"]
+
+    responses = await asyncio.gather(*[
+        client.post("/api/voting/vote?user_id=42", json={"election_id": election["id"], "candidate_ids": [candidate_id]})
+        for _ in range(20)
+    ])
+
+    assert sorted(r.status_code for r in responses) == [200] + [400] * 19
+    voter_records = await db.scalar(
+        select(func.count()).select_from(models.VoterRecord).where(models.VoterRecord.election_id == election["id"])
+    )
+    votes = await db.scalar(
+        select(func.count()).select_from(models.Vote).where(models.Vote.election_id == election["id"])
+    )
+    assert (voter_records, votes) == (1, 1)
+
+async def test_concurrent_ballots_from_different_voters_all_count(client):
+    election = await create_election(client)
+    candidate_id = election["candidates"][1]["id"]
+
+    responses = await asyncio.gather(*[
+        client.post(f"/api/voting/vote?user_id={user_id}", json={"election_id": election["id"], "candidate_ids": [candidate_id]})
+        for user_id in range(100, 120)
+    ])
+
+    assert all(r.status_code == 200 for r in responses)
+    results = (await client.get(f"/api/voting/{election['id']}/results")).json()
+    assert results["total_votes"] == 20
+
+async def test_ballot_import_is_rejected_once_the_election_closed(client):
+    election = await create_election(client)
+    candidate_id = election["candidates"][0]["id"]
+    ballots = {"ballots": [{"candidate_ids": [candidate_id]}]}
+
+    assert (await client.post(f"/api/voting/{election['id']}/ballots/import", json=ballots)).status_code == 200
+    assert (await client.post(f"/api/voting/{election['id']}/end")).status_code == 200
+    frozen = (await client.get(f"/api/voting/{election['id']}/results")).json()
+
+    response = await client.post(f"/api/voting/{election['id']}/ballots/import", json=ballots)
+    assert response.status_code == 400
+    assert (await client.get(f"/api/voting/{election['id']}/results")).json() == frozen
+    assert frozen["total_votes"] == 1
+
+async def test_duplicate_and_unknown_selections_are_rejected(client):
+    election = await create_election(client, allowed_selections=2)
+    other = await create_election(client)
+    ada = election["candidates"][0]["id"]
+    stranger = other["candidates"][0]["id"]
+
+    for candidate_ids in ([ada, ada], [ada, stranger]):
+        vote = await client.post("/api/voting/vote?user_id=7", json={"election_id": election["id"], "candidate_ids": candidate_ids})
+        imported = await client.post(
+            f"/api/voting/{election['id']}/ballots/import", json={"ballots": [{"candidate_ids": candidate_ids}]}
+        )
+        assert vote.status_code == 400
+        assert imported.status_code == 400
+
+    assert (await client.get(f"/api/voting/{election['id']}/results")).json()["total_votes"] == 0
@@ -1,6 +1,10 @@
-from fastapi import APIRouter
+from fastapi import APIRouter, Depends, HTTPException
 from pydantic import BaseModel
+from sqlalchemy.ext.asyncio import AsyncSession
 from typing import List, Optional
+from backend.core.database import get_async_db
+from backend.community import audience
+from backend.community.models import DirectoryProfile
 
 router = APIRouter(
     tags=["user"]
@@ -35,42 +39,44 @@ class UserProfileUpdate(BaseModel):
     mailing_address: Optional[str] = None
     preferences: Optional[CommunicationPreferences] = None
 
-# Mock Data Storage
-current_profile = UserProfile(
-    name="John Doe",
-    display_name="John D.",
-    address="123 Maple St, Unit 4B",
-    status="Owner",
-    email="john.doe@example.com",
-    phone="(555) 123-4567",
-    mailing_address="123 Maple St, Unit 4B, Springfield, IL 62704",
-    preferences=CommunicationPreferences(
-        general_email=True,
-        general_paper=False,
-        ccr_email=True,
-        ccr_paper=False,
-        collection_email=True,
-        collection_paper=True,
-        billing_email=True,
-        billing_paper=False,
-        mgmt_committee_notifications=True,
-        phone_communications=False
+def _display_name(name: str) -> str:
+    first, *rest = name.split()
+    return f"{first} {rest[-1][0]}." if rest else first
+
+def _user_profile(db_profile: DirectoryProfile) -> UserProfile:
+    return UserProfile(
+        name=db_profile.name,
+        display_name=_display_name(db_profile.name),
+        address=db_profile.address,
+        status="Owner", # Ownership is not recorded yet
+        email=db_profile.email,
+        phone=db_profile.phone or "",
+        mailing_address=db_profile.mailing_address or db_profile.address,
+        preferences=CommunicationPreferences(**audience.from_flags(db_profile.preference_flags))
     )
-)
 
+async def _get_profile(db: AsyncSession, user_id: int) -> DirectoryProfile:
+    db_profile = await db.get(DirectoryProfile, user_id)
+    if not db_profile:
+        raise HTTPException(status_code=404, detail="User not found")
+    return db_profile
+
+# The resident's record is their directory profile, which notification
+# audiences are selected from; user_id should come from auth
 @router.get("/profile", response_model=UserProfile)
-async def get_profile():
-    return current_profile
+async def get_profile(user_id: int = 1, db: AsyncSession = Depends(get_async_db)):
+    return _user_profile(await _get_profile(db, user_id))
 
 @router.put("/profile", response_model=UserProfile)
-async def update_profile(update: UserProfileUpdate):
-    global current_profile
+async def update_profile(update: UserProfileUpdate, user_id: int = 1, db: AsyncSession = Depends(get_async_db)):
+    db_profile = await _get_profile(db, user_id)
     if update.email:
-        current_profile.email = update.email
+        db_profile.email = update.email
     if update.phone:
-        current_profile.phone = update.phone
+        db_profile.phone = update.phone
     if update.mailing_address:
-        current_profile.mailing_address = update.mailing_address
+        db_profile.mailing_address = update.mailing_address
     if update.preferences:
-        current_profile.preferences = update.preferences
-    return current_profile
+        db_profile.preference_flags = audience.to_flags(update.preferences.dict())
+    await db.commit()
+    return _user_profile(db_profile)
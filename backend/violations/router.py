@@ -1,5 +1,9 @@
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, HTTPException, Depends
 from pydantic import BaseModel
+from sqlalchemy.ext.asyncio import AsyncSession
+from backend.core.database import get_async_db
+from backend.notifications.models import Category
+from backend.notifications.queue import enqueue
 from typing import List, Optional
 from datetime import datetime
 from enum import Enum
@@ -76,7 +80,7 @@ async def get_all_violations():
     return mock_violations
 
 @router.post("/", response_model=Violation)
-async def create_violation(violation: ViolationCreate):
+async def create_violation(violation: ViolationCreate, db: AsyncSession = Depends(get_async_db)):
     """Board only: Create new violation"""
     # Validate required fields
     if not violation.description or not violation.description.strip():
@@ -106,6 +110,19 @@ async def create_violation(violation: ViolationCreate):
         "photo_url": violation.photo_url
     }
     mock_violations.append(new_violation)
+    
+    notice = f"Violation notice: {violation.description}"
+    if violation.bylaw_reference:
+        notice += f"\nReference: {violation.bylaw_reference}"
+    if status == ViolationStatus.FINED:
+        notice += f"\nA fine of ${fine_amount:,.2f} has been assessed."
+    await enqueue(
+        db, Category.CCR,
+        "Violation warning" if status == ViolationStatus.WARNING else "Violation fine",
+        notice,
+        recipient_ids=[violation.resident_id]
+    )
+    await db.commit()
     return new_violation
 
 @router.put("/{violation_id}/status", response_model=Violation)
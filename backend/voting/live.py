@@ -0,0 +1,252 @@
+import asyncio
+import json
+import logging
+import os
+from abc import ABC, abstractmethod
+from typing import Callable, Dict, Optional, Set
+from backend.core.database import AsyncSessionLocal, SQLALCHEMY_DATABASE_URL
+from backend.voting.tally import results_cache, tally_votes
+
+logger = logging.getLogger(__name__)
+
+CHANNEL = "voting_results"
+
+# How often dirty elections are re-tallied and pushed to watchers
+TICK_INTERVAL = float(os.getenv("VOTING_STREAM_INTERVAL", "1"))
+KEEPALIVE_INTERVAL = 15.0
+WATCHER_QUEUE_SIZE = 16
+RECONNECT_DELAY_MAX = 30.0
+
+# Queued to watchers when their election is ended early
+CLOSED = {"closed": True}
+
+# --- Broadcasters ---
+
+class Broadcaster(ABC):
+    """Carries "election changed" notifications between workers."""
+
+    @abstractmethod
+    async def publish(self, channel: str, message: str):
+        ...
+
+    @abstractmethod
+    async def listen(self, channel: str, callback: Callable[[str], None]):
+        ...
+
+class InProcessBroadcaster(Broadcaster):
+    """Delivers within the current process only (single worker, tests)."""
+
+    def __init__(self):
+        self._listeners: Dict[str, Set[Callable[[str], None]]] = {}
+
+    async def publish(self, channel: str, message: str):
+        for callback in list(self._listeners.get(channel, ())):
+            callback(message)
+
+    async def listen(self, channel: str, callback: Callable[[str], None]):
+        self._listeners.setdefault(channel, set()).add(callback)
+
+class PostgresBroadcaster(Broadcaster):
+    """Fans notifications out to every worker with LISTEN/NOTIFY.
+
+    If the connection drops it is reopened in the background and every
+    channel is listened to again. Notifications sent while disconnected are
+    lost; the next one carries a fresh tally, so watchers only lag.
+    """
+
+    def __init__(self, dsn: str):
+        self.dsn = dsn
+        self._conn = None
+        self._lock = asyncio.Lock()
+        self._listeners: Dict[str, Set[Callable[[str], None]]] = {}
+        self._reconnecting: Optional[asyncio.Task] = None
+
+    def _dispatch(self, _conn, _pid, channel: str, payload: str):
+        for callback in list(self._listeners.get(channel, ())):
+            callback(payload)
+
+    async def _connection(self):
+        """The open connection, listening on every channel. Call with the lock held."""
+        if self._conn is None or self._conn.is_closed():
+            import asyncpg
+            conn = await asyncpg.connect(self.dsn)
+            conn.add_termination_listener(self._on_termination)
+            for channel in self._listeners:
+                await conn.add_listener(channel, self._dispatch)
+            self._conn = conn
+        return self._conn
+
+    def _on_termination(self, _conn):
+        if self._listeners and self._reconnecting is None:
+            self._reconnecting = asyncio.ensure_future(self._reconnect())
+
+    async def _reconnect(self):
+        delay = 1.0
+        try:
+            while True:
+                try:
+                    async with self._lock:
+                        await self._connection()
+                    return
+                except Exception as e:
+                    logger.warning("Reconnecting broadcaster in %.0fs: %s", delay, e)
+                    await asyncio.sleep(delay)
+                    delay = min(delay * 2, RECONNECT_DELAY_MAX)
+        finally:
+            self._reconnecting = None
+
+    async def publish(self, channel: str, message: str):
+        async with self._lock:
+            conn = await self._connection()
+            await conn.execute("SELECT pg_notify($1, $2)", channel, message)
+
+    async def listen(self, channel: str, callback: Callable[[str], None]):
+        async with self._lock:
+            new_channel = channel not in self._listeners
+            self._listeners.setdefault(channel, set()).add(callback)
+            if self._conn is None or self._conn.is_closed():
+                await self._connection()
+            elif new_channel:
+                await self._conn.add_listener(channel, self._dispatch)
+
+def make_broadcaster() -> Broadcaster:
+    default = "postgres" if SQLALCHEMY_DATABASE_URL.startswith("postgres") else "memory"
+    kind = os.getenv("VOTING_BROADCASTER", default)
+    if kind == "postgres":
+        dsn = "postgresql://" + SQLALCHEMY_DATABASE_URL.split("://", 1)[1]
+        return PostgresBroadcaster(dsn)
+    return InProcessBroadcaster()
+
+# --- Fan-out ---
+
+class ResultsHub:
+    """Coalesces ballot notifications into one tally per election per tick.
+
+    Watchers of an election share a single tally computation; each gets the
+    per-candidate counts that changed since the previous tick.
+    """
+
+    def __init__(self, broadcaster: Broadcaster, interval: float = TICK_INTERVAL):
+        self.broadcaster = broadcaster
+        self.interval = interval
+        self._watchers: Dict[int, Set[asyncio.Queue]] = {}
+        self._counts: Dict[int, Dict[int, int]] = {}
+        self._dirty: Set[int] = set()
+        self._loading: Dict[int, asyncio.Future] = {}
+        self._task: Optional[asyncio.Task] = None
+        self._listening: Optional[asyncio.Future] = None
+
+    async def notify(self, election_id: int):
+        """Announce that ballots were committed for an election."""
+        await self.broadcaster.publish(CHANNEL, str(election_id))
+
+    async def close(self, election_id: int):
+        """Announce that an election was ended; its streams finish."""
+        await self.broadcaster.publish(CHANNEL, f"closed:{election_id}")
+
+    def _on_message(self, payload: str):
+        kind, _, election_id = payload.rpartition(":")
+        election_id = int(election_id)
+        if election_id not in self._watchers:
+            return
+        if kind == "closed":
+            for queue in self._watchers[election_id]:
+                _put_latest(queue, CLOSED)
+        else:
+            self._dirty.add(election_id)
+
+    async def _start(self):
+        if self._listening is None:
+            self._listening = asyncio.ensure_future(self.broadcaster.listen(CHANNEL, self._on_message))
+        try:
+            await asyncio.shield(self._listening)
+        except Exception:
+            self._listening = None
+            raise
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def _initial_counts(self, election_id: int) -> Dict[int, int]:
+        try:
+            async with AsyncSessionLocal() as db:
+                return await tally_votes(db, election_id)
+        finally:
+            self._loading.pop(election_id, None)
+
+    async def subscribe(self, election_id: int) -> asyncio.Queue:
+        await self._start()
+        if election_id not in self._watchers:
+            # Concurrent first subscribers share one tally; the election is
+            # only watched once its counts are in, and not at all if it fails
+            loading = self._loading.get(election_id)
+            if loading is None:
+                loading = self._loading[election_id] = asyncio.ensure_future(self._initial_counts(election_id))
+            counts = await asyncio.shield(loading)
+            if election_id not in self._watchers:
+                self._counts[election_id] = counts
+                self._watchers[election_id] = set()
+        queue = asyncio.Queue(maxsize=WATCHER_QUEUE_SIZE)
+        self._watchers[election_id].add(queue)
+        return queue
+
+    def unsubscribe(self, election_id: int, queue: asyncio.Queue):
+        watchers = self._watchers.get(election_id)
+        if watchers is None:
+            return
+        watchers.discard(queue)
+        if not watchers:
+            del self._watchers[election_id]
+            self._counts.pop(election_id, None)
+            self._dirty.discard(election_id)
+
+    def counts(self, election_id: int) -> Dict[int, int]:
+        return dict(self._counts.get(election_id, {}))
+
+    async def _run(self):
+        while True:
+            await asyncio.sleep(self.interval)
+            dirty, self._dirty = self._dirty, set()
+            for election_id in dirty:
+                if election_id not in self._watchers:
+                    continue
+                try:
+                    await self._push(election_id)
+                except Exception:
+                    # Keep the loop alive; retry this election next tick
+                    self._dirty.add(election_id)
+
+    async def _push(self, election_id: int):
+        async with AsyncSessionLocal() as db:
+            counts = await tally_votes(db, election_id)
+        results_cache.store_counts(election_id, dict(counts))
+
+        previous = self._counts.get(election_id, {})
+        changed = {cid: n for cid, n in counts.items() if previous.get(cid) != n}
+        self._counts[election_id] = counts
+        if not changed:
+            return
+
+        delta = {
+            "election_id": election_id,
+            "total_votes": sum(counts.values()),
+            "counts": changed
+        }
+        for queue in self._watchers.get(election_id, ()):
+            if queue.full():
+                # Slow watcher: counts are absolute, so only the newest state matters
+                _put_latest(queue, dict(delta, counts=counts))
+            else:
+                queue.put_nowait(delta)
+
+def _put_latest(queue: asyncio.Queue, item: dict):
+    """Queue an item, dropping the deltas still waiting if the queue is full."""
+    if queue.full():
+        pending = [queue.get_nowait() for _ in range(queue.qsize())]
+        if any(p is CLOSED for p in pending):
+            item = CLOSED # Nothing after the close matters
+    queue.put_nowait(item)
+
+def format_event(event: str, data: dict) -> str:
+    return f"event: {event}\ndata: {json.dumps(data, default=str)}\n\n"
+
+live_results = ResultsHub(make_broadcaster())
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Boolean
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Boolean, Index
 from sqlalchemy.orm import relationship
 from backend.core.database import Base
 from datetime import datetime
@@ -21,7 +21,7 @@ class Election(Base):
 class Candidate(Base):
     __tablename__ = "candidates"
     id = Column(Integer, primary_key=True, index=True)
-    election_id = Column(Integer, ForeignKey("elections.id"))
+    election_id = Column(Integer, ForeignKey("elections.id"), index=True)
     name = Column(String)
     bio = Column(String)
     photo_url = Column(String, nullable=True)
@@ -31,6 +31,10 @@ class Candidate(Base):
 
 class Vote(Base):
     __tablename__ = "votes"
+    __table_args__ = (
+        # Covers the per-election GROUP BY candidate_id tally
+        Index("ix_votes_election_candidate", "election_id", "candidate_id"),
+    )
     id = Column(Integer, primary_key=True, index=True)
     election_id = Column(Integer, ForeignKey("elections.id"))
     candidate_id = Column(Integer, ForeignKey("candidates.id"))
@@ -41,6 +45,11 @@ class Vote(Base):
 
 class VoterRecord(Base):
     __tablename__ = "voter_records"
+    __table_args__ = (
+        # One ballot per user per election; declared as a unique index so it
+        # can also be added to existing databases (see core/migrations.py)
+        Index("uq_voter_records_election_user", "election_id", "user_id", unique=True),
+    )
     id = Column(Integer, primary_key=True, index=True)
     election_id = Column(Integer, ForeignKey("elections.id"))
     user_id = Column(Integer) # Assuming user ID from user table, keeping loose coupling for now
@@ -1,40 +1,74 @@
-from fastapi import APIRouter, HTTPException, Depends
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, HTTPException, Depends, Query, Request
+from fastapi.responses import StreamingResponse
+from sqlalchemy import and_, insert, select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import selectinload
+import asyncio
 from typing import List
 from datetime import datetime
-from backend.core.database import get_db
+from backend.core.database import get_async_db
 from backend.voting import models, schemas
+from backend.voting.live import CLOSED, KEEPALIVE_INTERVAL, format_event, live_results
+from backend.voting.tally import build_summary, results_cache, tally_votes
+from backend.notifications.models import Category
+from backend.notifications.queue import enqueue
 
 router = APIRouter()
 
+async def _get_election(db: AsyncSession, election_id: int, with_candidates: bool = False):
+    stmt = select(models.Election).where(models.Election.id == election_id)
+    if with_candidates:
+        stmt = stmt.options(selectinload(models.Election.candidates))
+    return (await db.execute(stmt)).scalar_one_or_none()
+
 # --- Elections ---
 
 @router.get("/", response_model=List[schemas.Election])
-async def get_elections(user_id: int = 1, db: Session = Depends(get_db)):
+async def get_elections(
+    user_id: int = 1,
+    active_only: bool = False,
+    skip: int = Query(0, ge=0),
+    limit: int = Query(100, ge=1, le=500),
+    db: AsyncSession = Depends(get_async_db)
+):
     """Get all elections. In a real app, user_id comes from auth token."""
-    elections = db.query(models.Election).order_by(models.Election.start_date.desc()).all()
+    # Outer join the caller's voter record so has_voted comes back with the
+    # election row; candidates are fetched in one batched IN query.
+    query = (
+        select(models.Election, models.VoterRecord.timestamp)
+        .outerjoin(
+            models.VoterRecord,
+            and_(
+                models.VoterRecord.election_id == models.Election.id,
+                models.VoterRecord.user_id == user_id
+            )
+        )
+        .options(selectinload(models.Election.candidates))
+    )
+    
+    if active_only:
+        now = datetime.now()
+        query = query.where(
+            models.Election.is_active.is_(True),
+            models.Election.start_date <= now,
+            models.Election.end_date >= now
+        )
+    
+    query = query.order_by(models.Election.start_date.desc(), models.Election.id.desc()).offset(skip).limit(limit)
+    rows = (await db.execute(query)).all()
     
-    # Check if user has voted for each election
     results = []
-    for election in elections:
-        voter_record = db.query(models.VoterRecord).filter(
-            models.VoterRecord.election_id == election.id,
-            models.VoterRecord.user_id == user_id
-        ).first()
-        
+    for election, vote_timestamp in rows:
         election_data = schemas.Election.from_orm(election)
-        if voter_record:
-            election_data.has_voted = True
-            election_data.vote_timestamp = voter_record.timestamp
-        else:
-            election_data.has_voted = False
-            
+        election_data.has_voted = vote_timestamp is not None
+        election_data.vote_timestamp = vote_timestamp
         results.append(election_data)
         
     return results
 
 @router.post("/", response_model=schemas.Election)
-async def create_election(election: schemas.ElectionCreate, db: Session = Depends(get_db)):
+async def create_election(election: schemas.ElectionCreate, db: AsyncSession = Depends(get_async_db)):
     """Create a new election with candidates (Board Only)"""
     new_election = models.Election(
         title=election.title,
@@ -46,44 +80,57 @@ async def create_election(election: schemas.ElectionCreate, db: Session = Depend
         allowed_selections=election.allowed_selections
     )
     db.add(new_election)
-    db.commit()
-    db.refresh(new_election)
-    
-    for candidate in election.candidates:
-        new_candidate = models.Candidate(
-            election_id=new_election.id,
-            name=candidate.name,
-            bio=candidate.bio,
-            photo_url=candidate.photo_url
-        )
-        db.add(new_candidate)
+    # Flush for the primary key, then insert all candidates in one statement
+    # within the same transaction.
+    await db.flush()
+    
+    if election.candidates:
+        await db.execute(insert(models.Candidate), [
+            {
+                "election_id": new_election.id,
+                "name": candidate.name,
+                "bio": candidate.bio,
+                "photo_url": candidate.photo_url
+            }
+            for candidate in election.candidates
+        ])
     
-    db.commit()
-    db.refresh(new_election)
+    await enqueue(
+        db, Category.GENERAL,
+        f"Election: {new_election.title}",
+        f"{new_election.title}\n\n{new_election.description or ''}\n\n"
+        f"Voting opens {new_election.start_date:%B %d, %Y} and closes {new_election.end_date:%B %d, %Y}."
+    )
+    await db.commit()
+    # Relationships cannot lazy-load on an async session; load them explicitly.
+    await db.refresh(new_election, attribute_names=["candidates"])
     return new_election
 
 @router.post("/{election_id}/end")
-async def end_election(election_id: int, user_id: int = 1, db: Session = Depends(get_db)):
+async def end_election(election_id: int, user_id: int = 1, db: AsyncSession = Depends(get_async_db)):
     """End an election immediately (Board Only - user_id check mocked)."""
     # In real app verify user.role == 'board'
     
-    election = db.query(models.Election).filter(models.Election.id == election_id).first()
+    election = await _get_election(db, election_id)
     if not election:
         raise HTTPException(status_code=404, detail="Election not found")
         
     election.end_date = datetime.now()
     # election.is_active = False # Optional: explicitly mark inactive if logic depends on it, but date check should suffice
     
-    db.commit()
+    await db.commit()
+    results_cache.invalidate(election_id)
+    # Open result streams (in every worker) finish with a "closed" event
+    await live_results.close(election_id)
     return {"message": "Election ended successfully"}
 
 # --- Voting ---
 
 @router.post("/vote")
-async def cast_vote(vote: schemas.VoteCreate, user_id: int = 1, db: Session = Depends(get_db)):
+async def cast_vote(vote: schemas.VoteCreate, user_id: int = 1, db: AsyncSession = Depends(get_async_db)):
     """Cast a vote for candidate(s). user_id should come from auth."""
     # 1. Check if election is active
-    election = db.query(models.Election).filter(models.Election.id == vote.election_id).first()
+    election = await _get_election(db, vote.election_id, with_candidates=True)
     if not election:
         raise HTTPException(status_code=404, detail="Election not found")
     
@@ -91,78 +138,178 @@ async def cast_vote(vote: schemas.VoteCreate, user_id: int = 1, db: Session = De
     if now < election.start_date or now > election.end_date:
         raise HTTPException(status_code=400, detail="Election is not currently open for voting")
 
-    # 2. Check if user already voted
-    existing_record = db.query(models.VoterRecord).filter(
-        models.VoterRecord.election_id == vote.election_id,
-        models.VoterRecord.user_id == user_id
-    ).first()
-    
-    if existing_record:
-        raise HTTPException(status_code=400, detail="You have already cast a vote in this election")
-
-    # 3. Validate selections
+    # 2. Validate selections
     if len(vote.candidate_ids) > election.allowed_selections:
         raise HTTPException(status_code=400, detail=f"You can only select up to {election.allowed_selections} candidates")
 
     if not vote.candidate_ids:
         raise HTTPException(status_code=400, detail="No candidates selected")
 
-    # 4. Record the votes (Anonymous - not linked to user)
-    for cid in vote.candidate_ids:
-        new_vote = models.Vote(
+    if len(set(vote.candidate_ids)) != len(vote.candidate_ids):
+        raise HTTPException(status_code=400, detail="A candidate can only be selected once")
+
+    if not {c.id for c in election.candidates}.issuperset(vote.candidate_ids):
+        raise HTTPException(status_code=400, detail="Unknown candidate for this election")
+
+    # 3. Record the participation (Linked to user) and the votes (Anonymous -
+    # not linked to user) in one transaction. The unique index on
+    # (election_id, user_id) rejects a second ballot, including one racing
+    # in concurrently, so there is no separate "already voted" read.
+    try:
+        await db.execute(insert(models.VoterRecord).values(
             election_id=vote.election_id,
-            candidate_id=cid
-        )
-        db.add(new_vote)
-    
-    # 5. Record the participation (Linked to user)
-    voter_record = models.VoterRecord(
-        election_id=vote.election_id,
-        user_id=user_id
-    )
-    db.add(voter_record)
+            user_id=user_id
+        ))
+        await db.execute(insert(models.Vote), [
+            {"election_id": vote.election_id, "candidate_id": cid}
+            for cid in vote.candidate_ids
+        ])
+        await db.commit()
+    except IntegrityError:
+        await db.rollback()
+        raise HTTPException(status_code=400, detail="You have already cast a vote in this election")
     
-    db.commit()
+    results_cache.apply_ballot(vote.election_id, vote.candidate_ids)
+    await live_results.notify(vote.election_id)
     return {"message": "Vote cast successfully"}
 
+@router.post("/{election_id}/ballots/import")
+async def import_ballots(election_id: int, batch: schemas.BallotImport, db: AsyncSession = Depends(get_async_db)):
+    """Load paper ballots in one transaction (Board Only - user_id check mocked)."""
+    election = await _get_election(db, election_id, with_candidates=True)
+    if not election:
+        raise HTTPException(status_code=404, detail="Election not found")
+    
+    # Closed results are frozen in every worker's cache, so they must not change
+    if datetime.now() > election.end_date:
+        raise HTTPException(status_code=400, detail="Election is closed; ballots can no longer be imported")
+    
+    if not batch.ballots:
+        raise HTTPException(status_code=400, detail="No ballots provided")
+    
+    # Validate the whole batch up front so nothing is written for a bad file
+    candidate_ids = {c.id for c in election.candidates}
+    voter_ids = set()
+    for i, ballot in enumerate(batch.ballots):
+        if not ballot.candidate_ids:
+            raise HTTPException(status_code=400, detail=f"Ballot {i}: no candidates selected")
+        if len(ballot.candidate_ids) > election.allowed_selections:
+            raise HTTPException(status_code=400, detail=f"Ballot {i}: only {election.allowed_selections} selections allowed")
+        if len(set(ballot.candidate_ids)) != len(ballot.candidate_ids):
+            raise HTTPException(status_code=400, detail=f"Ballot {i}: a candidate is selected more than once")
+        if not candidate_ids.issuperset(ballot.candidate_ids):
+            raise HTTPException(status_code=400, detail=f"Ballot {i}: unknown candidate for this election")
+        if ballot.user_id is not None:
+            if ballot.user_id in voter_ids:
+                raise HTTPException(status_code=400, detail=f"Ballot {i}: user {ballot.user_id} appears more than once")
+            voter_ids.add(ballot.user_id)
+    
+    if voter_ids:
+        already_voted = (await db.execute(
+            select(models.VoterRecord.user_id).where(
+                models.VoterRecord.election_id == election_id,
+                models.VoterRecord.user_id.in_(voter_ids)
+            )
+        )).scalars().all()
+        if already_voted:
+            raise HTTPException(status_code=400, detail=f"Users have already voted: {sorted(already_voted)}")
+    
+    vote_rows = [
+        {"election_id": election_id, "candidate_id": cid}
+        for ballot in batch.ballots
+        for cid in ballot.candidate_ids
+    ]
+    try:
+        if voter_ids:
+            await db.execute(insert(models.VoterRecord), [
+                {"election_id": election_id, "user_id": uid} for uid in voter_ids
+            ])
+        await db.execute(insert(models.Vote), vote_rows)
+        await db.commit()
+    except IntegrityError:
+        await db.rollback()
+        raise HTTPException(status_code=400, detail="A voter in this batch has already cast a vote in this election")
+    
+    results_cache.invalidate(election_id)
+    await live_results.notify(election_id)
+    return {
+        "message": "Ballots imported successfully",
+        "ballots": len(batch.ballots),
+        "votes": len(vote_rows)
+    }
+
 # --- Results ---
 
 @router.get("/{election_id}/results", response_model=schemas.ElectionSummary)
-async def get_election_results(election_id: int, db: Session = Depends(get_db)):
+async def get_election_results(election_id: int, db: AsyncSession = Depends(get_async_db)):
     """Get results for a specific election."""
-    election = db.query(models.Election).filter(models.Election.id == election_id).first()
+    # Closed elections are served straight from the frozen cache
+    summary = results_cache.get_frozen(election_id)
+    if summary:
+        return summary
+    
+    election = await _get_election(db, election_id, with_candidates=True)
+    if not election:
+        raise HTTPException(status_code=404, detail="Election not found")
+    
+    if datetime.now() > election.end_date:
+        # Final tally: always recount once, then never touch the votes table again
+        summary = build_summary(election, await tally_votes(db, election_id))
+        results_cache.freeze(election_id, summary)
+        return summary
+    
+    counts = results_cache.get_counts(election_id)
+    if counts is None:
+        counts = await tally_votes(db, election_id)
+        results_cache.store_counts(election_id, counts)
+    
+    return build_summary(election, counts)
+
+@router.get("/{election_id}/results/stream")
+async def stream_election_results(election_id: int, request: Request, db: AsyncSession = Depends(get_async_db)):
+    """Server-Sent Events: a results snapshot, then tally deltas as ballots arrive."""
+    election = await _get_election(db, election_id, with_candidates=True)
     if not election:
         raise HTTPException(status_code=404, detail="Election not found")
+    
+    if datetime.now() > election.end_date:
+        summary = await get_election_results(election_id, db)
+        await db.close()
         
-    vote_counts = {}
-    total_votes = 0
-    
-    # Initialize counts for all candidates
-    for candidate in election.candidates:
-        vote_counts[candidate.id] = {
-            "name": candidate.name,
-            "count": 0
-        }
+        async def closed_events():
+            yield format_event("snapshot", summary.dict())
+            yield format_event("closed", {"election_id": election_id})
         
-    # Count votes
-    votes = db.query(models.Vote).filter(models.Vote.election_id == election_id).all()
-    for vote in votes:
-        if vote.candidate_id in vote_counts:
-            vote_counts[vote.candidate_id]["count"] += 1
-            total_votes += 1
-            
-    results = [
-        schemas.ElectionResult(
-            candidate_id=cid,
-            candidate_name=data["name"],
-            vote_count=data["count"]
-        )
-        for cid, data in vote_counts.items()
-    ]
+        return StreamingResponse(closed_events(), media_type="text/event-stream")
+    
+    queue = await live_results.subscribe(election_id)
+    snapshot = build_summary(election, live_results.counts(election_id))
+    end_date = election.end_date
+    # Don't hold a pooled connection for the lifetime of the stream
+    await db.close()
+    
+    async def events():
+        try:
+            yield format_event("snapshot", snapshot.dict())
+            while datetime.now() <= end_date:
+                if await request.is_disconnected():
+                    return
+                # Wake in time to notice the scheduled end
+                timeout = min(KEEPALIVE_INTERVAL, max(0.0, (end_date - datetime.now()).total_seconds()) + 0.1)
+                try:
+                    delta = await asyncio.wait_for(queue.get(), timeout=timeout)
+                except asyncio.TimeoutError:
+                    yield ": keepalive\n\n"
+                    continue
+                if delta is CLOSED:
+                    break
+                yield format_event("delta", delta)
+            yield format_event("closed", {"election_id": election_id})
+        finally:
+            live_results.unsubscribe(election_id, queue)
     
-    return schemas.ElectionSummary(
-        election_id=election.id,
-        election_title=election.title,
-        total_votes=total_votes,
-        results=results
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
     )
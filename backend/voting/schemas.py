@@ -42,6 +42,13 @@ class VoteCreate(BaseModel):
     election_id: int
     candidate_ids: List[int]
 
+class PaperBallot(BaseModel):
+    candidate_ids: List[int]
+    user_id: Optional[int] = None # Voter whose participation is recorded, if known
+
+class BallotImport(BaseModel):
+    ballots: List[PaperBallot]
+
 class ElectionResult(BaseModel):
     candidate_id: int
     candidate_name: str
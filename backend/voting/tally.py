@@ -0,0 +1,78 @@
+import os
+import time
+from typing import Dict, Iterable, Optional, Tuple
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from backend.voting import models, schemas
+
+# Open elections are cached per worker and updated as this worker records
+# ballots; ballots recorded by other workers show up once the entry expires.
+RESULTS_CACHE_TTL = float(os.getenv("VOTING_RESULTS_CACHE_TTL", "2"))
+
+async def tally_votes(db: AsyncSession, election_id: int) -> Dict[int, int]:
+    """Count votes per candidate with a single grouped aggregate."""
+    rows = await db.execute(
+        select(models.Vote.candidate_id, func.count(models.Vote.id))
+        .where(models.Vote.election_id == election_id)
+        .group_by(models.Vote.candidate_id)
+    )
+    return {candidate_id: count for candidate_id, count in rows.all()}
+
+def build_summary(election: models.Election, counts: Dict[int, int]) -> schemas.ElectionSummary:
+    results = [
+        schemas.ElectionResult(
+            candidate_id=candidate.id,
+            candidate_name=candidate.name,
+            vote_count=counts.get(candidate.id, 0)
+        )
+        for candidate in election.candidates
+    ]
+    return schemas.ElectionSummary(
+        election_id=election.id,
+        election_title=election.title,
+        total_votes=sum(r.vote_count for r in results),
+        results=results
+    )
+
+class ResultsCache:
+    """Per-election tallies: short-lived while voting is open, frozen once closed."""
+
+    def __init__(self, ttl: float = RESULTS_CACHE_TTL):
+        self.ttl = ttl
+        self._open: Dict[int, Tuple[float, Dict[int, int]]] = {}
+        self._frozen: Dict[int, schemas.ElectionSummary] = {}
+
+    def get_frozen(self, election_id: int) -> Optional[schemas.ElectionSummary]:
+        return self._frozen.get(election_id)
+
+    def freeze(self, election_id: int, summary: schemas.ElectionSummary):
+        self._frozen[election_id] = summary
+        self._open.pop(election_id, None)
+
+    def get_counts(self, election_id: int) -> Optional[Dict[int, int]]:
+        entry = self._open.get(election_id)
+        if entry is None:
+            return None
+        stored_at, counts = entry
+        if time.monotonic() - stored_at > self.ttl:
+            del self._open[election_id]
+            return None
+        return counts
+
+    def store_counts(self, election_id: int, counts: Dict[int, int]):
+        self._open[election_id] = (time.monotonic(), counts)
+
+    def apply_ballot(self, election_id: int, candidate_ids: Iterable[int]):
+        """Fold a committed ballot into the cached tally, if one is held."""
+        entry = self._open.get(election_id)
+        if entry is None:
+            return
+        counts = entry[1]
+        for cid in candidate_ids:
+            counts[cid] = counts.get(cid, 0) + 1
+
+    def invalidate(self, election_id: int):
+        self._open.pop(election_id, None)
+        self._frozen.pop(election_id, None)
+
+results_cache = ResultsCache()
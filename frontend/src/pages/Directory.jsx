@@ -2,21 +2,29 @@ import React, { useState, useEffect } from 'react';
 import { Link } from 'react-router-dom';
 import { useAuth } from '../contexts/AuthContext';
 import { API_URL } from '../config';
+import { fetchPage } from '../pagination';
 
 export default function Directory() {
     const { user } = useAuth();
     const [profiles, setProfiles] = useState([]);
     const [board, setBoard] = useState([]);
     const [optedIn, setOptedIn] = useState(false);
+    const [nextCursor, setNextCursor] = useState(null);
 
-    useEffect(() => {
-        fetch(`${API_URL}/api/community/directory`)
-            .then(res => res.json())
-            .then(data => {
-                setProfiles(data);
-                setOptedIn(data.some(p => p.id === user?.id));
+    // Residents come a page at a time, by name
+    const loadProfiles = (cursor) => {
+        fetchPage('/api/community/directory', cursor)
+            .then(({ items, nextCursor }) => {
+                setProfiles(prev => cursor ? [...prev, ...items] : items);
+                setNextCursor(nextCursor);
+                if (items.some(p => p.id === user?.id)) setOptedIn(true);
             })
             .catch(console.error);
+    };
+
+    useEffect(() => {
+        setOptedIn(false);
+        loadProfiles(null);
 
         fetch(`${API_URL}/api/community-info/board`)
             .then(res => res.json())
@@ -26,7 +34,24 @@ export default function Directory() {
 
     const toggleOptIn = async () => {
         const newStatus = !optedIn;
+        const url = new URL(`${API_URL}/api/community/directory/opt-in`, window.location.origin);
+        url.searchParams.set('user_id', user?.id ?? 1);
+        url.searchParams.set('status', newStatus);
+        try {
+            const res = await fetch(url, { method: 'POST' });
+            if (!res.ok) {
+                alert(res.status === 404
+                    ? "Save your directory listing on your Profile page first."
+                    : "Failed to update your directory listing.");
+                return;
+            }
+        } catch (err) {
+            console.error(err);
+            alert("Error updating your directory listing.");
+            return;
+        }
         setOptedIn(newStatus);
+        loadProfiles(null);
         if (newStatus) {
             alert("You have opted IN to the directory. Neighbors can now see your profile.");
         } else {
@@ -106,6 +131,11 @@ export default function Directory() {
                     </div>
                 ))}
             </div>
+            {nextCursor && (
+                <button onClick={() => loadProfiles(nextCursor)} className="btn" style={{ marginTop: '1.5rem' }}>
+                    Load More Neighbors
+                </button>
+            )}
         </div>
     );
 }
@@ -1,11 +1,13 @@
 import React, { useState, useEffect } from 'react';
 import { useAuth } from '../contexts/AuthContext';
 import { API_URL } from '../config';
+import { fetchPage } from '../pagination';
 
 export default function Documents() {
     const { user } = useAuth();
     const [documents, setDocuments] = useState([]);
     const [loading, setLoading] = useState(true);
+    const [nextCursor, setNextCursor] = useState(null);
     const [showModal, setShowModal] = useState(false);
     const [filters, setFilters] = useState({
         search: '',
@@ -21,14 +23,17 @@ export default function Documents() {
 
     useEffect(() => {
         fetchDocuments();
-    }, []);
+    }, [filters.category]);
 
-    const fetchDocuments = () => {
-        const role = user?.role || 'resident';
-        fetch(`${API_URL}/api/documents?user_role=${role}`)
-            .then(res => res.json())
-            .then(data => {
-                setDocuments(data);
+    // Documents come a page at a time, newest first; the category is filtered
+    // by the API so that every page is full
+    const fetchDocuments = (cursor) => {
+        const params = new URLSearchParams({ user_role: user?.role || 'resident' });
+        if (filters.category !== 'all') params.set('category', filters.category);
+        fetchPage(`/api/documents?${params}`, cursor)
+            .then(({ items, nextCursor }) => {
+                setDocuments(prev => cursor ? [...prev, ...items] : items);
+                setNextCursor(nextCursor);
                 setLoading(false);
             })
             .catch(err => {
@@ -121,9 +126,7 @@ export default function Documents() {
             doc.title.toLowerCase().includes(filters.search.toLowerCase()) ||
             (doc.description && doc.description.toLowerCase().includes(filters.search.toLowerCase()));
 
-        const matchesCategory = filters.category === 'all' || doc.category === filters.category;
-
-        return matchesSearch && matchesCategory;
+        return matchesSearch;
     });
 
     if (loading) return <div className="container">Loading...</div>;
@@ -229,7 +232,12 @@ export default function Documents() {
 
                                     <div style={{ display: 'flex', gap: '0.5rem' }}>
                                         <button
-                                            onClick={() => window.open(doc.file_url, '_blank')}
+                                            onClick={() => window.open(
+                                                doc.file_url.startsWith('/')
+                                                    ? `${API_URL}${doc.file_url}?user_role=${user?.role || 'resident'}`
+                                                    : doc.file_url,
+                                                '_blank'
+                                            )}
                                             className="btn btn-primary"
                                             style={{ padding: '0.5rem 1rem', fontSize: '0.9rem' }}
                                         >
@@ -251,6 +259,11 @@ export default function Documents() {
                     ))
                 )}
             </div>
+            {nextCursor && (
+                <button onClick={() => fetchDocuments(nextCursor)} className="btn" style={{ marginTop: '1rem' }}>
+                    Load More Documents
+                </button>
+            )}
 
             {showModal && (
                 <div style={{
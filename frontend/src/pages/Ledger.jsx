@@ -2,14 +2,26 @@ import React, { useState, useEffect } from 'react';
 import { Link } from 'react-router-dom';
 import PaymentModal from '../components/PaymentModal';
 import { API_URL } from '../config';
+import { fetchPage } from '../pagination';
 
 export default function Ledger() {
     const [ledger, setLedger] = useState([]);
+    const [nextCursor, setNextCursor] = useState(null);
     const [summary, setSummary] = useState({ current_balance: 0 });
     const [showPayment, setShowPayment] = useState(false);
 
+    // Newest first; older history is fetched a page at a time
+    const loadLedger = (cursor) => {
+        fetchPage('/api/finance/ledger', cursor)
+            .then(({ items, nextCursor }) => {
+                setLedger(prev => cursor ? [...prev, ...items] : items);
+                setNextCursor(nextCursor);
+            })
+            .catch(console.error);
+    };
+
     const fetchData = () => {
-        fetch(`${API_URL}/api/finance/ledger`).then(res => res.json()).then(setLedger).catch(console.error);
+        loadLedger(null);
         fetch(`${API_URL}/api/finance/balance`).then(res => res.json()).then(setSummary).catch(console.error);
     };
 
@@ -80,6 +92,11 @@ export default function Ledger() {
                         ))}
                     </tbody>
                 </table>
+                {nextCursor && (
+                    <button onClick={() => loadLedger(nextCursor)} className="btn" style={{ marginTop: '1rem' }}>
+                        Load Older Transactions
+                    </button>
+                )}
             </div>
         </div>
     );
@@ -2,18 +2,26 @@ import React, { useState, useEffect } from 'react';
 import { Link } from 'react-router-dom';
 import { useAuth } from '../contexts/AuthContext';
 import { API_URL } from '../config';
+import { fetchPage } from '../pagination';
 
 export default function Maintenance() {
     const { user } = useAuth();
     const [requests, setRequests] = useState([]);
     const [newRequest, setNewRequest] = useState({ title: '', description: '', category: 'General' });
+    const [nextCursor, setNextCursor] = useState(null);
 
-    useEffect(() => {
-        // Mock fetch
-        fetch(`${API_URL}/api/maintenance/`, { headers: { 'Accept': 'application/json' } })
-            .then(res => res.json())
-            .then(data => setRequests(data))
+    // Requests come a page at a time, newest first, so new ones are always on the first page
+    const loadRequests = (cursor) => {
+        fetchPage('/api/maintenance/?newest_first=true', cursor)
+            .then(({ items, nextCursor }) => {
+                setRequests(prev => cursor ? [...prev, ...items] : items);
+                setNextCursor(nextCursor);
+            })
             .catch(err => console.error("Failed to fetch requests", err));
+    };
+
+    useEffect(() => {
+        loadRequests(null);
     }, []);
 
     const handleSubmit = async (e) => {
@@ -25,7 +33,7 @@ export default function Maintenance() {
                 body: JSON.stringify(newRequest)
             });
             const data = await response.json();
-            setRequests([...requests, data]);
+            setRequests(prev => [data, ...prev]);
             setNewRequest({ title: '', description: '', category: 'General' });
         } catch (error) {
             console.error("Error submitting request", error);
@@ -60,6 +68,11 @@ export default function Maintenance() {
                         </span>
                     </div>
                 ))}
+                {nextCursor && (
+                    <button onClick={() => loadRequests(nextCursor)} className="btn">
+                        Load More Requests
+                    </button>
+                )}
             </div>
 
             <div id="new-req-form" className="card" style={{ maxWidth: '600px', margin: '0 auto' }}>
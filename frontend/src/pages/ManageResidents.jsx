@@ -1,21 +1,27 @@
 import React, { useState, useEffect } from 'react';
-import { API_URL } from '../config';
+import { fetchPage } from '../pagination';
 
 export default function ManageResidents() {
     const [residents, setResidents] = useState([]);
     const [loading, setLoading] = useState(true);
+    const [nextCursor, setNextCursor] = useState(null);
 
-    useEffect(() => {
-        fetch(`${API_URL}/api/community/all-residents`)
-            .then(res => res.json())
-            .then(data => {
-                setResidents(data);
+    // Residents come a page at a time, by name
+    const loadResidents = (cursor) => {
+        fetchPage('/api/community/all-residents', cursor)
+            .then(({ items, nextCursor }) => {
+                setResidents(prev => cursor ? [...prev, ...items] : items);
+                setNextCursor(nextCursor);
                 setLoading(false);
             })
             .catch(err => {
                 console.error(err);
                 setLoading(false);
             });
+    };
+
+    useEffect(() => {
+        loadResidents(null);
     }, []);
 
     if (loading) return <div className="container">Loading...</div>;
@@ -75,6 +81,11 @@ export default function ManageResidents() {
                         ))}
                     </tbody>
                 </table>
+                {nextCursor && (
+                    <button onClick={() => loadResidents(nextCursor)} className="btn" style={{ marginTop: '1rem' }}>
+                        Load More Residents
+                    </button>
+                )}
             </div>
         </div>
     );
@@ -7,9 +7,10 @@ export default function Profile() {
     const [profile, setProfile] = useState(null);
     const [loading, setLoading] = useState(true);
     const [message, setMessage] = useState('');
+    const [bio, setBio] = useState('');
 
     useEffect(() => {
-        fetch(`${API_URL}/api/user/profile`)
+        fetch(`${API_URL}/api/user/profile?user_id=${user?.id ?? 1}`)
             .then(res => res.json())
             .then(data => {
                 setProfile(data);
@@ -19,6 +20,12 @@ export default function Profile() {
                 console.error(err);
                 setLoading(false);
             });
+
+        // Not found until the first directory listing is saved
+        fetch(`${API_URL}/api/community/directory/profile?user_id=${user?.id ?? 1}`)
+            .then(res => res.ok ? res.json() : null)
+            .then(listing => setBio(listing?.bio || ''))
+            .catch(console.error);
     }, []);
 
     const handleChange = (e) => {
@@ -79,7 +86,7 @@ export default function Profile() {
         }
 
         try {
-            const res = await fetch(`${API_URL}/api/user/profile`, {
+            const res = await fetch(`${API_URL}/api/user/profile?user_id=${user?.id ?? 1}`, {
                 method: 'PUT',
                 headers: { 'Content-Type': 'application/json' },
                 body: JSON.stringify({
@@ -102,6 +109,28 @@ export default function Profile() {
         }
     };
 
+    const saveListing = async () => {
+        setMessage('');
+        try {
+            const res = await fetch(`${API_URL}/api/community/directory/profile?user_id=${user?.id ?? 1}`, {
+                method: 'PUT',
+                headers: { 'Content-Type': 'application/json' },
+                body: JSON.stringify({
+                    name: profile.name,
+                    address: profile.address,
+                    email: profile.email,
+                    phone: profile.phone || null,
+                    bio: bio.trim() || null,
+                    preferences: profile.preferences
+                }),
+            });
+            setMessage(res.ok ? 'Directory listing saved successfully!' : 'Failed to save directory listing.');
+        } catch (err) {
+            console.error(err);
+            setMessage('Error saving directory listing.');
+        }
+    };
+
     if (loading) return <div className="container">Loading...</div>;
     if (!profile) return <div className="container">Error loading profile.</div>;
 
@@ -154,6 +183,26 @@ export default function Profile() {
                             </div>
                         </div>
                     </div>
+
+                    <div className="card" style={{ marginBottom: '2rem' }}>
+                        <h3>Directory Listing</h3>
+                        <p style={{ color: '#666', fontSize: '0.9rem' }}>
+                            Shown to neighbors with your name, address and contact details when you opt in on the Directory page.
+                        </p>
+                        <label style={{ display: 'block', marginBottom: '0.5rem', fontWeight: '500' }}>About Me</label>
+                        <textarea
+                            value={bio}
+                            onChange={(e) => setBio(e.target.value)}
+                            rows="3"
+                            style={{ width: '100%', padding: '0.75rem', borderRadius: '0.5rem', border: '1px solid #ddd', fontFamily: 'inherit' }}
+                            placeholder="e.g., Loves gardening and board games."
+                        />
+                        <div style={{ textAlign: 'right', marginTop: '1rem' }}>
+                            <button type="button" onClick={saveListing} className="btn btn-primary">
+                                Save Listing
+                            </button>
+                        </div>
+                    </div>
                 </div>
 
                 {/* Editable Section */}
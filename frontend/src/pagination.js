@@ -0,0 +1,11 @@
+import { API_URL } from './config';
+
+// Keyset-paginated list endpoints return the cursor for the next page in the
+// X-Next-Cursor header; it is absent on the last page.
+export async function fetchPage(path, cursor) {
+    const url = new URL(`${API_URL}${path}`, window.location.origin);
+    if (cursor) url.searchParams.set('cursor', cursor);
+    const res = await fetch(url);
+    if (!res.ok) throw new Error(`${res.status} ${res.statusText}`);
+    return { items: await res.json(), nextCursor: res.headers.get('X-Next-Cursor') };
+}